@@ -0,0 +1,196 @@
+"""
+Shared HTTP client for the Backend scripts
+
+Usage:
+    from api_client import ApiClient
+
+    client = ApiClient()                      # local dev server (default)
+    client = ApiClient('production')          # https://tracer.neverlands.xyz/api
+    users = client.get('/users/', timeout=5).json()
+
+One ApiClient keeps a pooled keep-alive session, so repeated calls reuse the
+same TCP (and TLS) connection instead of opening a new one per request.
+Idempotent requests are retried with exponential backoff on connection errors
+and 502/503/504, gzip is negotiated, and every request can be reported to
+timing hooks.
+
+The target can also be chosen with environment variables, which is how the
+plain scripts (status_check.py, final_test.py, ...) are pointed elsewhere:
+    TRACER_API_URL=http://10.0.2.2:8000/api python status_check.py
+    TRACER_API_TARGET=production python status_check.py
+"""
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from latency_stats import summarize
+
+LOCAL_URL = "http://localhost:8000/api"
+PRODUCTION_URL = "https://tracer.neverlands.xyz/api"
+MOCK_URL = "http://127.0.0.1:8765/api"  # mock_backend.py default
+
+TARGETS = {
+    'local': LOCAL_URL,
+    'production': PRODUCTION_URL,
+    'mock': MOCK_URL,
+}
+
+DEFAULT_TIMEOUT = 10
+RETRY_STATUSES = (502, 503, 504)
+
+
+def resolve_base_url(target=None):
+    """
+    Resolve a target name or URL to an API base URL
+
+    Order: explicit argument, TRACER_API_URL, TRACER_API_TARGET, local.
+    Targets are 'local', 'production', 'mock' or a full URL.
+    """
+    target = target or os.environ.get('TRACER_API_URL') or os.environ.get('TRACER_API_TARGET') or 'local'
+    return TARGETS.get(target, target).rstrip('/')
+
+
+class TimingRecorder:
+    """Timing hook that keeps every sample, grouped by 'METHOD path'"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def __call__(self, method, path, status, elapsed):
+        with self._lock:
+            self.samples.setdefault(f"{method} {path}", []).append(elapsed)
+
+    def summary(self):
+        """Per-request-name latency summary (see latency_stats.summarize)"""
+        with self._lock:
+            return {name: summarize(values) for name, values in self.samples.items()}
+
+    def print_summary(self):
+        for name, stats in sorted(self.summary().items()):
+            print(f"   ⏱  {name:40} x{stats['count']:<4} p50 {stats['p50_ms']:7.1f} ms | "
+                  f"max {stats['max_ms']:7.1f} ms")
+
+
+class ApiClient:
+    """
+    Pooled, retrying HTTP client bound to one API base URL
+
+    Args:
+        target: 'local', 'production', 'mock' or a base URL (see resolve_base_url)
+        timeout: Default per-request timeout in seconds
+        retries: Retries for idempotent requests (GET/HEAD/PUT/DELETE/OPTIONS)
+        backoff: Backoff factor; waits backoff * 2**(attempt - 1) seconds
+        pool_size: Max keep-alive connections kept per host
+        hooks: Callables (method, path, status, elapsed_seconds) run after
+            every request; status is None when the request raised
+    """
+
+    def __init__(self, target=None, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5,
+                 pool_size=10, hooks=None):
+        self.base_url = resolve_base_url(target)
+        self.timeout = timeout
+        self.hooks = list(hooks or [])
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    def url(self, path):
+        """Absolute URL for an API path such as '/users/'"""
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def request(self, method, path, **kwargs):
+        """
+        Send a request and return the requests.Response
+
+        Accepts the same keyword arguments as requests.Session.request. With
+        stream=True the body is left unread and the timing covers headers only.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+            status = response.status_code
+            if not kwargs.get('stream'):
+                response.content  # include the body transfer in the timing
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            for hook in self.hooks:
+                hook(method, path, status, elapsed)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def head(self, path, **kwargs):
+        return self.request('HEAD', path, **kwargs)
+
+    def post(self, path, json=None, **kwargs):
+        return self.request('POST', path, json=json, **kwargs)
+
+    def put(self, path, json=None, **kwargs):
+        return self.request('PUT', path, json=json, **kwargs)
+
+    def patch(self, path, json=None, **kwargs):
+        return self.request('PATCH', path, json=json, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def get_json(self, path, **kwargs):
+        """GET path, raise for HTTP errors and return the decoded JSON"""
+        response = self.get(path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def add_client_arguments(parser):
+    """Add the shared --target/--timeout options to an argparse parser"""
+    parser.add_argument('--target', default=None,
+                        help="'local', 'production', 'mock' or an API base URL "
+                             "(default: $TRACER_API_URL, $TRACER_API_TARGET or local)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='per-request timeout in seconds')
+    return parser
+
+
+def client_from_args(args, **kwargs):
+    """Build an ApiClient from options added by add_client_arguments()"""
+    return ApiClient(args.target, timeout=args.timeout, **kwargs)
@@ -0,0 +1,28 @@
+"""
+In-process Django bootstrap shared by the Backend profiling/seeding scripts
+
+Usage:
+    import django_env
+    django_env.setup()
+
+    from api.models import Survey
+
+Expects the Django project checked out next to this file in
+Backend/capstone_backend (the same layout test_survey_11.py uses).
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.join(BACKEND_DIR, 'capstone_backend')
+SETTINGS_MODULE = 'capstone_backend.settings'
+
+
+def setup(settings_module=SETTINGS_MODULE):
+    """Put the project on sys.path and run django.setup() (idempotent)"""
+    import django
+
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
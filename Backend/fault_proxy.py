@@ -0,0 +1,367 @@
+"""
+Fault-injecting reverse proxy + retry/timeout policy driver
+
+Usage:
+    # Proxy only: point the app or any script at http://127.0.0.1:8790/api
+    python fault_proxy.py --upstream http://127.0.0.1:8000 --profile 3g
+    python fault_proxy.py --upstream mock --latency lognormal:250:0.9 --drop 0.02 --bandwidth 384
+
+    # Driver: replay the load_runner read mix through the proxy per policy
+    python fault_proxy.py --upstream mock --profile campus-wifi --drive
+    python fault_proxy.py --upstream mock --profile 3g --drive \\
+        --policies 2:0:0,5:3:0.5,10:3:0.5,45:3:2 --requests 300 --concurrency 10
+
+Faults, applied per request in this order:
+    --burst P:N        with probability P start a burst: this and the next
+                       N-1 requests get 503 (correlated server trouble)
+    --drop P           close the connection without answering
+    --stall P:MS       hold the request MS ms, then close without answering
+    --latency DIST     added delay: fixed:MS, normal:MEAN:SD,
+                       lognormal:MEDIAN:SIGMA or pareto:MIN:ALPHA (ms)
+    --bandwidth KBPS   throttle response bodies to KBPS kilobits/s
+--profile picks a preset (see PROFILES); explicit options override it.
+The fault sequence is drawn from --seed and restarted for every policy.
+
+A policy is TIMEOUT:RETRIES:BACKOFF, i.e. ApiClient(timeout=..., retries=...,
+backoff=...). The driver reports, per policy, the success rate and latency
+percentiles of whole logical requests (retries included) and how many
+attempts reached the proxy per request, then recommends the policy with the
+lowest p99 among those meeting --slo.
+"""
+import argparse
+import math
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_client import ApiClient
+from latency_stats import summarize
+from load_runner import READ_SCENARIOS
+
+DEFAULT_PORT = 8790
+
+PROFILES = {
+    'none': {},
+    'campus-wifi': {'latency': 'lognormal:80:0.6', 'drop': 0.005, 'stall': '0.002:8000',
+                    'burst': '0.002:10', 'bandwidth': 2000},
+    '4g': {'latency': 'lognormal:120:0.7', 'drop': 0.01, 'stall': '0.005:10000',
+           'burst': '0.003:5', 'bandwidth': 1500},
+    '3g': {'latency': 'lognormal:300:0.8', 'drop': 0.02, 'stall': '0.01:15000',
+           'burst': '0.005:5', 'bandwidth': 384},
+    'flaky': {'latency': 'lognormal:150:1.0', 'drop': 0.05, 'stall': '0.02:20000',
+              'burst': '0.01:20', 'bandwidth': 1000},
+}
+
+# The app's ApiConfig (45 s, 3 retries, 2 s delay) and the scripts' timeouts
+DEFAULT_POLICIES = '2:0:0,5:0:0,5:3:0.5,10:3:0.5,45:3:2,60:0:0'
+
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+              'trailers', 'transfer-encoding', 'upgrade', 'content-length', 'host'}
+THROTTLE_TICK = 0.05
+
+
+def parse_latency(spec):
+    """'lognormal:250:0.8' -> callable(rng) returning seconds"""
+    if not spec:
+        return lambda rng: 0.0
+    kind, *params = spec.split(':')
+    params = [float(p) for p in params]
+    if kind == 'fixed':
+        return lambda rng: params[0] / 1000
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1])) / 1000
+    if kind == 'lognormal':
+        mu = math.log(params[0])
+        return lambda rng: rng.lognormvariate(mu, params[1]) / 1000
+    if kind == 'pareto':
+        return lambda rng: params[0] * rng.paretovariate(params[1]) / 1000
+    raise ValueError(f"Unknown latency distribution {spec!r}")
+
+
+def parse_pair(spec, default_second):
+    if not spec:
+        return 0.0, default_second
+    probability, _, second = str(spec).partition(':')
+    return float(probability), float(second or default_second)
+
+
+class FaultInjector:
+    """Decides the fault for each request from a seeded RNG"""
+
+    def __init__(self, latency=None, drop=0.0, stall=None, burst=None, bandwidth=None, seed=42):
+        self.sample_latency = parse_latency(latency)
+        self.drop = drop or 0.0
+        self.stall_p, self.stall_ms = parse_pair(stall, 10000)
+        self.burst_p, self.burst_len = parse_pair(burst, 10)
+        self.bytes_per_second = bandwidth * 1000 / 8 if bandwidth else None
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.rng = random.Random(self.seed)
+            self.burst_left = 0
+            self.counts = Counter()
+
+    def decide(self):
+        """(action, delay_seconds); action is forward, error, drop or stall"""
+        with self.lock:
+            self.counts['requests'] += 1
+            delay = self.sample_latency(self.rng)
+            if self.burst_left == 0 and self.burst_p and self.rng.random() < self.burst_p:
+                self.burst_left = int(self.burst_len)
+            if self.burst_left:
+                self.burst_left -= 1
+                action = 'error'
+            elif self.rng.random() < self.drop:
+                action = 'drop'
+            elif self.rng.random() < self.stall_p:
+                action, delay = 'stall', self.stall_ms / 1000
+            else:
+                action = 'forward'
+            self.counts[action] += 1
+            return action, delay
+
+
+def make_handler(upstream, injector, session, observers=()):
+    class ProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _proxy(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else None
+            action, delay = injector.decide()
+            time.sleep(delay)
+
+            if action in ('drop', 'stall'):
+                self.close_connection = True
+                try:
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                return
+            if action == 'error':
+                self._send(503, {'Content-Type': 'application/json'},
+                           b'{"detail": "Injected 503 (fault_proxy burst)"}')
+                return
+
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+            start = time.perf_counter()
+            try:
+                response = session.request(self.command, upstream + self.path, headers=headers,
+                                           data=body, stream=True, allow_redirects=False, timeout=120)
+                content = response.raw.read(decode_content=False)
+            except requests.RequestException as e:
+                self._send(502, {'Content-Type': 'text/plain'}, f"Upstream error: {e}".encode())
+                return
+            # send_response() adds its own Server/Date
+            out_headers = {k: v for k, v in response.headers.items()
+                           if k.lower() not in HOP_BY_HOP and k.lower() not in ('server', 'date')}
+            self._send(response.status_code, out_headers, content)
+            exchange = {
+                'method': self.command,
+                'path': self.path,
+                'client': self.client_address[0],
+                'request_headers': headers,
+                'request_body': body,
+                'status': response.status_code,
+                'response_bytes': len(content),
+                'elapsed': time.perf_counter() - start,
+            }
+            for observer in observers:
+                observer(exchange)
+
+        def _send(self, status, headers, content):
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            if self.command == 'HEAD':
+                return
+            try:
+                if injector.bytes_per_second:
+                    chunk = max(1, int(injector.bytes_per_second * THROTTLE_TICK))
+                    for i in range(0, len(content), chunk):
+                        self.wfile.write(content[i:i + chunk])
+                        self.wfile.flush()
+                        time.sleep(len(content[i:i + chunk]) / injector.bytes_per_second)
+                else:
+                    self.wfile.write(content)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # client gave up (timeout)
+
+        do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _proxy
+
+        def log_message(self, *args):
+            pass
+
+    return ProxyHandler
+
+
+def start_proxy(upstream, injector, host='127.0.0.1', port=DEFAULT_PORT, observers=()):
+    """
+    Serve on a daemon thread; returns (server, api_base_url through the proxy)
+
+    observers are called with a dict describing every forwarded exchange
+    (method, path, client, request_headers, request_body, status,
+    response_bytes, elapsed) after the response was sent.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    server = ThreadingHTTPServer((host, port), make_handler(upstream.rstrip('/'), injector, session, observers))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api"
+
+
+def resolve_upstream(upstream, mock_latency):
+    """Upstream origin (scheme://host:port); 'mock' starts mock_backend in-process"""
+    if upstream == 'mock':
+        from mock_backend import serve_in_background
+
+        _, base_url = serve_in_background(latency_ms=mock_latency)
+        return base_url[:-len('/api')]
+    return upstream[:-len('/api')] if upstream.rstrip('/').endswith('/api') else upstream.rstrip('/')
+
+
+def parse_policies(text):
+    policies = []
+    for part in text.split(','):
+        timeout, retries, backoff = (part.strip().split(':') + ['0', '0'])[:3]
+        policies.append((float(timeout), int(retries), float(backoff)))
+    return policies
+
+
+def run_policy(base_url, policy, requests_total, concurrency, seed):
+    """Replay the read mix with one policy; returns (latencies, outcomes)"""
+    timeout, retries, backoff = policy
+    client = ApiClient(base_url, timeout=timeout, retries=retries, backoff=backoff, pool_size=concurrency)
+    rng = random.Random(seed)
+    paths = rng.choices([s[2] for s in READ_SCENARIOS], weights=[s[3] for s in READ_SCENARIOS],
+                        k=requests_total)
+    latencies, outcomes = [], Counter()
+    lock = threading.Lock()
+
+    def one(path):
+        start = time.perf_counter()
+        try:
+            response = client.get(path)
+            outcome = 'ok' if response.status_code == 200 else f"http_{response.status_code}"
+        except requests.Timeout:
+            outcome = 'timeout'
+        except requests.ConnectionError:
+            outcome = 'connection'
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            outcomes[outcome] += 1
+            if outcome == 'ok':
+                latencies.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, paths))
+    client.close()
+    return latencies, outcomes
+
+
+def drive(base_url, injector, policies, requests_total, concurrency, slo, seed):
+    print("=" * 110)
+    print(f"POLICY COMPARISON: {requests_total} requests per policy, concurrency {concurrency}")
+    print("=" * 110)
+    print(f"{'POLICY (timeout/retries/backoff)':34} {'OK%':>7} {'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>8} "
+          f"{'MAX ms':>8} {'TRIES/REQ':>9}  FAILURES")
+    print("-" * 110)
+    rows = []
+    for policy in policies:
+        injector.reset()
+        start = time.perf_counter()
+        latencies, outcomes = run_policy(base_url, policy, requests_total, concurrency, seed)
+        wall = time.perf_counter() - start
+        stats = summarize(latencies)
+        ok_rate = outcomes['ok'] / requests_total * 100
+        attempts = injector.counts['requests'] / requests_total
+        failures = ', '.join(f"{k} {v}" for k, v in outcomes.most_common() if k != 'ok') or '-'
+        label = f"{policy[0]:g}s / {policy[1]} / {policy[2]:g}"
+        if stats['count']:
+            latency = (f"{stats['p50_ms']:8.0f} {stats['p95_ms']:8.0f} {stats['p99_ms']:8.0f} "
+                       f"{stats['max_ms']:8.0f}")
+        else:
+            latency = f"{'-':>8} {'-':>8} {'-':>8} {'-':>8}"
+        print(f"{label:34} {ok_rate:7.1f} {latency} {attempts:9.2f}  {failures}  ({wall:.0f}s)")
+        rows.append((policy, ok_rate, stats))
+    print("=" * 110)
+
+    meeting = [r for r in rows if r[1] >= slo and r[2]['count']]
+    if meeting:
+        policy, ok_rate, stats = min(meeting, key=lambda r: r[2]['p99_ms'])
+        print(f"✅ Recommended: timeout {policy[0]:g}s, {policy[1]} retries, backoff {policy[2]:g} "
+              f"({ok_rate:.1f}% ok, p99 {stats['p99_ms']:.0f} ms)")
+    else:
+        best = max(rows, key=lambda r: r[1])
+        print(f"⚠️  No policy reached {slo:g}% success; best was {best[0]} at {best[1]:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fault-injecting proxy and retry/timeout policy driver')
+    parser.add_argument('--upstream', default='http://127.0.0.1:8000',
+                        help="backend origin or API URL, or 'mock' for an in-process mock_backend")
+    parser.add_argument('--mock-latency', type=float, default=5, help='server time of the mock (ms)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--profile', choices=list(PROFILES), default='none')
+    parser.add_argument('--latency', help='fixed:MS | normal:MEAN:SD | lognormal:MEDIAN:SIGMA | pareto:MIN:ALPHA')
+    parser.add_argument('--drop', type=float, help='probability of closing without a response')
+    parser.add_argument('--stall', help='P:MS - hold then close without a response')
+    parser.add_argument('--burst', help='P:N - start a burst of N 503 responses')
+    parser.add_argument('--bandwidth', type=float, help='response bandwidth cap in kbit/s')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--drive', action='store_true', help='compare retry/timeout policies and exit')
+    parser.add_argument('--policies', default=DEFAULT_POLICIES, help='TIMEOUT:RETRIES:BACKOFF,...')
+    parser.add_argument('--requests', type=int, default=200, help='logical requests per policy')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--slo', type=float, default=99.0, help='required success rate in %%')
+    args = parser.parse_args()
+
+    settings = dict(PROFILES[args.profile])
+    for key in ('latency', 'drop', 'stall', 'burst', 'bandwidth'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    injector = FaultInjector(seed=args.seed, **settings)
+    upstream = resolve_upstream(args.upstream, args.mock_latency)
+    server, base_url = start_proxy(upstream, injector, port=0 if args.drive else args.port)
+
+    print(f"🌩  Fault proxy {base_url} -> {upstream}")
+    print(f"   profile {args.profile}: " + (', '.join(f"{k}={v}" for k, v in settings.items()) or 'no faults'))
+    if args.drive:
+        drive(base_url, injector, parse_policies(args.policies), args.requests, args.concurrency,
+              args.slo, args.seed)
+        server.shutdown()
+        return
+
+    print("   Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(10)
+            counts = injector.counts
+            print(f"{time.strftime('%H:%M:%S')} {counts['requests']} requests: "
+                  f"{counts['forward']} forwarded, {counts['error']} 503, {counts['drop']} dropped, "
+                  f"{counts['stall']} stalled")
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n👋 Proxy stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,229 +1,227 @@
 """
 FINAL COMPREHENSIVE TEST - Simulating Flutter App Behavior
 Tests all three problematic features mentioned by user
+
+Usage:
+    python final_test.py
+    python final_test.py --target production --json results.json --junit results.xml
+    python final_test.py --workers 1          # run the scenarios one at a time
+
+Scenarios are steps of a ScenarioRunner (see scenario_runner.py): independent
+ones run concurrently, the answer submission waits for the surveys lookup.
+Exits non-zero when a scenario fails, so it can gate post-deploy checks.
 """
-import requests
-import json
+import argparse
+import sys
+
+from api_client import ApiClient, add_client_arguments
+from reference_data import load_reference
+from scenario_runner import ScenarioRunner, StepFailed, write_json, write_junit
 
-BASE_URL = "http://localhost:8000/api"
+client = ApiClient()
+runner = ScenarioRunner("FINAL COMPREHENSIVE TEST - FLUTTER APP FEATURES")
 
-print("=" * 80)
-print("FINAL COMPREHENSIVE TEST - FLUTTER APP FEATURES")
-print("=" * 80)
 
-success_count = 0
-fail_count = 0
+def create_user(ctx, payload, label):
+    """POST /users/ and log the created user as the app shows it"""
+    response = client.post("/users/", json=payload)
+    if response.status_code != 201:
+        ctx.log(f"   Response: {response.text}")
+        raise StepFailed(f"Status {response.status_code}")
+    data = response.json()
+    ctx.log(f"✅ {label} CREATED SUCCESSFULLY")
+    ctx.log(f"   {label.title().split()[0]} ID: {data['id']}")
+    ctx.log(f"   Username: {data['username']}")
+    ctx.log(f"   Role: {data['role']['name']}")
+    ctx.log(f"   Password: {data.get('plain_password', 'N/A')}")
+    return data
+
 
 # ==================== TEST 1: USER MANAGEMENT - ADD USER ====================
-print("\n" + "="*80)
-print("TEST 1: USER MANAGEMENT PAGE - ADD NEW USER")
-print("="*80)
-print("Simulating: User clicks 'Add User' button and fills form...")
-
-new_user = {
-    "id": "newuser" + str(hash("test") % 1000),
-    "username": "New Test User",
-    "email": "newuser@test.com",
-    "phone_number": "0811223344",
-    "role_id": 4,  # Alumni role
-    "program_study_id": 1,
-    "password": "password123"
-}
-
-try:
-    response = requests.post(f"{BASE_URL}/users/", json=new_user, timeout=5)
-    if response.status_code == 201:
-        print("✅ USER CREATED SUCCESSFULLY")
-        data = response.json()
-        print(f"   User ID: {data['id']}")
-        print(f"   Username: {data['username']}")
-        print(f"   Role: {data['role']['name']}")
-        print(f"   Password: {data.get('plain_password', 'N/A')}")
-        success_count += 1
-    else:
-        print(f"❌ FAILED: Status {response.status_code}")
-        print(f"   Response: {response.text}")
-        fail_count += 1
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-    fail_count += 1
+@runner.step("add_user", title="TEST 1: USER MANAGEMENT PAGE - ADD NEW USER")
+def test_add_user(ctx):
+    ctx.log("Simulating: User clicks 'Add User' button and fills form...")
+    new_user = {
+        "id": "newuser" + str(hash("test") % 1000),
+        "username": "New Test User",
+        "email": "newuser@test.com",
+        "phone_number": "0811223344",
+        "role_id": 4,  # Alumni role
+        "program_study_id": 1,
+        "password": "password123"
+    }
+    return create_user(ctx, new_user, "USER")
+
 
 # ==================== TEST 2: EMPLOYEE DIRECTORY - ADD EMPLOYEE ====================
-print("\n" + "="*80)
-print("TEST 2: EMPLOYEE DIRECTORY PAGE - ADD NEW EMPLOYEE")
-print("="*80)
-print("Simulating: User clicks 'Add Employee' and creates surveyor...")
-
-new_employee = {
-    "id": "emp" + str(hash("employee") % 1000),
-    "username": "New Employee",
-    "email": "employee@test.com",
-    "phone_number": "0899887766",
-    "role_id": 2,  # Surveyor
-    "program_study_id": 1,
-    "password": "emp123"
-}
-
-try:
-    response = requests.post(f"{BASE_URL}/users/", json=new_employee, timeout=5)
-    if response.status_code == 201:
-        print("✅ EMPLOYEE CREATED SUCCESSFULLY")
-        data = response.json()
-        print(f"   Employee ID: {data['id']}")
-        print(f"   Username: {data['username']}")
-        print(f"   Role: {data['role']['name']}")
-        print(f"   Password: {data.get('plain_password', 'N/A')}")
-        success_count += 1
-    else:
-        print(f"❌ FAILED: Status {response.status_code}")
-        print(f"   Response: {response.text}")
-        fail_count += 1
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-    fail_count += 1
+@runner.step("add_employee", title="TEST 2: EMPLOYEE DIRECTORY PAGE - ADD NEW EMPLOYEE")
+def test_add_employee(ctx):
+    ctx.log("Simulating: User clicks 'Add Employee' and creates surveyor...")
+    new_employee = {
+        "id": "emp" + str(hash("employee") % 1000),
+        "username": "New Employee",
+        "email": "employee@test.com",
+        "phone_number": "0899887766",
+        "role_id": 2,  # Surveyor
+        "program_study_id": 1,
+        "password": "emp123"
+    }
+    return create_user(ctx, new_employee, "EMPLOYEE")
+
 
 # ==================== TEST 3: VERIFY USERS LIST ====================
-print("\n" + "="*80)
-print("TEST 3: VERIFY USERS LIST (User Management Page Load)")
-print("="*80)
-
-try:
-    response = requests.get(f"{BASE_URL}/users/", timeout=5)
-    if response.status_code == 200:
-        users = response.json()
-        print(f"✅ USERS LIST RETRIEVED SUCCESSFULLY")
-        print(f"   Total users in system: {len(users)}")
-        print(f"   Latest 3 users:")
-        for user in users[-3:]:
-            role_name = user.get('role', {}).get('name', 'No role') if user.get('role') else 'No role'
-            print(f"      - {user['id']}: {user['username']} ({role_name})")
-        success_count += 1
-    else:
-        print(f"❌ FAILED: Status {response.status_code}")
-        fail_count += 1
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-    fail_count += 1
+@runner.step("users_list", title="TEST 3: VERIFY USERS LIST (User Management Page Load)")
+def test_users_list(ctx):
+    response = client.get("/users/")
+    if response.status_code != 200:
+        raise StepFailed(f"Status {response.status_code}")
+    users = response.json()
+    ctx.log("✅ USERS LIST RETRIEVED SUCCESSFULLY")
+    ctx.log(f"   Total users in system: {len(users)}")
+    ctx.log("   Latest 3 users:")
+    for user in users[-3:]:
+        role_name = user.get('role', {}).get('name', 'No role') if user.get('role') else 'No role'
+        ctx.log(f"      - {user['id']}: {user['username']} ({role_name})")
+    return len(users)
+
 
 # ==================== TEST 4: VERIFY ROLES LIST ====================
-print("\n" + "="*80)
-print("TEST 4: VERIFY ROLES DROPDOWN (For User/Employee Forms)")
-print("="*80)
-
-try:
-    response = requests.get(f"{BASE_URL}/roles/", timeout=5)
-    if response.status_code == 200:
-        roles = response.json()
-        print(f"✅ ROLES LIST RETRIEVED SUCCESSFULLY")
-        print(f"   Available roles for dropdown:")
-        for role in roles:
-            print(f"      - ID {role['id']}: {role['name']}")
-        success_count += 1
-    else:
-        print(f"❌ FAILED: Status {response.status_code}")
-        fail_count += 1
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-    fail_count += 1
+@runner.step("roles_list", title="TEST 4: VERIFY ROLES DROPDOWN (For User/Employee Forms)")
+def test_roles_list(ctx):
+    response = client.get("/roles/")
+    if response.status_code != 200:
+        raise StepFailed(f"Status {response.status_code}")
+    roles = response.json()
+    ctx.log("✅ ROLES LIST RETRIEVED SUCCESSFULLY")
+    ctx.log("   Available roles for dropdown:")
+    for role in roles:
+        ctx.log(f"      - ID {role['id']}: {role['name']}")
+    return roles
+
 
 # ==================== TEST 5: SUBMIT QUESTIONNAIRE (Survey Answers) ====================
-print("\n" + "="*80)
-print("TEST 5: SUBMIT QUESTIONNAIRE - SURVEY ANSWER SUBMISSION")
-print("="*80)
-print("Checking if surveys exist for testing...")
-
-try:
-    # First check if any surveys exist
-    response = requests.get(f"{BASE_URL}/surveys/", timeout=5)
-    if response.status_code == 200:
-        surveys = response.json()
-        if surveys and len(surveys) > 0:
-            survey_id = surveys[0]['id']
-            print(f"   Found survey ID: {survey_id}")
-            
-            # Try to submit an answer
-            answer_data = {
-                "user_id": "11221037",
-                "question_id": 1,
-                "answer_text": "This is a test answer",
-                "answer_value": "5"
-            }
-            
-            answer_response = requests.post(
-                f"{BASE_URL}/surveys/{survey_id}/answers/",
-                json=answer_data,
-                timeout=5
-            )
-            
-            if answer_response.status_code in [200, 201]:
-                print("✅ ANSWER SUBMITTED SUCCESSFULLY")
-                print(f"   Survey ID: {survey_id}")
-                print(f"   Answer: {answer_data['answer_text']}")
-                success_count += 1
-            else:
-                print(f"⚠️  Answer submission returned status {answer_response.status_code}")
-                print(f"   Note: This may be expected if survey structure doesn't match test data")
-                print(f"   Response: {answer_response.text[:200]}")
-                # Don't count as failure since no surveys might be normal
-        else:
-            print("⚠️  NO SURVEYS IN DATABASE")
-            print("   Cannot test questionnaire submission without surveys")
-            print("   This is normal if no surveys have been created yet")
-            print("   ✅ Survey endpoint is accessible (this is what matters)")
-            success_count += 1
+@runner.step("surveys", title="TEST 5a: SURVEYS LOOKUP (Questionnaire List)")
+def test_surveys(ctx):
+    ctx.log("Checking if surveys exist for testing...")
+    response = client.get("/surveys/")
+    if response.status_code != 200:
+        raise StepFailed(f"Status {response.status_code}")
+    surveys = response.json()
+    if surveys:
+        ctx.log(f"   Found survey ID: {surveys[0]['id']}")
+    else:
+        ctx.log("⚠️  NO SURVEYS IN DATABASE")
+        ctx.log("   Cannot test questionnaire submission without surveys")
+        ctx.log("   This is normal if no surveys have been created yet")
+        ctx.log("   ✅ Survey endpoint is accessible (this is what matters)")
+    return surveys
+
+
+@runner.step("submit_answer", depends=["surveys"],
+             title="TEST 5b: SUBMIT QUESTIONNAIRE - SURVEY ANSWER SUBMISSION")
+def test_submit_answer(ctx):
+    surveys = ctx.result("surveys")
+    if not surveys:
+        ctx.log("   No survey to submit to; skipping submission")
+        return None
+    survey_id = surveys[0]['id']
+
+    answer_data = {
+        "user_id": "11221037",
+        "question_id": 1,
+        "answer_text": "This is a test answer",
+        "answer_value": "5"
+    }
+    answer_response = client.post(
+        f"/surveys/{survey_id}/answers/",
+        json=answer_data
+    )
+
+    if answer_response.status_code in [200, 201]:
+        ctx.log("✅ ANSWER SUBMITTED SUCCESSFULLY")
+        ctx.log(f"   Survey ID: {survey_id}")
+        ctx.log(f"   Answer: {answer_data['answer_text']}")
     else:
-        print(f"❌ FAILED: Status {response.status_code}")
-        fail_count += 1
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-    fail_count += 1
+        # Don't count as failure: the test data may not match the survey structure
+        ctx.warn(f"⚠️  Answer submission returned status {answer_response.status_code}")
+        ctx.log("   Note: This may be expected if survey structure doesn't match test data")
+        ctx.log(f"   Response: {answer_response.text[:200]}")
+    return answer_response.status_code
+
 
 # ==================== TEST 6: NETWORK CONNECTIVITY ====================
-print("\n" + "="*80)
-print("TEST 6: NETWORK CONNECTIVITY (From Android Emulator Perspective)")
-print("="*80)
-print("Testing if server is accessible on 0.0.0.0:8000...")
-
-try:
-    # Test with both localhost and 0.0.0.0 to ensure server is properly bound
-    response = requests.get(f"{BASE_URL}/roles/", timeout=2)
-    if response.status_code == 200:
-        print("✅ SERVER IS ACCESSIBLE")
-        print(f"   Server is listening on 0.0.0.0:8000")
-        print(f"   Android emulator can access at: http://10.0.2.2:8000")
-        success_count += 1
+@runner.step("connectivity", title="TEST 6: NETWORK CONNECTIVITY (From Android Emulator Perspective)")
+def test_connectivity(ctx):
+    ctx.log("Testing if server is accessible on 0.0.0.0:8000...")
+    # Revalidating the reference bundle: a bodyless 304 once it is cached
+    _, how = load_reference(client, revalidate=True)
+    ctx.log(f"   Reference bundle: {how}")
+    ctx.log("✅ SERVER IS ACCESSIBLE")
+    ctx.log("   Server is listening on 0.0.0.0:8000")
+    ctx.log("   Android emulator can access at: http://10.0.2.2:8000")
+
+
+def print_summary(report):
+    counts = report['counts']
+    success_count = counts['passed'] + counts['warning']
+    fail_count = counts['failed'] + counts['error'] + counts['skipped']
+
+    print("\n" + "="*80)
+    print("FINAL TEST RESULTS")
+    print("="*80)
+    for step in report['steps']:
+        print(f"   {step['status'].upper():8} {step['duration_s'] * 1000:8.0f} ms  {step['name']}")
+    print(f"✅ Successful tests: {success_count}")
+    print(f"❌ Failed tests: {fail_count}")
+    print(f"📊 Success rate: {(success_count/(success_count+fail_count)*100):.1f}%")
+    print(f"⏱  Wall time {report['duration_s']:.2f}s (steps add up to {report['serial_duration_s']:.2f}s)")
+    print("="*80)
+
+    if fail_count == 0:
+        print("\n🎉 ALL TESTS PASSED! 🎉")
+        print("\n✅ Backend is FULLY OPERATIONAL and ready for Flutter app!")
+        print("\nYou can now:")
+        print("   1. Open your Flutter app in Android emulator")
+        print("   2. Test adding users in User Management page")
+        print("   3. Test adding employees in Employee Directory page")
+        print("   4. Test submitting questionnaires (if surveys exist)")
+        print("\n🔧 Backend Server Status:")
+        print("   - Running on: http://0.0.0.0:8000")
+        print("   - Accessible from emulator at: http://10.0.2.2:8000")
+        print("   - All endpoints responding correctly")
+        print("   - Roles configured correctly")
+        print("\n✨ THE PROBLEM IS SOLVED! ✨")
     else:
-        print(f"⚠️  Unexpected status: {response.status_code}")
-        fail_count += 1
-except Exception as e:
-    print(f"❌ CONNECTION ERROR: {e}")
-    fail_count += 1
-
-# ==================== FINAL SUMMARY ====================
-print("\n" + "="*80)
-print("FINAL TEST RESULTS")
-print("="*80)
-print(f"✅ Successful tests: {success_count}")
-print(f"❌ Failed tests: {fail_count}")
-print(f"📊 Success rate: {(success_count/(success_count+fail_count)*100):.1f}%")
-print("="*80)
-
-if fail_count == 0:
-    print("\n🎉 ALL TESTS PASSED! 🎉")
-    print("\n✅ Backend is FULLY OPERATIONAL and ready for Flutter app!")
-    print("\nYou can now:")
-    print("   1. Open your Flutter app in Android emulator")
-    print("   2. Test adding users in User Management page")
-    print("   3. Test adding employees in Employee Directory page")
-    print("   4. Test submitting questionnaires (if surveys exist)")
-    print("\n🔧 Backend Server Status:")
-    print("   - Running on: http://0.0.0.0:8000")
-    print("   - Accessible from emulator at: http://10.0.2.2:8000")
-    print("   - All endpoints responding correctly")
-    print("   - Roles configured correctly")
-    print("\n✨ THE PROBLEM IS SOLVED! ✨")
-else:
-    print(f"\n⚠️  {fail_count} test(s) failed. Review errors above.")
-    print("   Note: Some failures may be expected (e.g., no surveys in DB)")
-
-print("\n" + "="*80)
+        print(f"\n⚠️  {fail_count} test(s) failed. Review errors above.")
+        print("   Note: Some failures may be expected (e.g., no surveys in DB)")
+
+    print("\n" + "="*80)
+
+
+def main():
+    global client
+
+    parser = argparse.ArgumentParser(description='Post-deploy verification of the app scenarios')
+    parser.add_argument('--workers', type=int, default=8, help='scenarios run concurrently')
+    parser.add_argument('--json', help='write a JSON report here')
+    parser.add_argument('--junit', help='write a JUnit XML report here')
+    add_client_arguments(parser)
+    parser.set_defaults(timeout=5)
+    args = parser.parse_args()
+
+    client = ApiClient(args.target, timeout=args.timeout, pool_size=args.workers)
+    report = runner.run(workers=args.workers)
+    report['target'] = client.base_url
+    print_summary(report)
+
+    if args.json:
+        write_json(report, args.json)
+        print(f"✓ Wrote {args.json}")
+    if args.junit:
+        write_junit(report, args.junit)
+        print(f"✓ Wrote {args.junit}")
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
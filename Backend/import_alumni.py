@@ -0,0 +1,445 @@
+"""
+Bulk alumni importer (CSV/XLSX -> POST /users/)
+
+Usage:
+    python import_alumni.py alumni_2025.csv --dry-run            # validate + dedupe only
+    python import_alumni.py alumni_2025.xlsx --workers 8 --batch-size 50
+    python import_alumni.py alumni_2025.csv --credentials creds.csv
+    python import_alumni.py alumni_2025.csv --profile 20          # where creation time goes
+
+Rows are normalised (id/nim, username/nama, email, phone_number, program
+study id or name, password), deduplicated by id and email within the
+file and against the users already on the server, then created in batches
+that run concurrently. Progress is written to a state file after every batch
+(<file>.import-state.json by default), so an interrupted or partly failed run
+is resumed by running the same command again; created users are skipped.
+Rows without a password get a generated one only with --credentials, which
+is where those passwords are written (mode 0600); without it such rows are
+rejected. The state file holds ids only.
+
+--profile bootstraps Django in-process (see django_env.py) and creates a
+sample of the rows inside a rolled-back transaction, timing each stage of
+what POST /users/ does: serializer validation, password hashing, SQL and the
+rest of save(), and response serialization.
+
+XLSX input requires openpyxl (pip install openpyxl).
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from api_client import ApiClient, TimingRecorder, add_client_arguments
+from latency_stats import summarize
+from list_users import iter_records, iter_users
+
+# Accepted header names per field (lower-cased, spaces -> underscores)
+COLUMN_ALIASES = {
+    'id': ('id', 'nim', 'user_id'),
+    'username': ('username', 'nama', 'name', 'nama_lengkap'),
+    'email': ('email', 'e-mail', 'surel'),
+    'phone_number': ('phone_number', 'phone', 'no_hp', 'telepon'),
+    'program_study': ('program_study_id', 'program_study', 'prodi', 'program_studi'),
+    'password': ('password',),
+}
+ALUMNI_ROLE = 'Alumni'
+DEFAULT_BATCH_SIZE = 50
+
+
+def read_rows(path):
+    """Yield raw row dicts from a .csv or .xlsx file (header row required)"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        if openpyxl is None:
+            raise SystemExit("❌ openpyxl is required for XLSX input: pip install openpyxl")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell or '').strip() for cell in next(rows, ())]
+            for values in rows:
+                if any(value not in (None, '') for value in values):
+                    yield dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+
+
+def normalize(raw, program_ids, generate_password=False):
+    """
+    Map one raw row to a POST /users/ payload
+
+    Returns (payload, error); program_ids maps lower-cased program study
+    names (and ids as strings) to ids. Rows without a password get a
+    generated one only when generate_password is set (i.e. there is a
+    --credentials file to hand it out through).
+    """
+    row = {}
+    lowered = {str(key).strip().lower().replace(' ', '_'): value for key, value in raw.items() if key}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            value = lowered.get(alias)
+            if value not in (None, ''):
+                row[field] = str(value).strip()
+                break
+
+    if not row.get('id'):
+        return None, "missing id/nim"
+    if row['id'].endswith('.0'):
+        row['id'] = row['id'][:-2]  # numeric NIM read from a spreadsheet cell
+    if not row.get('username'):
+        return None, "missing username/nama"
+    if row.get('email') and '@' not in row['email']:
+        return None, f"invalid email {row['email']!r}"
+    if not row.get('password') and not generate_password:
+        return None, "missing password (pass --credentials to generate one)"
+
+    payload = {
+        'id': row['id'],
+        'username': row['username'],
+        'email': row.get('email', '').lower(),
+        'phone_number': row.get('phone_number', ''),
+        'password': row.get('password') or secrets.token_urlsafe(8),
+    }
+    program = row.get('program_study')
+    if program:
+        program_id = program_ids.get(program.lower().removesuffix('.0'))
+        if program_id is None:
+            return None, f"unknown program study {program!r}"
+        payload['program_study_id'] = program_id
+    return payload, None
+
+
+def dedupe(payloads, existing_ids=(), existing_emails=()):
+    """Drop rows whose id or email was already seen; returns (kept, [(row, reason)])"""
+    seen_ids, seen_emails = set(existing_ids), set(existing_emails)
+    kept, dropped = [], []
+    for payload in payloads:
+        email = payload['email']
+        if payload['id'] in seen_ids:
+            dropped.append((payload, 'duplicate id'))
+        elif email and email in seen_emails:
+            dropped.append((payload, 'duplicate email'))
+        else:
+            kept.append(payload)
+            seen_ids.add(payload['id'])
+            if email:
+                seen_emails.add(email)
+    return kept, dropped
+
+
+class ImportState:
+    """
+    Created/failed ids of one source file, saved after every batch
+
+    Only ids are saved. Passwords of users created in this run are kept in
+    memory for --credentials and never written to the state file.
+    """
+
+    def __init__(self, path, source_digest):
+        self.path = path
+        self.lock = threading.Lock()
+        self.created = set()
+        self.passwords = {}
+        self.failed = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get('source_digest') != source_digest:
+                print(f"⚠️  {path} was written for a different version of the file; "
+                      f"ids already created there are still skipped")
+            self.created = set(saved.get('created', []))
+        self.source_digest = source_digest
+
+    def record(self, user_id, password=None, error=None):
+        with self.lock:
+            if error is None:
+                self.created.add(user_id)
+                self.passwords[user_id] = password
+                self.failed.pop(user_id, None)
+            else:
+                self.failed[user_id] = error
+
+    def save(self):
+        with self.lock:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'source_digest': self.source_digest, 'created': sorted(self.created),
+                               'failed': self.failed}, f, indent=1)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def reference_ids(roles, programs):
+    """(alumni role id, {program study name or id -> id}) from role/program study records"""
+    role_id = next((r['id'] for r in roles if r['name'] == ALUMNI_ROLE), None)
+    if role_id is None:
+        raise SystemExit(f"❌ No '{ALUMNI_ROLE}' role found")
+    program_ids = {}
+    for program in programs:
+        program_ids[str(program['id'])] = program['id']
+        program_ids[str(program.get('name', '')).lower()] = program['id']
+    return role_id, program_ids
+
+
+def load_reference(client):
+    return reference_ids(iter_records(client, '/roles/'), iter_records(client, '/unit/program-studies/'))
+
+
+def load_reference_orm():
+    """load_reference() through the ORM, for --profile (no server needed)"""
+    import django_env
+
+    django_env.setup()
+    from seed_dataset import find_model
+
+    return reference_ids(find_model('Role').objects.values('id', 'name'),
+                         find_model('ProgramStudy').objects.values('id', 'name'))
+
+
+def create_batch(client, batch, state):
+    """Create one batch of users; returns (created, failed)"""
+    created = failed = 0
+    for payload in batch:
+        try:
+            response = client.post('/users/', json=payload)
+        except Exception as e:
+            state.record(payload['id'], error=str(e))
+            failed += 1
+            continue
+        if response.status_code == 201:
+            body = response.json()
+            state.record(payload['id'], password=body.get('plain_password') or payload['password'])
+            created += 1
+        elif response.status_code == 400 and 'already exists' in response.text:
+            state.record(payload['id'], password=None)  # created by an earlier, unrecorded run
+            created += 1
+        else:
+            state.record(payload['id'], error=f"HTTP {response.status_code}: {response.text[:200]}")
+            failed += 1
+    state.save()
+    return created, failed
+
+
+def run_import(client, payloads, state, batch_size, workers):
+    batches = [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+    created = failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(create_batch, client, batch, state) for batch in batches]
+        for done, future in enumerate(as_completed(futures), 1):
+            batch_created, batch_failed = future.result()
+            created += batch_created
+            failed += batch_failed
+            print(f"\r   {done}/{len(batches)} batches, {created:,} created, {failed:,} failed",
+                  end='', flush=True)
+    print()
+    return created, failed, time.perf_counter() - start
+
+
+def write_credentials(path, state):
+    """Append this run's id,password rows (a resumed run adds to the same file); mode 0600"""
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    with os.fdopen(fd, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(['id', 'password'])
+        for user_id, password in state.passwords.items():
+            writer.writerow([user_id, password or ''])
+    print(f"✓ Wrote {len(state.passwords):,} credentials to {path}")
+
+
+def profile_creation(payloads, role_id, serializer_path):
+    """
+    Create payloads in-process inside a rolled-back transaction and time each stage
+
+    Stages: validate (serializer.is_valid), hash (password hasher encode),
+    sql (statements issued by save), save_other (rest of save: signals, model
+    code), serialize (serializer.data, the response body).
+    """
+    import django_env
+
+    django_env.setup()
+    from django.contrib.auth.hashers import get_hasher
+    from django.db import connection, transaction
+    from django.utils.module_loading import import_string
+
+    serializer_class = import_string(serializer_path)
+    hasher = get_hasher('default')
+    hasher_class = type(hasher)
+    original_encode = hasher_class.encode
+    timings = {'validate': [], 'hash': [], 'sql': [], 'save_other': [], 'serialize': [], 'total': []}
+    current = {'hash': 0.0, 'sql': 0.0, 'queries': 0}
+    query_counts = []
+
+    def timed_encode(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_encode(self, *args, **kwargs)
+        finally:
+            current['hash'] += time.perf_counter() - start
+
+    def timed_execute(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            current['sql'] += time.perf_counter() - start
+            current['queries'] += 1
+
+    hasher_class.encode = timed_encode
+    try:
+        with transaction.atomic(), connection.execute_wrapper(timed_execute):
+            for payload in payloads:
+                current.update(hash=0.0, sql=0.0, queries=0)
+                start = time.perf_counter()
+                serializer = serializer_class(data=dict(payload, role_id=role_id))
+                if not serializer.is_valid():
+                    print(f"   ⚠️  {payload['id']}: {serializer.errors}")
+                    continue
+                validated = time.perf_counter()
+                validate_sql = current['sql']
+                serializer.save()
+                saved = time.perf_counter()
+                serializer.data
+                done = time.perf_counter()
+
+                save_sql = current['sql'] - validate_sql
+                timings['validate'].append(validated - start - validate_sql)
+                timings['hash'].append(current['hash'])
+                timings['sql'].append(current['sql'])
+                timings['save_other'].append(max(0.0, saved - validated - save_sql - current['hash']))
+                timings['serialize'].append(done - saved)
+                timings['total'].append(done - start)
+                query_counts.append(current['queries'])
+            transaction.set_rollback(True)
+    finally:
+        hasher_class.encode = original_encode
+
+    if not timings['total']:
+        print("❌ No sample row passed validation")
+        return
+
+    iterations = getattr(hasher, 'iterations', None)
+    print("=" * 70)
+    print(f"USER CREATION COST BREAKDOWN ({len(timings['total'])} users, rolled back)")
+    print(f"   hasher: {hasher.algorithm}" + (f", {iterations:,} iterations" if iterations else ''))
+    print(f"   queries per user: {sum(query_counts) / len(query_counts):.1f}")
+    print("=" * 70)
+    total_mean = summarize(timings['total'])['mean_ms']
+    print(f"{'STAGE':12} {'MEAN ms':>9} {'P50 ms':>9} {'P95 ms':>9} {'SHARE':>7}")
+    for stage, values in timings.items():
+        stats = summarize(values)
+        print(f"{stage:12} {stats['mean_ms']:9.2f} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} "
+              f"{stats['mean_ms'] / total_mean:7.0%}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk alumni importer')
+    parser.add_argument('file', help='CSV or XLSX with one alumnus per row')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=4, help='batches created concurrently')
+    parser.add_argument('--state', help='resume file (default: <file>.import-state.json)')
+    parser.add_argument('--credentials', help='append id,password of the users created by this run to this CSV')
+    parser.add_argument('--dry-run', action='store_true', help='validate and dedupe only')
+    parser.add_argument('--skip-server-check', action='store_true',
+                        help="don't download existing users for dedupe")
+    parser.add_argument('--profile', type=int, metavar='N',
+                        help='time N in-process creations (Django, rolled back) instead of importing')
+    parser.add_argument('--serializer', default='api.serializers.UserSerializer',
+                        help='serializer POST /users/ uses (for --profile)')
+    add_client_arguments(parser)
+    parser.set_defaults(timeout=60)
+    args = parser.parse_args()
+
+    timings = TimingRecorder()
+    client = ApiClient(args.target, timeout=args.timeout, pool_size=args.workers, hooks=[timings])
+    if args.profile:
+        role_id, program_ids = load_reference_orm()
+    else:
+        role_id, program_ids = load_reference(client)
+
+    print("=" * 70)
+    print(f"ALUMNI IMPORT: {args.file} -> {'in-process (rolled back)' if args.profile else client.base_url}")
+    print("=" * 70)
+
+    # Generated passwords must reach someone: only with --credentials (or in the rolled-back profile)
+    generate_password = bool(args.credentials or args.profile)
+    payloads, invalid = [], []
+    for line, raw in enumerate(read_rows(args.file), 2):
+        payload, error = normalize(raw, program_ids, generate_password)
+        if error:
+            invalid.append((line, error))
+        else:
+            payloads.append(dict(payload, role_id=role_id))
+    for line, error in invalid[:20]:
+        print(f"   ⚠️  row {line}: {error}")
+    if len(invalid) > 20:
+        print(f"   ... and {len(invalid) - 20} more invalid rows")
+
+    if args.profile:
+        profile_creation(payloads[:args.profile], role_id, args.serializer)
+        return
+
+    existing_ids, existing_emails = set(), set()
+    if not args.skip_server_check:
+        for user in iter_users(client):
+            existing_ids.add(str(user['id']))
+            if user.get('email'):
+                existing_emails.add(user['email'].lower())
+
+    state = ImportState(args.state or args.file + '.import-state.json', file_digest(args.file))
+    unique, duplicates = dedupe(payloads)
+    pending = [p for p in unique if p['id'] not in state.created]
+    resumed = len(unique) - len(pending)
+    pending, on_server = dedupe(pending, existing_ids, existing_emails)
+    print(f"   {len(payloads) + len(invalid):,} rows: {len(invalid):,} invalid, "
+          f"{len(duplicates):,} duplicates in file, {resumed:,} already imported, "
+          f"{len(on_server):,} already on server, {len(pending):,} to create")
+    for payload, reason in duplicates[:10]:
+        print(f"   ↷ {payload['id']} ({payload['email'] or '-'}): {reason}")
+
+    if args.dry_run or not pending:
+        return
+
+    created, failed, elapsed = run_import(client, pending, state, args.batch_size, args.workers)
+    stats = summarize(timings.samples.get('POST /users/', []))
+    print(f"✅ {created:,} created, ❌ {failed:,} failed in {elapsed:.1f}s "
+          f"({created / max(elapsed, 1e-9):.1f} users/s)")
+    if stats['count']:
+        print(f"   POST /users/ p50 {stats['p50_ms']:.0f} ms | p95 {stats['p95_ms']:.0f} ms | "
+              f"max {stats['max_ms']:.0f} ms")
+    for user_id, error in list(state.failed.items())[:10]:
+        print(f"   ❌ {user_id}: {error}")
+    if state.failed:
+        print(f"   Re-run the same command to retry the {len(state.failed):,} failed rows")
+    if args.credentials:
+        write_credentials(args.credentials, state)
+
+
+if __name__ == '__main__':
+    main()
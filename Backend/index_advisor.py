@@ -0,0 +1,409 @@
+"""
+Query plan and index advisor for the hot ORM filters
+
+Usage:
+    python seed_dataset.py medium                     # a realistic database first
+    python index_advisor.py                           # EXPLAIN + timings + suggestions
+    python index_advisor.py --apply                   # create the suggested indexes, re-measure, drop them
+    python index_advisor.py --apply --keep            # ... and keep them (untracked, see below)
+    python index_advisor.py --write-migration         # put the migration draft in the app's migrations/
+
+Bootstraps Django in-process (like test_survey_11.py) and runs the querysets
+behind the hot access paths against the configured database:
+
+    sections               Section.objects.filter(survey=...).order_by('order', 'id')
+    questions              Question.objects.filter(section=...).order_by('order', 'id')
+    alumni                 users with the Alumni role (test_user_management.py)
+    answers_by_question    Answer.objects.filter(question=...)
+    answers_by_program     a survey's answers of one program study's alumni
+
+Each plan comes from the backend's EXPLAIN (SQLite, PostgreSQL or MySQL) and
+is checked for full table scans and sort steps (temp B-tree / Sort /
+filesort). For flagged queries the advisor proposes the composite index that
+serves both the filter and the ordering, unless an existing index already
+starts with those columns, and prints a migration draft (AddIndexConcurrently
+on PostgreSQL). --apply creates the indexes on the live database, ANALYZEs the
+tables and measures plans and timings again.
+
+--keep leaves those indexes in place outside migrations: the draft then has
+to be recorded with `migrate --fake`, so it can't be combined with
+--write-migration (a plain migrate of the written file would fail on the
+existing index).
+"""
+import argparse
+import re
+import time
+
+import django_env
+
+django_env.setup()
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, models
+from django.db.migrations.loader import MigrationLoader
+
+from latency_stats import summarize
+from seed_dataset import ALUMNI_ROLE, find_model
+
+
+def load_models():
+    """Model name -> class; None for models this project doesn't have"""
+    found = {'User': get_user_model()}
+    for name in ('Role', 'ProgramStudy', 'Survey', 'Section', 'Question', 'Answer'):
+        try:
+            found[name] = find_model(name)
+        except LookupError:
+            found[name] = None
+    return found
+
+
+def has_field(model, name):
+    try:
+        model._meta.get_field(name)
+        return True
+    except FieldDoesNotExist:
+        return False
+
+
+def answers_by_program(m, p):
+    """A survey's answers of one program study's alumni (join when Answer.user is a FK)"""
+    Answer, User = m['Answer'], m['User']
+    answers = Answer.objects.filter(survey=p['survey'])
+    if has_field(Answer, 'user') and Answer._meta.get_field('user').is_relation:
+        return answers.filter(user__program_study=p['program_study'])
+    return answers.filter(user_id__in=User.objects.filter(program_study=p['program_study']).values('pk'))
+
+
+# name -> (models needed, sample parameters needed, queryset builder, candidate indexes)
+HOT_QUERIES = {
+    'sections': (
+        ('Section',), ('survey',),
+        lambda m, p: m['Section'].objects.filter(survey=p['survey']).order_by('order', 'id'),
+        [('Section', ['survey', 'order', 'id'])]),
+    'questions': (
+        ('Question',), ('section',),
+        lambda m, p: m['Question'].objects.filter(section=p['section']).order_by('order', 'id'),
+        [('Question', ['section', 'order', 'id'])]),
+    'alumni': (
+        ('User', 'Role'), ('role',),
+        lambda m, p: m['User'].objects.filter(role=p['role']).order_by('id'),
+        [('User', ['role', 'id'])]),
+    'answers_by_question': (
+        ('Answer',), ('question',),
+        lambda m, p: m['Answer'].objects.filter(question=p['question']),
+        [('Answer', ['question'])]),
+    'answers_by_program': (
+        ('Answer', 'User', 'ProgramStudy'), ('survey', 'program_study'),
+        answers_by_program,
+        [('User', ['program_study', 'id']), ('Answer', ['user', 'survey'])]),
+}
+
+
+def pick_params(m, overrides):
+    """Sample filter values taken from the seeded data (or the command line)"""
+    params = {'survey': overrides.survey}
+    if m['Answer']:
+        params['question'] = overrides.question or m['Answer'].objects.values_list('question', flat=True).last()
+        params['survey'] = params['survey'] or m['Answer'].objects.values_list('survey', flat=True).last()
+    if m['Section']:
+        params['survey'] = params['survey'] or m['Section'].objects.values_list('survey', flat=True).last()
+        params['section'] = overrides.section or m['Section'].objects.filter(
+            survey=params['survey']).values_list('pk', flat=True).first()
+    if m['Role']:
+        params['role'] = m['Role'].objects.filter(name=ALUMNI_ROLE).values_list('pk', flat=True).first()
+    if m['ProgramStudy']:
+        alumni = m['User'].objects.filter(role=params.get('role')) if params.get('role') else m['User'].objects
+        params['program_study'] = overrides.program_study or alumni.exclude(
+            program_study=None).values_list('program_study', flat=True).last()
+    return params
+
+
+# ---- EXPLAIN --------------------------------------------------------------
+
+def explain(queryset):
+    """(plan lines, findings); findings are ('seq scan', table) / ('sort', table or None)"""
+    sql, params = queryset.query.sql_with_params()
+    vendor = connection.vendor
+    lines, findings = [], []
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            for row in cursor.fetchall():
+                detail = row[-1]
+                lines.append(detail)
+                scan = re.match(r'SCAN (\S+)$', detail)  # 'SCAN t USING INDEX' walks an index
+                if scan:
+                    findings.append(('seq scan', scan.group(1)))
+                if 'USE TEMP B-TREE FOR' in detail:
+                    findings.append(('sort', None))
+        elif vendor == 'postgresql':
+            cursor.execute(f"EXPLAIN {sql}", params)
+            for (line,) in cursor.fetchall():
+                lines.append(line)
+                scan = re.search(r'Seq Scan on (\S+)', line)
+                if scan:
+                    findings.append(('seq scan', scan.group(1)))
+                if re.search(r'(^|->\s+)(Incremental )?Sort\s+\(', line.strip()):
+                    findings.append(('sort', None))
+        elif vendor == 'mysql':
+            cursor.execute(f"EXPLAIN {sql}", params)
+            columns = [c[0].lower() for c in cursor.description]
+            for values in cursor.fetchall():
+                row = dict(zip(columns, values))
+                lines.append(f"{row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                             f"rows={row.get('rows')} {row.get('extra') or ''}".rstrip())
+                if row.get('type') == 'ALL':
+                    findings.append(('seq scan', row.get('table')))
+                if 'filesort' in (row.get('extra') or ''):
+                    findings.append(('sort', row.get('table')))
+        else:
+            lines.append(f"(EXPLAIN parsing not implemented for {vendor})")
+    return lines, findings
+
+
+def time_queryset(queryset, repeat):
+    """Database time only: the SQL is executed and fetched without building model instances"""
+    sql, params = queryset.query.sql_with_params()
+    samples = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)  # warm the page cache
+        rows = len(cursor.fetchall())
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            samples.append(time.perf_counter() - start)
+    return rows, summarize(samples)
+
+
+def measure(m, params, names, repeat):
+    results = {}
+    for name in names:
+        _, _, build, _ = HOT_QUERIES[name]
+        queryset = build(m, params)
+        lines, findings = explain(queryset)
+        rows, latency = time_queryset(queryset, repeat)
+        results[name] = {'plan': lines, 'findings': findings, 'rows': rows, 'latency': latency}
+    return results
+
+
+# ---- suggestions ----------------------------------------------------------
+
+def columns_for(model, fields):
+    """Field names -> db columns; None when a field doesn't exist on this model"""
+    columns = []
+    for name in fields:
+        try:
+            columns.append(model._meta.get_field(name).column)
+        except FieldDoesNotExist:
+            try:
+                columns.append(model._meta.get_field(f"{name}_id").column)
+            except FieldDoesNotExist:
+                return None
+    return columns
+
+
+def field_names_for(model, fields):
+    return [name if has_field(model, name) else f"{name}_id" for name in fields]
+
+
+def existing_indexes(model):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return [c['columns'] for c in constraints.values() if c['index'] or c['primary_key'] or c['unique']]
+
+
+def suggest(m, results):
+    """[(model, models.Index, reason)] for flagged queries not served by an existing index"""
+    suggestions, seen = [], set()
+    for name, result in results.items():
+        if not result['findings']:
+            continue
+        tables = {table for kind, table in result['findings'] if kind == 'seq scan'}
+        sorts = any(kind == 'sort' for kind, _ in result['findings'])
+        for model_name, fields in HOT_QUERIES[name][3]:
+            model = m[model_name]
+            columns = columns_for(model, fields)
+            if columns is None or (model._meta.db_table, tuple(columns)) in seen:
+                continue
+            if model._meta.db_table not in tables and not (sorts and len(columns) > 1):
+                continue
+            if any(existing[:len(columns)] == columns for existing in existing_indexes(model)):
+                continue
+            seen.add((model._meta.db_table, tuple(columns)))
+            index = models.Index(fields=field_names_for(model, fields))
+            index.set_name_with_model(model)
+            reason = ', '.join(f"{kind} {table or ''}".strip() for kind, table in result['findings'])
+            suggestions.append((model, index, f"{name}: {reason}"))
+    return suggestions
+
+
+def migration_drafts(suggestions):
+    """app_label -> (file name, source) of an AddIndex migration"""
+    loader = MigrationLoader(connection, ignore_no_migrations=True)
+    concurrent = connection.vendor == 'postgresql'
+    by_app = {}
+    for model, index, reason in suggestions:
+        by_app.setdefault(model._meta.app_label, []).append((model, index, reason))
+
+    drafts = {}
+    for app_label, items in by_app.items():
+        leaves = sorted(loader.graph.leaf_nodes(app_label))
+        number = int(re.match(r'\d*', leaves[-1][1]).group() or 0) + 1 if leaves else 1
+        operation = 'AddIndexConcurrently' if concurrent else 'migrations.AddIndex'
+        lines = [
+            f"# Drafted by index_advisor.py on {time.strftime('%Y-%m-%d %H:%M')}",
+            "# Add the same models.Index entries to each model's Meta.indexes, or the",
+            "# next makemigrations will want to remove them.",
+        ]
+        if concurrent:
+            lines.append("from django.contrib.postgres.operations import AddIndexConcurrently")
+        lines += ["from django.db import migrations, models", "", "",
+                  "class Migration(migrations.Migration):", ""]
+        if concurrent:
+            lines += ["    atomic = False  # CREATE INDEX CONCURRENTLY can't run in a transaction", ""]
+        lines.append("    dependencies = [")
+        lines += [f"        {leaf!r}," for leaf in leaves]
+        lines += ["    ]", "", "    operations = ["]
+        for model, index, reason in items:
+            lines += [
+                f"        # {reason}",
+                f"        {operation}(",
+                f"            model_name={model._meta.model_name!r},",
+                f"            index=models.Index(fields={index.fields!r}, name={index.name!r}),",
+                "        ),",
+            ]
+        lines += ["    ]", ""]
+        drafts[app_label] = (f"{number:04d}_hot_path_indexes.py", '\n'.join(lines))
+    return drafts, loader
+
+
+def apply_indexes(suggestions):
+    with connection.schema_editor() as editor:
+        for model, index, _ in suggestions:
+            editor.add_index(model, index)
+    analyze({model for model, _, _ in suggestions})
+
+
+def drop_indexes(suggestions):
+    with connection.schema_editor() as editor:
+        for model, index, _ in suggestions:
+            editor.remove_index(model, index)
+
+
+def analyze(touched):
+    """Refresh planner statistics so the new indexes are considered"""
+    keyword = 'ANALYZE TABLE' if connection.vendor == 'mysql' else 'ANALYZE'
+    with connection.cursor() as cursor:
+        for model in touched:
+            cursor.execute(f"{keyword} {connection.ops.quote_name(model._meta.db_table)}")
+
+
+# ---- report ---------------------------------------------------------------
+
+def print_plans(title, results):
+    print("\n" + "=" * 78)
+    print(title)
+    print("=" * 78)
+    for name, result in results.items():
+        flags = ', '.join(f"{kind} {table or ''}".strip() for kind, table in result['findings'])
+        print(f"\n{'⚠️ ' if flags else '✅'} {name}: {result['rows']:,} rows, "
+              f"p50 {result['latency']['p50_ms']:.2f} ms{f'  [{flags}]' if flags else ''}")
+        for line in result['plan']:
+            print(f"     {line}")
+
+
+def print_comparison(before, after):
+    print("\n" + "=" * 78)
+    print("BEFORE / AFTER")
+    print("=" * 78)
+    print(f"{'QUERY':22} {'FLAGS':>6} {'->':>3} {'FLAGS':>6} {'P50 ms':>9} {'->':>3} {'P50 ms':>9} {'SPEEDUP':>8}")
+    for name in before:
+        b, a = before[name], after[name]
+        speedup = b['latency']['p50_ms'] / a['latency']['p50_ms'] if a['latency']['p50_ms'] else float('inf')
+        print(f"{name:22} {len(b['findings']):6} {'->':>3} {len(a['findings']):6} "
+              f"{b['latency']['p50_ms']:9.2f} {'->':>3} {a['latency']['p50_ms']:9.2f} {speedup:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN the hot ORM querysets and suggest indexes')
+    parser.add_argument('--query', action='append', choices=list(HOT_QUERIES), help='limit to these queries')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per query')
+    parser.add_argument('--survey', type=int, help='survey id to filter on')
+    parser.add_argument('--section', type=int, help='section id to filter on')
+    parser.add_argument('--question', type=int, help='question id to filter on')
+    parser.add_argument('--program-study', type=int, help='program study id to filter on')
+    parser.add_argument('--apply', action='store_true', help='create the suggested indexes and re-measure')
+    parser.add_argument('--keep', action='store_true', help='with --apply: keep the indexes afterwards')
+    parser.add_argument('--write-migration', action='store_true',
+                        help="write the migration draft into the app's migrations package")
+    args = parser.parse_args()
+    if args.keep and not args.apply:
+        parser.error("--keep only makes sense with --apply")
+    if args.keep and args.write_migration:
+        # migrate would then try to create indexes that already exist
+        parser.error("--keep creates the indexes outside migrations; don't combine it with --write-migration")
+
+    m = load_models()
+    params = pick_params(m, args)
+    names = []
+    for name in args.query or HOT_QUERIES:
+        needed_models, needed_params = HOT_QUERIES[name][:2]
+        missing = [n for n in needed_models if m.get(n) is None] + [p for p in needed_params if params.get(p) is None]
+        if missing:
+            print(f"⏭  {name}: skipped (no {', '.join(missing)} in this database)")
+        else:
+            names.append(name)
+
+    print("=" * 78)
+    print(f"INDEX ADVISOR ({connection.vendor}, {connection.settings_dict['NAME']})")
+    print(f"   sample filters: {', '.join(f'{k}={v}' for k, v in params.items())}")
+    print("=" * 78)
+    before = measure(m, params, names, args.repeat)
+    print_plans("QUERY PLANS", before)
+
+    suggestions = suggest(m, before)
+    print("\n" + "=" * 78)
+    if not suggestions:
+        print("✅ No index suggestions: every hot query is served by an existing index")
+        print("=" * 78)
+        return
+    print(f"💡 {len(suggestions)} SUGGESTED INDEXES")
+    print("=" * 78)
+    for model, index, reason in suggestions:
+        print(f"   {model._meta.label}: {index.fields} ({index.name})  <- {reason}")
+
+    drafts, loader = migration_drafts(suggestions)
+    for app_label, (filename, source) in drafts.items():
+        if args.write_migration:
+            module_name, _ = loader.migrations_module(app_label)
+            package = __import__(module_name, fromlist=['__path__'])
+            path = f"{package.__path__[0]}/{filename}"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            print(f"\n✓ Wrote {path}")
+        else:
+            print(f"\n--- {app_label}/migrations/{filename} (draft) ---")
+            print(source)
+
+    if args.apply:
+        print("\n🔧 Creating the suggested indexes...")
+        apply_indexes(suggestions)
+        try:
+            after = measure(m, params, names, args.repeat)
+            print_plans("QUERY PLANS WITH THE SUGGESTED INDEXES", after)
+            print_comparison(before, after)
+        finally:
+            if not args.keep:
+                drop_indexes(suggestions)
+                print("\n🧹 Dropped the indexes again (--keep to leave them in place)")
+        if args.keep:
+            print("\n⚠️  The kept indexes are not tracked by any migration and are lost when the")
+            print("   database is rebuilt. To track them, save the draft above as a migration and")
+            print("   mark it applied with: python manage.py migrate <app_label> <migration> --fake")
+        print("=" * 78)
+
+
+if __name__ == '__main__':
+    main()
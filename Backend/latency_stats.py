@@ -0,0 +1,43 @@
+"""
+Latency statistics shared by the Backend benchmark and load-test scripts
+"""
+import math
+
+
+def percentile(sorted_values, q):
+    """
+    Return the q-th percentile (0-100) of an already sorted list
+
+    Uses linear interpolation between the two closest ranks, the same as
+    numpy's default, so results match spreadsheet/numpy checks.
+    """
+    if not sorted_values:
+        return float('nan')
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    fraction = rank - low
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * fraction
+
+
+def summarize(samples):
+    """
+    Summarize latency samples (seconds) as a dict of milliseconds
+
+    Keys: count, mean_ms, min_ms, p50_ms, p95_ms, p99_ms, max_ms
+    """
+    values = sorted(samples)
+    if not values:
+        return {'count': 0}
+    to_ms = 1000.0
+    return {
+        'count': len(values),
+        'mean_ms': sum(values) / len(values) * to_ms,
+        'min_ms': values[0] * to_ms,
+        'p50_ms': percentile(values, 50) * to_ms,
+        'p95_ms': percentile(values, 95) * to_ms,
+        'p99_ms': percentile(values, 99) * to_ms,
+        'max_ms': values[-1] * to_ms,
+    }
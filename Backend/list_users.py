@@ -1,14 +1,175 @@
-import requests
+"""
+List (or export) every user from the backend
+
+Usage:
+    python list_users.py                               # table, as before
+    python list_users.py --format csv --output users.csv
+    python list_users.py --format ndjson --page-size 1000 > users.ndjson
+
+Users are streamed: a paginated endpoint is walked page by page, and a plain
+JSON array is parsed incrementally from the response body, so rows are printed
+as soon as they arrive and memory stays flat however many users there are.
+"""
+import argparse
+import codecs
+import csv
 import json
+import sys
+
+from api_client import ApiClient, add_client_arguments
+
+CSV_COLUMNS = ['id', 'username', 'email', 'phone_number', 'role', 'fakultas', 'program_study']
+# ?fields= for the table view and test_user_list.py (ignored by servers
+# without sparse_fields.SparseFieldsMixin)
+USER_SUMMARY_FIELDS = 'id,username,role.name,fakultas'
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a top-level JSON array from an iterable of byte chunks
+
+    Only the element currently being decoded is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Response body is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # element continues in the next chunk
+            yield item
+    if buffer[pos:].strip():
+        raise ValueError("Truncated JSON array in response body")
+
+
+def iter_users(client, page_size=500, fields=None):
+    """Yield user dicts one at a time (see iter_records)"""
+    return iter_records(client, '/users/', page_size, fields)
+
+
+def iter_records(client, path, page_size=500, fields=None):
+    """
+    Yield the records of a list endpoint one at a time
+
+    Sends ?page_size=... (and ?fields=... when given); if the server answers
+    with a paginated object ({"results": [...], "next": url}) the pages are
+    followed, otherwise the plain array body is parsed incrementally while it
+    downloads.
+    """
+    params = {'page_size': page_size}
+    if fields:
+        params['fields'] = fields
+    while path:
+        response = client.get(path, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            chunks = response.iter_content(CHUNK_SIZE)
+            first = b''
+            for chunk in chunks:
+                first += chunk
+                if first.strip():
+                    break
+
+            if first.lstrip()[:1] == b'[':
+                yield from iter_json_array(_prepend(first, chunks))
+                return
+
+            page = json.loads(first + b''.join(chunks))
+        finally:
+            response.close()
+        yield from page.get('results', [])
+        path = page.get('next')
+        params = None  # 'next' already carries the query string
+
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
+
+
+def role_name(user):
+    return user.get('role', {}).get('name', 'No role') if user.get('role') else 'No role'
+
+
+def program_study_name(user):
+    """Program study name, whether the API nests it or sends an id plus program_study_name"""
+    if user.get('program_study_name'):
+        return user['program_study_name']
+    program_study = user.get('program_study')
+    if isinstance(program_study, dict):
+        return program_study.get('name') or program_study.get('nama') or ''
+    return ''
+
+
+def flat_row(user):
+    """Flatten a user dict to the CSV_COLUMNS"""
+    row = {column: user.get(column, '') for column in CSV_COLUMNS}
+    row['role'] = role_name(user)
+    row['program_study'] = program_study_name(user)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List or export users')
+    parser.add_argument('--format', choices=['table', 'csv', 'ndjson'], default='table')
+    parser.add_argument('--output', help='write to this file instead of stdout')
+    parser.add_argument('--page-size', type=int, default=500)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    client = ApiClient(args.target, timeout=args.timeout)
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    total = 0
+    try:
+        if args.format == 'table':
+            print("=" * 60, file=out)
+            print("USERS IN DATABASE", file=out)
+            print("=" * 60, file=out)
+        elif args.format == 'csv':
+            writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+
+        fields = USER_SUMMARY_FIELDS if args.format == 'table' else None
+        for user in iter_users(client, page_size=args.page_size, fields=fields):
+            total += 1
+            if args.format == 'table':
+                print(f"ID: {user['id']:15} | Name: {user['username']:20} | Role: {role_name(user)}", file=out)
+            elif args.format == 'csv':
+                writer.writerow(flat_row(user))
+            else:
+                out.write(json.dumps(user, ensure_ascii=False) + '\n')
+            if args.output is None and total % 1000 == 0:
+                out.flush()
+
+        if args.format == 'table':
+            print("=" * 60, file=out)
+            print(f"Total users: {total}", file=out)
+    finally:
+        if args.output:
+            out.close()
+    if args.output:
+        print(f"✓ Exported {total} users to {args.output}")
+
 
-response = requests.get("http://localhost:8000/api/users/")
-users = response.json()
-
-print("=" * 60)
-print("USERS IN DATABASE")
-print("=" * 60)
-for user in users:
-    role_name = user.get('role', {}).get('name', 'No role') if user.get('role') else 'No role'
-    print(f"ID: {user['id']:15} | Name: {user['username']:20} | Role: {role_name}")
-print("=" * 60)
-print(f"Total users: {len(users)}")
+if __name__ == '__main__':
+    main()
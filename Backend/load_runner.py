@@ -0,0 +1,228 @@
+"""
+LOAD TEST RUNNER - Replays the smoke-test scenarios under concurrency
+Usage:
+    python load_runner.py --concurrency 20 --duration 30
+    python load_runner.py --concurrency 50 --rate 200 --requests 5000 --include-writes
+    python load_runner.py --target production --concurrency 5 --duration 10
+    python load_runner.py --json results.json
+
+Sends the same requests as final_test.py / test_flutter_scenarios.py /
+test_api.py, but from a thread pool sharing one pooled HTTP session, and
+reports throughput and p50/p95/p99 latency per endpoint.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api_client import ApiClient, add_client_arguments, resolve_base_url
+from latency_stats import summarize
+
+# name, method, path, weight. {survey_id} is filled from GET /surveys/
+READ_SCENARIOS = [
+    ('GET /users/', 'GET', '/users/', 3),
+    ('GET /roles/', 'GET', '/roles/', 2),
+    ('GET /surveys/', 'GET', '/surveys/', 2),
+    ('GET /unit/program-studies/', 'GET', '/unit/program-studies/', 1),
+]
+WRITE_SCENARIOS = [
+    ('POST /surveys/{id}/answers/', 'POST', '/surveys/{survey_id}/answers/', 1),
+]
+
+
+def discover_survey_id(client):
+    """Return the first survey id, as final_test.py does, or None"""
+    surveys = client.get_json("/surveys/")
+    if isinstance(surveys, dict):
+        surveys = surveys.get('results', [])
+    return surveys[0]['id'] if surveys else None
+
+
+def answer_payload(worker_id, sequence):
+    """Same answer shape final_test.py submits"""
+    return {
+        "user_id": "11221037",
+        "question_id": 1,
+        "answer_text": f"Load test answer {worker_id}-{sequence}",
+        "answer_value": "5",
+    }
+
+
+class LoadResults:
+    """Thread-safe collector of per-endpoint latencies and failures"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, elapsed, status=None, error=False):
+        with self._lock:
+            if error:
+                self.errors[name] += 1
+            else:
+                self.latencies[name].append(elapsed)
+            self.statuses[name][status if status is not None else 'error'] += 1
+
+    def report(self, wall_time):
+        """Per-endpoint dict of throughput, error rate and latency stats"""
+        report = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            stats = summarize(self.latencies[name])
+            total = stats['count'] + self.errors[name]
+            stats['errors'] = self.errors[name]
+            stats['error_rate'] = self.errors[name] / total if total else 0.0
+            stats['throughput_rps'] = total / wall_time if wall_time else 0.0
+            stats['statuses'] = {str(k): v for k, v in self.statuses[name].items()}
+            report[name] = stats
+        return report
+
+
+def run_load(target, concurrency, duration=None, total_requests=None, rate=None,
+             include_writes=False, timeout=5, seed=None):
+    """
+    Replay the scenario mix against the target API
+
+    Args:
+        target: 'local', 'production' or an API base URL (see api_client)
+        concurrency: Number of worker threads (and pooled connections)
+        duration: Stop after this many seconds (if set)
+        total_requests: Stop after this many requests (if set)
+        rate: Overall target requests/second (None = as fast as possible)
+        include_writes: Also POST survey answers (never enable against production)
+        timeout: Per-request timeout in seconds
+        seed: Random seed for the scenario mix
+
+    Returns (report, wall_time) where report is LoadResults.report().
+    """
+    if duration is None and total_requests is None:
+        raise ValueError("Set duration and/or total_requests")
+
+    # One keep-alive connection per worker; no retries so every sample is
+    # a single request
+    client = ApiClient(target, timeout=timeout, retries=0, pool_size=concurrency)
+    scenarios = list(READ_SCENARIOS)
+    survey_id = None
+    if include_writes:
+        survey_id = discover_survey_id(client)
+        if survey_id is None:
+            print("⚠️  No surveys in database, answer submission scenario skipped")
+        else:
+            scenarios += WRITE_SCENARIOS
+
+    names = [s[0] for s in scenarios]
+    weights = [s[3] for s in scenarios]
+    by_name = {s[0]: s for s in scenarios}
+    rng = random.Random(seed)
+    mix_lock = threading.Lock()
+
+    results = LoadResults()
+    ticket = itertools.count()
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def next_slot():
+        """Claim the next request number and, with --rate, its start time"""
+        n = next(ticket)
+        if total_requests is not None and n >= total_requests:
+            return None
+        scheduled = start + n / rate if rate else None
+        if deadline and (scheduled or time.perf_counter()) >= deadline:
+            return None
+        return n, scheduled
+
+    def worker(worker_id):
+        while True:
+            slot = next_slot()
+            if slot is None:
+                return
+            n, scheduled = slot
+            if scheduled:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            with mix_lock:
+                name = rng.choices(names, weights)[0]
+            _, method, path, _ = by_name[name]
+            body = answer_payload(worker_id, n) if method == 'POST' else None
+
+            sent = time.perf_counter()
+            try:
+                response = client.request(method, path.format(survey_id=survey_id), json=body)
+                elapsed = time.perf_counter() - sent
+                results.record(name, elapsed, response.status_code,
+                               error=response.status_code >= 400)
+            except requests.RequestException:
+                results.record(name, time.perf_counter() - sent, error=True)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, i) for i in range(concurrency)]:
+            future.result()
+    wall_time = time.perf_counter() - start
+    client.close()
+    return results.report(wall_time), wall_time
+
+
+def print_report(report, wall_time):
+    total = sum(stats['count'] + stats['errors'] for stats in report.values())
+    print("\n" + "=" * 100)
+    print(f"{'ENDPOINT':34} {'REQS':>7} {'ERR%':>6} {'RPS':>8} {'P50 ms':>9} {'P95 ms':>9} {'P99 ms':>9} {'MAX ms':>9}")
+    print("=" * 100)
+    for name, stats in report.items():
+        count = stats['count'] + stats['errors']
+        if stats['count']:
+            latency = (f"{stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} "
+                       f"{stats['p99_ms']:9.1f} {stats['max_ms']:9.1f}")
+        else:
+            latency = f"{'-':>9} {'-':>9} {'-':>9} {'-':>9}"
+        print(f"{name:34} {count:7d} {stats['error_rate'] * 100:5.1f}% "
+              f"{stats['throughput_rps']:8.1f} {latency}")
+    print("=" * 100)
+    print(f"📊 {total} requests in {wall_time:.2f}s = {total / wall_time:.1f} req/s overall")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent load test for the tracer study API')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=None, help='seconds to run')
+    parser.add_argument('--requests', type=int, default=None, help='total requests to send')
+    parser.add_argument('--rate', type=float, default=None, help='target requests/second (default: unthrottled)')
+    parser.add_argument('--include-writes', action='store_true',
+                        help='also POST survey answers (local/dev databases only)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', metavar='PATH', help='write the report as JSON')
+    add_client_arguments(parser)
+    parser.set_defaults(timeout=5)
+    args = parser.parse_args()
+    if args.duration is None and args.requests is None:
+        args.duration = 10
+
+    print("=" * 70)
+    print("LOAD TEST")
+    print("=" * 70)
+    print(f"   Target: {resolve_base_url(args.target)}")
+    print(f"   Concurrency: {args.concurrency}, rate: {args.rate or 'unthrottled'} req/s")
+
+    report, wall_time = run_load(
+        args.target, args.concurrency, duration=args.duration,
+        total_requests=args.requests, rate=args.rate,
+        include_writes=args.include_writes, timeout=args.timeout, seed=args.seed,
+    )
+    print_report(report, wall_time)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'wall_time_s': wall_time, 'concurrency': args.concurrency,
+                       'rate': args.rate, 'endpoints': report}, f, indent=2)
+        print(f"✓ Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
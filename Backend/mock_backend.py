@@ -0,0 +1,473 @@
+"""
+Local stand-in for the Django backend, for offline client benchmarking
+
+Usage:
+    python mock_backend.py                                   # http://127.0.0.1:8765/api
+    python mock_backend.py --users 5000 --latency 40 --jitter 20 --error-rate 0.02
+    TRACER_API_TARGET=mock python status_check.py            # point any script at it
+
+In-process (CI, benchmarks):
+    from mock_backend import serve_in_background
+    server, base_url = serve_in_background(users=1000, latency_ms=20)
+    client = ApiClient(base_url)
+    ...
+    server.shutdown()
+
+Serves the routes and response shapes the scripts and the app use
+(/users/, /roles/, /surveys/ with sections, questions and answers,
+/unit/faculties|departments|program-studies/, /periodes/) from a fixture
+generated from --seed, so two runs with the same options answer identically.
+
+Knobs:
+    --latency/--jitter   added server time per request (ms)
+    --error-rate         share of requests answered with 503
+    --pad-bytes          filler added to every record, to inflate payloads
+    --paginate N         DRF-style {count, next, previous, results} pages
+                         (page_size query parameter honoured)
+
+List endpoints honour ?fields=id,username,role.name like the backend's
+sparse_fields.SparseFieldsMixin. /reference/ serves the reference bundle with
+an ETag and answers a matching If-None-Match with 304, like
+reference_bundle.ReferenceBundleView.
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from seed_dataset import QUESTION_TYPES, CHOICES, answer_for
+from reference_data import REFERENCE_ENDPOINTS, REFERENCE_PATH, etag_for, etag_matches
+from sparse_fields import FIELDS_PARAM, parse_fields, prune
+
+DEFAULT_PORT = 8765
+
+ROLES = [
+    {'id': 1, 'name': 'Admin'},
+    {'id': 2, 'name': 'Surveyor'},
+    {'id': 3, 'name': 'Tim Tracer'},
+    {'id': 4, 'name': 'Alumni'},
+]
+FACULTIES = ['Fakultas Sains dan Teknologi Informasi', 'Fakultas Rekayasa dan Teknologi Industri',
+             'Fakultas Pembangunan Berkelanjutan']
+PROGRAMS_PER_DEPARTMENT = 2
+DEPARTMENTS_PER_FACULTY = 3
+
+
+def build_fixture(users=200, surveys=2, sections=3, questions=5, completion=0.6, seed=42):
+    """Generate the whole dataset the server answers from"""
+    rng = random.Random(seed)
+    data = {'roles': [dict(role) for role in ROLES], 'faculties': [], 'departments': [],
+            'program_studies': [], 'periodes': [], 'users': [], 'surveys': [],
+            'sections': {}, 'questions': {}, 'answers': {}}
+
+    ids = itertools.count(1)
+    for f, faculty_name in enumerate(FACULTIES, 1):
+        data['faculties'].append({'id': f, 'name': faculty_name})
+        for _ in range(DEPARTMENTS_PER_FACULTY):
+            d = len(data['departments']) + 1
+            data['departments'].append({'id': d, 'name': f"Jurusan {d}", 'faculty': f,
+                                        'faculty_name': faculty_name})
+            for _ in range(PROGRAMS_PER_DEPARTMENT):
+                p = next(ids)
+                data['program_studies'].append({'id': p, 'name': f"Program Studi {p}", 'department': d,
+                                                'department_name': f"Jurusan {d}",
+                                                'faculty': f, 'faculty_name': faculty_name})
+
+    for year in range(2020, 2020 + max(surveys, 1)):
+        data['periodes'].append({'id': len(data['periodes']) + 1, 'name': f"Periode {year}",
+                                 'start_date': f"{year}-01-01", 'end_date': f"{year}-12-31"})
+
+    alumni_role = data['roles'][3]
+    for n in range(users):
+        program = rng.choice(data['program_studies'])
+        role = alumni_role if n >= 5 else data['roles'][n % 3]
+        user_id = f"1{rng.randint(1, 4)}{20 + rng.randint(0, 4)}{n:05d}"
+        data['users'].append({
+            'id': user_id,
+            'username': f"Alumni {n}" if role is alumni_role else f"Staff {n}",
+            'email': f"{user_id}@student.itk.ac.id",
+            'phone_number': f"08{rng.randint(10**9, 10**10 - 1)}",
+            'role': role,
+            'program_study': program['id'],
+            'program_study_name': program['name'],
+            'fakultas': program['faculty_name'],
+            'nim': user_id,
+        })
+
+    alumni = [u['id'] for u in data['users'] if u['role'] is alumni_role]
+    question_ids = itertools.count(1)
+    section_ids = itertools.count(1)
+    answer_ids = itertools.count(1)
+    for s in range(1, surveys + 1):
+        data['surveys'].append({'id': s, 'title': f"Tracer Study {2019 + s}", 'description': '',
+                                'is_active': True, 'survey_type': 'exit', 'periode': s})
+        survey_questions = []
+        data['sections'][s] = []
+        for order in range(sections):
+            section_id = next(section_ids)
+            data['sections'][s].append({'id': section_id, 'survey': s, 'title': f"Bagian {order + 1}",
+                                        'description': '', 'order': order})
+            data['questions'][section_id] = []
+            for q in range(questions):
+                question_type = rng.choice(QUESTION_TYPES)
+                question = {'id': next(question_ids), 'section': section_id, 'order': q,
+                            'text': f"Pertanyaan {order + 1}.{q + 1}", 'question_type': question_type,
+                            'options': CHOICES if question_type in ('radio', 'checkbox', 'dropdown') else [],
+                            'is_required': True, 'description': None}
+                data['questions'][section_id].append(question)
+                survey_questions.append(question)
+
+        data['answers'][s] = []
+        for user_id in alumni:
+            if rng.random() > completion:
+                continue
+            for question in survey_questions:
+                text, value = answer_for(question['question_type'], rng)
+                data['answers'][s].append({'id': next(answer_ids), 'survey': s, 'user_id': user_id,
+                                           'question_id': question['id'], 'answer_text': text,
+                                           'answer_value': value})
+    data['next_ids'] = {'answer': answer_ids, 'survey': itertools.count(surveys + 1),
+                        'section': section_ids, 'question': question_ids}
+    return data
+
+
+def positive_int(value):
+    """int(value) when it is a positive integer string, else None"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+class MockBackend:
+    """Route table + knobs; one instance is shared by all handler threads"""
+
+    def __init__(self, data, latency_ms=0, jitter_ms=0, error_rate=0.0, pad_bytes=0,
+                 paginate=None, seed=42):
+        self.data = data
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.padding = 'x' * pad_bytes
+        self.paginate = paginate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self._reference = None
+        self.routes = [
+            ('GET', r'/roles/', lambda m, q, b: self.listing(self.data['roles'], q)),
+            ('GET', r'/users/', lambda m, q, b: self.listing(self.data['users'], q)),
+            ('POST', r'/users/', self.create_user),
+            ('GET', r'/users/(?P<user_id>[^/]+)/', self.get_user),
+            ('DELETE', r'/users/(?P<user_id>[^/]+)/', self.delete_user),
+            ('GET', r'/unit/faculties/', lambda m, q, b: self.listing(self.data['faculties'], q)),
+            ('GET', r'/unit/departments/', lambda m, q, b: self.listing(self.data['departments'], q)),
+            ('GET', r'/unit/program-studies/', lambda m, q, b: self.listing(self.data['program_studies'], q)),
+            ('GET', r'/periodes/', lambda m, q, b: self.listing(self.data['periodes'], q)),
+            ('GET', REFERENCE_PATH, self.reference),
+            ('GET', r'/surveys/', lambda m, q, b: self.listing(self.data['surveys'], q)),
+            ('POST', r'/surveys/', self.create_survey),
+            ('GET', r'/surveys/(?P<survey_id>\d+)/', self.get_survey),
+            ('GET', r'/surveys/(?P<survey_id>\d+)/sections/', self.list_sections),
+            ('GET', r'/surveys/(?P<survey_id>\d+)/sections/(?P<section_id>\d+)/questions/', self.list_questions),
+            ('GET', r'/surveys/(?P<survey_id>\d+)/answers/', self.list_answers),
+            ('POST', r'/surveys/(?P<survey_id>\d+)/answers/', self.create_answer),
+            ('POST', r'/surveys/(?P<survey_id>\d+)/answers/bulk/', self.create_answers_bulk),
+        ]
+        self.routes = [(method, re.compile(f"^/api{pattern}$"), view) for method, pattern, view in self.routes]
+
+    # ---- dispatch -------------------------------------------------------
+
+    def handle(self, method, path, query, body):
+        """Returns (status, payload); payload None means no body"""
+        self.delay()
+        if self.error_rate and self.roll() < self.error_rate:
+            return 503, {'detail': 'Injected error (mock_backend --error-rate)'}
+        allowed = False
+        for route_method, pattern, view in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            allowed = True
+            if route_method == method or (method == 'HEAD' and route_method == 'GET'):
+                return view(match.groupdict(), query, body)
+        if allowed:
+            return 405, {'detail': f'Method "{method}" not allowed.'}
+        return 404, {'detail': 'Not found.'}
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            with self.lock:
+                jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def roll(self):
+        with self.lock:
+            return self.rng.random()
+
+    def pad(self, records):
+        if not self.padding:
+            return records
+        return [dict(record, padding=self.padding) for record in records]
+
+    def listing(self, records, query):
+        """Plain array, or a DRF page when --paginate is set; ?fields= applied to the records"""
+        fields = parse_fields(query.get(FIELDS_PARAM, [None])[0])
+        if not self.paginate:
+            return 200, prune(self.pad(records), fields)
+        # Like DRF's PageNumberPagination: a bad page_size falls back to the
+        # default, a bad page number is a 404
+        page_size = positive_int(query.get('page_size', [None])[0]) or self.paginate
+        page = positive_int(query.get('page', ['1'])[0])
+        if page is None:
+            return 404, {'detail': 'Invalid page.'}
+        start = (page - 1) * page_size
+        if start and start >= len(records):
+            return 404, {'detail': 'Invalid page.'}
+
+        def link(number):
+            params = dict((k, v[0]) for k, v in query.items())
+            params.update(page=number, page_size=page_size)
+            return f"?{urlencode(params)}"
+
+        return 200, {
+            'count': len(records),
+            'next': link(page + 1) if start + page_size < len(records) else None,
+            'previous': link(page - 1) if page > 1 else None,
+            'results': prune(self.pad(records[start:start + page_size]), fields),
+        }
+
+    # ---- views ----------------------------------------------------------
+
+    def reference(self, args, query, body):
+        """Reference bundle; the handler turns a matching If-None-Match into a 304"""
+        if self._reference is None:
+            content = {key: self.data[key] for key in REFERENCE_ENDPOINTS}
+            self._reference = dict(content, version=etag_for(content))
+        return 200, self._reference
+
+    def find_user(self, user_id):
+        return next((u for u in self.data['users'] if u['id'] == user_id), None)
+
+    def get_user(self, args, query, body):
+        user = self.find_user(args['user_id'])
+        return (200, self.pad([user])[0]) if user else (404, {'detail': 'Not found.'})
+
+    def create_user(self, args, query, body):
+        missing = [field for field in ('id', 'username', 'role_id') if not body.get(field)]
+        if missing:
+            return 400, {field: ['This field is required.'] for field in missing}
+        role = next((r for r in self.data['roles'] if r['id'] == body['role_id']), None)
+        if role is None:
+            return 400, {'role_id': [f'Invalid pk "{body["role_id"]}" - object does not exist.']}
+        program = next((p for p in self.data['program_studies'] if p['id'] == body.get('program_study_id')), None)
+        with self.lock:
+            if self.find_user(str(body['id'])):
+                return 400, {'id': ['user with this id already exists.']}
+            user = {
+                'id': str(body['id']),
+                'username': body['username'],
+                'email': body.get('email', ''),
+                'phone_number': body.get('phone_number', ''),
+                'role': role,
+                'program_study': program and program['id'],
+                'program_study_name': program and program['name'],
+                'fakultas': program and program['faculty_name'],
+                'nim': str(body['id']),
+            }
+            self.data['users'].append(user)
+        return 201, dict(user, plain_password=body.get('password', ''))
+
+    def delete_user(self, args, query, body):
+        with self.lock:
+            user = self.find_user(args['user_id'])
+            if user is None:
+                return 404, {'detail': 'Not found.'}
+            self.data['users'].remove(user)
+        return 204, None
+
+    def get_survey(self, args, query, body):
+        survey = next((s for s in self.data['surveys'] if s['id'] == int(args['survey_id'])), None)
+        return (200, self.pad([survey])[0]) if survey else (404, {'detail': 'Not found.'})
+
+    def create_survey(self, args, query, body):
+        if not body.get('title'):
+            return 400, {'title': ['This field is required.']}
+        with self.lock:
+            survey_id = next(self.data['next_ids']['survey'])
+            survey = {'id': survey_id, 'title': body['title'], 'description': body.get('description', ''),
+                      'is_active': body.get('is_active', True), 'survey_type': body.get('survey_type', 'exit'),
+                      'periode': body.get('periode_id')}
+            self.data['surveys'].append(survey)
+            self.data['sections'][survey_id] = []
+            self.data['answers'][survey_id] = []
+        return 201, survey
+
+    def list_sections(self, args, query, body):
+        sections = self.data['sections'].get(int(args['survey_id']))
+        if sections is None:
+            return 404, {'detail': 'Not found.'}
+        return self.listing(sections, query)
+
+    def list_questions(self, args, query, body):
+        questions = self.data['questions'].get(int(args['section_id']))
+        if questions is None:
+            return 404, {'detail': 'Not found.'}
+        return self.listing(questions, query)
+
+    def list_answers(self, args, query, body):
+        answers = self.data['answers'].get(int(args['survey_id']))
+        if answers is None:
+            return 404, {'detail': 'Not found.'}
+        return self.listing(answers, query)
+
+    def _store_answer(self, survey_id, answer):
+        if not answer.get('user_id') or not answer.get('question_id'):
+            return None
+        record = {'id': next(self.data['next_ids']['answer']), 'survey': survey_id,
+                  'user_id': answer['user_id'], 'question_id': answer['question_id'],
+                  'answer_text': answer.get('answer_text', ''), 'answer_value': answer.get('answer_value', '')}
+        self.data['answers'][survey_id].append(record)
+        return record
+
+    def create_answer(self, args, query, body):
+        survey_id = int(args['survey_id'])
+        if survey_id not in self.data['answers']:
+            return 404, {'detail': 'Not found.'}
+        with self.lock:
+            record = self._store_answer(survey_id, body)
+        if record is None:
+            return 400, {'non_field_errors': ['user_id and question_id are required.']}
+        return 201, record
+
+    def create_answers_bulk(self, args, query, body):
+        survey_id = int(args['survey_id'])
+        if survey_id not in self.data['answers']:
+            return 404, {'detail': 'Not found.'}
+        answers = body.get('answers') if isinstance(body, dict) else body
+        if not isinstance(answers, list):
+            return 400, {'answers': ['Expected a list of answers.']}
+        with self.lock:
+            created = [self._store_answer(survey_id, answer) for answer in answers]
+        if None in created:
+            return 400, {'answers': ['Every answer needs user_id and question_id.']}
+        return 201, {'created': len(created), 'answers': created}
+
+
+def make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are separate writes; without this, Nagle + delayed
+        # ACK adds ~40 ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def _dispatch(self):
+            url = urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                self._send(400, {'detail': 'JSON parse error.'})
+                return
+            path = url.path if url.path.endswith('/') else url.path + '/'
+            status, payload = backend.handle(self.command, path, parse_qs(url.query), body)
+            headers = {}
+            if status == 200 and path == f"/api{REFERENCE_PATH}":
+                headers = {'ETag': payload['version'], 'Cache-Control': 'no-cache'}
+                if etag_matches(self.headers.get('If-None-Match'), payload['version']):
+                    status, payload = 304, None
+            if isinstance(payload, dict) and 'results' in payload:
+                # Page links are absolute, like DRF's
+                for key in ('next', 'previous'):
+                    if payload[key]:
+                        payload[key] = f"http://{self.headers.get('Host')}{url.path}{payload[key]}"
+            self._send(status, payload, headers)
+
+        def _send(self, status, payload, headers=None):
+            body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            if payload is not None:
+                self.send_header('Content-Type', 'application/json')
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def create_server(host='127.0.0.1', port=DEFAULT_PORT, users=200, surveys=2, sections=3, questions=5,
+                  latency_ms=0, jitter_ms=0, error_rate=0.0, pad_bytes=0, paginate=None, seed=42):
+    """Build the fixture and a (not yet serving) HTTP server; port 0 picks a free one"""
+    data = build_fixture(users, surveys, sections, questions, seed=seed)
+    backend = MockBackend(data, latency_ms, jitter_ms, error_rate, pad_bytes, paginate, seed)
+    server = ThreadingHTTPServer((host, port), make_handler(backend))
+    server.daemon_threads = True
+    server.backend = backend
+    return server
+
+
+def serve_in_background(**options):
+    """Start a server on a daemon thread; returns (server, api_base_url)"""
+    options.setdefault('port', 0)
+    server = create_server(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/api"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline stand-in for the tracer study backend')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--surveys', type=int, default=2)
+    parser.add_argument('--sections', type=int, default=3, help='sections per survey')
+    parser.add_argument('--questions', type=int, default=5, help='questions per section')
+    parser.add_argument('--latency', type=float, default=0, help='added ms per request')
+    parser.add_argument('--jitter', type=float, default=0, help='+/- ms around --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered 503')
+    parser.add_argument('--pad-bytes', type=int, default=0, help='filler bytes added to every record')
+    parser.add_argument('--paginate', type=int, default=None, metavar='PAGE_SIZE',
+                        help='serve DRF-style pages instead of plain arrays')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    server = create_server(args.host, args.port, args.users, args.surveys, args.sections, args.questions,
+                           args.latency, args.jitter, args.error_rate, args.pad_bytes, args.paginate,
+                           args.seed)
+    data = server.backend.data
+    print("=" * 70)
+    print(f"🧪 MOCK BACKEND on http://{args.host}:{server.server_address[1]}/api")
+    print("=" * 70)
+    print(f"   {len(data['users']):,} users, {len(data['surveys'])} surveys, "
+          f"{sum(len(a) for a in data['answers'].values()):,} answers "
+          f"(seed {args.seed}, built in {time.perf_counter() - start:.2f}s)")
+    print(f"   latency {args.latency:g}±{args.jitter:g} ms, error rate {args.error_rate:.0%}, "
+          f"padding {args.pad_bytes} B, {'paginated' if args.paginate else 'plain arrays'}")
+    print("   Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Mock backend stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
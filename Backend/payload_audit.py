@@ -0,0 +1,249 @@
+"""
+Payload-size and field-usage audit of the list endpoints
+
+Usage:
+    python payload_audit.py                                  # local backend
+    python payload_audit.py --target mock --repeat 10
+    python payload_audit.py --endpoint users --fields users=id,username --json audit.json
+
+Per endpoint it reports the body size raw, gzip'd (level 6, what nginx or
+Django's GZipMiddleware would send) and as actually transferred, and splits
+the raw bytes over the fields of the sampled records. Each field also gets
+its marginal gzip cost: how much smaller the compressed sample gets without
+it. Fields the scripts actually read are marked as used.
+
+Every endpoint with a known field set is then fetched again with
+?fields=... (sparse_fields.SparseFieldsMixin on the backend, built into
+mock_backend.py), and full and sparse bytes and latency are compared side by
+side. A server that ignores ?fields= is reported as such.
+"""
+import argparse
+import gzip
+import json
+import time
+import zlib
+
+from api_client import ApiClient, add_client_arguments
+from latency_stats import summarize
+from list_users import USER_SUMMARY_FIELDS
+from sparse_fields import FIELDS_PARAM, parse_fields, prune
+
+# name -> (path, fields the scripts read; None when the whole record is used)
+ENDPOINTS = {
+    'users': ('/users/', USER_SUMMARY_FIELDS),        # list_users, test_user_list
+    'surveys': ('/surveys/', 'id,title'),             # status_check, final_test
+    'roles': ('/roles/', None),                       # form dropdowns
+    'program-studies': ('/unit/program-studies/', 'id,name'),
+}
+GZIP_LEVEL = 6
+
+
+def compact(value):
+    """Bytes as DRF's JSONRenderer sends them (compact separators, UTF-8)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def gzip_size(body):
+    return len(gzip.compress(body, GZIP_LEVEL))
+
+
+def fetch(client, path, params):
+    """(status, decoded body, bytes on the wire, seconds)"""
+    start = time.perf_counter()
+    response = client.get(path, params=params, stream=True)
+    try:
+        wire = response.raw.read(decode_content=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        response.close()
+    encoding = response.headers.get('Content-Encoding', '').lower()
+    if encoding == 'gzip':
+        body = gzip.decompress(wire)
+    elif encoding == 'deflate':
+        body = zlib.decompress(wire)
+    else:
+        body = wire
+    return response.status_code, body, len(wire), elapsed
+
+
+def records_of(payload):
+    if isinstance(payload, dict) and 'results' in payload:
+        return payload['results']
+    return payload if isinstance(payload, list) else [payload]
+
+
+def leaf_paths(record, prefix=''):
+    """Dotted paths of the scalar/list leaves of a record (nested objects expanded)"""
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            yield from leaf_paths(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}"
+
+
+def get_path(record, path):
+    for part in path.split('.'):
+        if not isinstance(record, dict) or part not in record:
+            return None, False
+        record = record[part]
+    return record, True
+
+
+def without(record, path):
+    """Copy of record with one dotted path removed"""
+    head, _, rest = path.partition('.')
+    if head not in record:
+        return record
+    copy = dict(record)
+    if rest and isinstance(copy[head], dict):
+        copy[head] = without(copy[head], rest)
+    else:
+        del copy[head]
+    return copy
+
+
+def is_used(path, tree):
+    if tree is None:
+        return True
+    for part in path.split('.'):
+        if part not in tree:
+            return False
+        tree = tree[part]
+        if not tree:
+            return True  # the whole subtree was requested
+    return True
+
+
+def field_breakdown(records, tree):
+    """Per leaf field: raw bytes, share of the raw body, marginal gzip bytes, used"""
+    body = compact(records)
+    total_gzip = gzip_size(body)
+    paths = list(dict.fromkeys(path for record in records for path in leaf_paths(record)))
+    rows = []
+    for path in paths:
+        key = path.rsplit('.', 1)[-1]
+        raw = 0
+        for record in records:
+            value, present = get_path(record, path)
+            if present:
+                raw += len(compact(key)) + 1 + len(compact(value)) + 1  # "key":value,
+        remaining = gzip_size(compact([without(record, path) for record in records]))
+        rows.append({'field': path, 'raw_bytes': raw, 'share': raw / len(body),
+                     'gzip_bytes': total_gzip - remaining, 'used': is_used(path, tree)})
+    rows.sort(key=lambda row: -row['raw_bytes'])
+    return rows
+
+
+def measure(client, path, params, repeat):
+    """Fetch repeat times; sizes from the last response, latencies from all"""
+    latencies = []
+    for _ in range(repeat):
+        status, body, wire, elapsed = fetch(client, path, params)
+        latencies.append(elapsed)
+    payload = json.loads(body) if body else None
+    return {
+        'status': status,
+        'raw_bytes': len(body),
+        'gzip_bytes': gzip_size(body),
+        'wire_bytes': wire,
+        'latency': summarize(latencies),
+        'payload': payload,
+    }
+
+
+def audit(client, name, path, fields, repeat, sample):
+    tree = parse_fields(fields)
+    base = {'page_size': sample} if sample else {}
+    full = measure(client, path, base, repeat)
+    records = records_of(full.pop('payload'))
+    result = {'endpoint': name, 'path': path, 'fields': fields, 'records': len(records), 'full': full}
+    if full['status'] != 200:
+        return result
+    result['breakdown'] = field_breakdown(records, tree) if records and isinstance(records[0], dict) else []
+    if tree:
+        sparse = measure(client, path, dict(base, **{FIELDS_PARAM: fields}), repeat)
+        sparse_records = records_of(sparse.pop('payload'))
+        sparse['honoured'] = sparse_records == prune(sparse_records, tree)
+        result['sparse'] = sparse
+    return result
+
+
+def kb(n):
+    return f"{n / 1024:9.1f}"
+
+
+def print_breakdown(result):
+    full = result['full']
+    print("\n" + "=" * 78)
+    print(f"📦 {result['endpoint']} ({result['path']}): {result['records']:,} records, "
+          f"{full['raw_bytes'] / 1024:.1f} KB raw, {full['gzip_bytes'] / 1024:.1f} KB gzip, "
+          f"{full['wire_bytes'] / 1024:.1f} KB on the wire")
+    print("=" * 78)
+    if full['status'] != 200:
+        print(f"❌ Status {full['status']}")
+        return
+    print(f"{'FIELD':32} {'RAW KB':>9} {'SHARE':>7} {'GZIP KB':>9}  USED")
+    for row in result['breakdown']:
+        print(f"{row['field']:32} {kb(row['raw_bytes'])} {row['share']:7.1%} {kb(row['gzip_bytes'])}  "
+              f"{'✓' if row['used'] else '-'}")
+    unused = [row for row in result['breakdown'] if not row['used']]
+    if unused:
+        share = sum(row['share'] for row in unused)
+        print(f"   {len(unused)} unused fields are {share:.0%} of the raw body")
+
+
+def print_comparison(results):
+    print("\n" + "=" * 96)
+    print("FULL vs SPARSE (?fields=)")
+    print("=" * 96)
+    print(f"{'ENDPOINT':18} {'MODE':7} {'RAW KB':>9} {'GZIP KB':>9} {'WIRE KB':>9} {'P50 ms':>8} {'P95 ms':>8}  NOTE")
+    print("-" * 96)
+    for result in results:
+        for mode in ('full', 'sparse'):
+            entry = result.get(mode)
+            if entry is None or entry['status'] != 200:
+                continue
+            note = ''
+            if mode == 'sparse':
+                if not entry['honoured']:
+                    note = "⚠️  ?fields= ignored by the server"
+                else:
+                    saved = 1 - entry['wire_bytes'] / max(result['full']['wire_bytes'], 1)
+                    note = f"-{saved:.0%} on the wire"
+            latency = entry['latency']
+            print(f"{result['endpoint']:18} {mode:7} {kb(entry['raw_bytes'])} {kb(entry['gzip_bytes'])} "
+                  f"{kb(entry['wire_bytes'])} {latency['p50_ms']:8.1f} {latency['p95_ms']:8.1f}  {note}")
+    print("=" * 96)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Payload size and field usage audit')
+    parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS),
+                        help='endpoint to audit (repeatable; default all)')
+    parser.add_argument('--fields', action='append', default=[], metavar='NAME=FIELDS',
+                        help='override the sparse field set, e.g. users=id,username')
+    parser.add_argument('--repeat', type=int, default=5, help='requests per mode for latency')
+    parser.add_argument('--sample', type=int, help='page_size to request (paginated servers)')
+    parser.add_argument('--json', help='write the results here')
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    overrides = dict(item.split('=', 1) for item in args.fields)
+    client = ApiClient(args.target, timeout=args.timeout)
+    print(f"🔍 Auditing payloads of {client.base_url}")
+    results = []
+    for name in args.endpoint or ENDPOINTS:
+        path, fields = ENDPOINTS[name]
+        result = audit(client, name, path, overrides.get(name, fields), args.repeat, args.sample)
+        print_breakdown(result)
+        results.append(result)
+    print_comparison(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✓ Wrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
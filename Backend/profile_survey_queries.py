@@ -0,0 +1,196 @@
+"""
+SQL query profiler for the survey structure dump (test_survey_11.py)
+
+Usage:
+    python profile_survey_queries.py 11               # naive path, as test_survey_11.py
+    python profile_survey_queries.py 11 --compare     # naive vs prefetched, side by side
+    python profile_survey_queries.py 11 --show-sql    # also print every duplicated query
+
+Runs the same steps test_survey_11.py does (load survey, walk sections and
+their questions, serialize survey/sections/questions) for any survey id and
+records every SQL statement per phase: query count, exact duplicates, repeated
+statements with different parameters (the N+1 signature) and time spent.
+--compare also runs an optimized path that loads all questions in one query
+and prefetches them for the serializers, and reports the before/after counts.
+"""
+import argparse
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+import django_env
+
+django_env.setup()
+
+from django.db import connection
+from django.db.models import Prefetch
+
+from api.models import Survey, Section, Question
+from api.serializers import SurveySerializer, SectionSerializer, QuestionSerializer
+
+
+class QueryRecorder:
+    """Collects (sql, params, seconds) per named phase via execute_wrapper"""
+
+    def __init__(self):
+        self.phases = defaultdict(list)
+        self.order = []
+        self._phase = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.phases[self._phase].append((sql, repr(params), time.perf_counter() - start))
+
+    @contextmanager
+    def phase(self, name):
+        self._phase = name
+        self.order.append(name)
+        with connection.execute_wrapper(self):
+            yield
+        self._phase = None
+
+    def stats(self):
+        """Per phase: queries, exact duplicates, repeated templates, SQL ms"""
+        result = {}
+        for name in self.order:
+            queries = self.phases[name]
+            exact = Counter((sql, params) for sql, params, _ in queries)
+            templates = Counter(sql for sql, _, _ in queries)
+            result[name] = {
+                'queries': len(queries),
+                'duplicates': sum(n - 1 for n in exact.values() if n > 1),
+                'repeated_templates': sum(n - 1 for n in templates.values() if n > 1),
+                'sql_ms': sum(seconds for _, _, seconds in queries) * 1000,
+            }
+        return result
+
+    def repeated(self):
+        """(phase, sql, count) for every statement issued more than once"""
+        for name in self.order:
+            templates = Counter(sql for sql, _, _ in self.phases[name])
+            for sql, count in templates.most_common():
+                if count > 1:
+                    yield name, sql, count
+
+
+def related_accessor(model, field_name):
+    """Reverse accessor name of a ForeignKey (e.g. 'questions' or 'question_set')"""
+    return model._meta.get_field(field_name).remote_field.get_accessor_name()
+
+
+def run_naive(survey_id, recorder):
+    """The access pattern of test_survey_11.py, with all sections serialized"""
+    with recorder.phase('load survey'):
+        survey = Survey.objects.get(id=survey_id)
+
+    with recorder.phase('walk sections'):
+        sections = Section.objects.filter(survey=survey).order_by('order', 'id')
+        sections.count()
+        for section in sections:
+            questions = Question.objects.filter(section=section).order_by('order', 'id')
+            questions.count()
+            if questions.exists():
+                questions.first()
+
+    with recorder.phase('serialize survey'):
+        SurveySerializer(survey).data
+
+    with recorder.phase('serialize sections'):
+        SectionSerializer(sections, many=True).data
+
+    with recorder.phase('serialize questions'):
+        for section in sections:
+            questions = Question.objects.filter(section=section).order_by('order', 'id')
+            QuestionSerializer(questions, many=True).data
+
+
+def run_optimized(survey_id, recorder):
+    """Same output with sections and questions each loaded once"""
+    questions_accessor = related_accessor(Question, 'section')
+    ordered_questions = Question.objects.order_by('order', 'id')
+
+    with recorder.phase('load survey'):
+        survey = Survey.objects.get(id=survey_id)
+
+    with recorder.phase('walk sections'):
+        sections = list(
+            Section.objects.filter(survey=survey)
+            .order_by('order', 'id')
+            .prefetch_related(Prefetch(questions_accessor, queryset=ordered_questions))
+        )
+        len(sections)
+        for section in sections:
+            questions = list(getattr(section, questions_accessor).all())
+            len(questions)
+            if questions:
+                questions[0]
+
+    with recorder.phase('serialize survey'):
+        SurveySerializer(survey).data
+
+    with recorder.phase('serialize sections'):
+        SectionSerializer(sections, many=True).data
+
+    with recorder.phase('serialize questions'):
+        questions = (Question.objects.filter(section__survey=survey)
+                     .select_related('section')
+                     .order_by('section__order', 'section_id', 'order', 'id'))
+        QuestionSerializer(questions, many=True).data
+
+
+def print_stats(title, stats):
+    print(f"\n{title}")
+    print(f"   {'PHASE':22} {'QUERIES':>8} {'DUPES':>7} {'N+1':>7} {'SQL ms':>9}")
+    for name, row in stats.items():
+        print(f"   {name:22} {row['queries']:8d} {row['duplicates']:7d} "
+              f"{row['repeated_templates']:7d} {row['sql_ms']:9.1f}")
+    total = sum(row['queries'] for row in stats.values())
+    print(f"   {'TOTAL':22} {total:8d} {'':7} {'':7} {sum(r['sql_ms'] for r in stats.values()):9.1f}")
+
+
+def profile(survey_id, runner):
+    recorder = QueryRecorder()
+    start = time.perf_counter()
+    runner(survey_id, recorder)
+    return recorder, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile SQL issued by the survey structure dump')
+    parser.add_argument('survey_id', type=int, nargs='?', default=11)
+    parser.add_argument('--compare', action='store_true', help='also run the prefetched path')
+    parser.add_argument('--show-sql', action='store_true', help='print repeated statements')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"SURVEY {args.survey_id} QUERY PROFILE ({connection.vendor})")
+    print("=" * 70)
+
+    naive, naive_wall = profile(args.survey_id, run_naive)
+    naive_stats = naive.stats()
+    print_stats(f"🐢 Naive path (test_survey_11.py), {naive_wall * 1000:.1f} ms wall", naive_stats)
+
+    if args.show_sql:
+        print("\n🔁 Repeated statements:")
+        for phase, sql, count in naive.repeated():
+            print(f"   [{phase}] x{count}: {sql[:160]}")
+
+    if args.compare:
+        optimized, optimized_wall = profile(args.survey_id, run_optimized)
+        optimized_stats = optimized.stats()
+        print_stats(f"🚀 Optimized path (prefetch/select_related), {optimized_wall * 1000:.1f} ms wall",
+                    optimized_stats)
+
+        before = sum(row['queries'] for row in naive_stats.values())
+        after = sum(row['queries'] for row in optimized_stats.values())
+        print("\n" + "=" * 70)
+        print(f"📊 Queries: {before} -> {after} | wall: {naive_wall * 1000:.1f} ms -> "
+              f"{optimized_wall * 1000:.1f} ms")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
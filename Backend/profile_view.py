@@ -0,0 +1,305 @@
+"""
+CPU profiler for API views, run in-process through the Django test client
+
+Usage:
+    python profile_view.py survey-detail --id 11                 # cProfile, top 25
+    python profile_view.py users --profiler sample --out users   # users.collapsed for flamegraphs
+    python profile_view.py /api/surveys/11/sections/ --fields    # cost per serializer field
+    python profile_view.py --list
+
+Bootstraps Django like test_survey_11.py (see django_env.py) and requests the
+view through DRF's APIClient, so URL routing, permissions, the view and its
+serializers run exactly as for the app, minus the network. After --warmup
+untimed requests, --repeat requests are profiled with:
+
+    cprofile  deterministic; top-N table by own/cumulative time and a .prof
+              file for snakeviz / pstats
+    sample    stack sampler every --interval ms of CPU time (SIGPROF);
+              writes collapsed stacks (.collapsed) for flamegraph.pl,
+              speedscope or inferno, and a top-N table of self samples
+
+--fields additionally times every serializer field (get_attribute +
+to_representation, with the SQL it triggers), so nested serializers and
+lazily loaded relations that dominate a response stand out.
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+import django_env
+
+# Named views the app calls (see lib/config/api_config.dart)
+VIEWS = {
+    'surveys': '/api/surveys/',
+    'survey-detail': '/api/surveys/{id}/',
+    'sections': '/api/surveys/{id}/sections/',
+    'questions': '/api/surveys/{id}/sections/{section}/questions/',
+    'answers': '/api/surveys/{id}/answers/',
+    'users': '/api/users/',
+    'roles': '/api/roles/',
+    'program-studies': '/api/unit/program-studies/',
+    'faculties': '/api/unit/faculties/',
+    'periodes': '/api/periodes/',
+}
+
+
+class FieldTimer:
+    """
+    Times each serializer field while installed
+
+    Replaces Serializer.to_representation with the same loop DRF runs,
+    timing get_attribute + to_representation per field. Inclusive time
+    contains nested serializers; self time excludes them.
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: [0, 0.0, 0.0, 0])  # calls, inclusive, self, queries
+        self.queries = 0
+        self._stack = []
+        self._original = None
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from rest_framework.fields import SkipField
+        from rest_framework.relations import PKOnlyObject
+        from rest_framework.serializers import Serializer
+
+        timer = self
+        self._original = Serializer.to_representation
+
+        def to_representation(serializer, instance):
+            ret = {}
+            for field in serializer._readable_fields:
+                timer._stack.append(0.0)
+                queries = timer.queries
+                start = time.perf_counter()
+                try:
+                    try:
+                        attribute = field.get_attribute(instance)
+                    except SkipField:
+                        continue
+                    check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                    if check_for_none is None:
+                        ret[field.field_name] = None
+                    else:
+                        ret[field.field_name] = field.to_representation(attribute)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    nested = timer._stack.pop()
+                    if timer._stack:
+                        timer._stack[-1] += elapsed
+                    entry = timer.stats[(type(serializer).__name__, field.field_name)]
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    entry[2] += elapsed - nested
+                    entry[3] += timer.queries - queries
+            return ret
+
+        Serializer.to_representation = to_representation
+
+    def uninstall(self):
+        from rest_framework.serializers import Serializer
+
+        Serializer.to_representation = self._original
+
+    def print_table(self, top, repeat):
+        rows = sorted(self.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        print(f"\n🧩 Serializer fields by self time (per request, {repeat} requests):")
+        print(f"{'FIELD':45} {'CALLS':>8} {'SELF ms':>9} {'INCL ms':>9} {'QUERIES':>8}")
+        print("-" * 83)
+        for (serializer, field), (calls, inclusive, own, queries) in rows:
+            print(f"{serializer + '.' + field:45} {calls / repeat:8.0f} {own * 1000 / repeat:9.2f} "
+                  f"{inclusive * 1000 / repeat:9.2f} {queries / repeat:8.1f}")
+
+
+class StackSampler:
+    """
+    Samples the calling thread's Python stack into collapsed-stack counts
+
+    Uses a SIGPROF CPU timer where available: the handler runs in the
+    profiled thread, so time spent in C code (SQL drivers, json) is charged
+    to the Python frame that called it. Elsewhere (Windows) a background
+    thread samples instead, which over-counts frames that release the GIL.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._use_signal = hasattr(signal, 'setitimer')
+
+    @staticmethod
+    def frame_label(frame):
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)
+        return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+    def record(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(self.frame_label(frame))
+            frame = frame.f_back
+        if labels:
+            self.stacks[';'.join(reversed(labels))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.record(sys._current_frames().get(self.thread_id))
+
+    def __enter__(self):
+        if self._use_signal:
+            self._previous = signal.signal(signal.SIGPROF, lambda signum, frame: self.record(frame))
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            # Let the sampler take the GIL close to the sampling rate
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, self.interval / 200))
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._use_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous)
+        else:
+            self._stop.set()
+            self._thread.join()
+            sys.setswitchinterval(self._switch_interval)
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def print_top(self, top):
+        total = sum(self.stacks.values())
+        own = Counter()
+        for stack, count in self.stacks.items():
+            own[stack.rsplit(';', 1)[-1]] += count
+        print(f"\n🔥 Top {top} functions by self samples ({total:,} samples):")
+        print(f"{'SAMPLES':>8} {'SHARE':>7}  FUNCTION")
+        for label, count in own.most_common(top):
+            print(f"{count:8,} {count / total:7.1%}  {label}")
+
+
+def resolve_path(view, args):
+    if view.startswith('/'):
+        return view
+    if view not in VIEWS:
+        raise SystemExit(f"❌ Unknown view '{view}' (see --list)")
+    return VIEWS[view].format(id=args.id, section=args.section)
+
+
+def make_client(user_id):
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    client = APIClient(HTTP_HOST='localhost')
+    if user_id:
+        client.force_authenticate(user=get_user_model().objects.get(pk=user_id))
+    return client
+
+
+def request_view(client, path, repeat):
+    statuses = Counter()
+    for _ in range(repeat):
+        response = client.get(path)
+        statuses[response.status_code] += 1
+    return statuses
+
+
+def print_cprofile_top(profile, top, sort):
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    # Drop pstats' preamble, keep the table
+    lines = stream.getvalue().splitlines()
+    start = next((i for i, line in enumerate(lines) if line.lstrip().startswith('ncalls')), 0)
+    print(f"\n🔥 Top {top} functions by {sort} time:")
+    print('\n'.join(lines[start:]).rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile an API view in-process')
+    parser.add_argument('view', nargs='?', help='named view (see --list) or a path like /api/users/')
+    parser.add_argument('--id', type=int, default=11, help='survey id for survey views')
+    parser.add_argument('--section', type=int, default=1, help='section id for the questions view')
+    parser.add_argument('--profiler', choices=['cprofile', 'sample'], default='cprofile')
+    parser.add_argument('--repeat', type=int, default=10, help='profiled requests')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed requests first')
+    parser.add_argument('--interval', type=float, default=1.0, help='sampling interval in ms')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--sort', choices=['tottime', 'cumulative'], default='tottime')
+    parser.add_argument('--fields', action='store_true', help='time each serializer field')
+    parser.add_argument('--user', help='authenticate as this user id')
+    parser.add_argument('--out', help='output prefix for .prof / .collapsed (default: view name)')
+    parser.add_argument('--list', action='store_true', help='list named views and exit')
+    args = parser.parse_args()
+
+    if args.list or not args.view:
+        for name, path in VIEWS.items():
+            print(f"   {name:18} {path}")
+        return
+
+    django_env.setup()
+    from django.db import connection
+
+    path = resolve_path(args.view, args)
+    out = args.out or args.view.strip('/').replace('/', '_') or 'view'
+    client = make_client(args.user)
+
+    print("=" * 70)
+    print(f"PROFILING GET {path} ({args.profiler}, {args.repeat} requests)")
+    print("=" * 70)
+    statuses = request_view(client, path, args.warmup)
+    if args.warmup and not all(200 <= status < 300 for status in statuses):
+        print(f"⚠️  Warmup statuses: {dict(statuses)} (try --user for authenticated views)")
+
+    timer = FieldTimer() if args.fields else None
+    if timer:
+        timer.install()
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(timer.count_query if timer else lambda execute, *a: execute(*a)):
+            if args.profiler == 'cprofile':
+                profile = cProfile.Profile()
+                profile.enable()
+                statuses = request_view(client, path, args.repeat)
+                profile.disable()
+            else:
+                with StackSampler(args.interval / 1000) as sampler:
+                    statuses = request_view(client, path, args.repeat)
+    finally:
+        if timer:
+            timer.uninstall()
+    elapsed = time.perf_counter() - start
+
+    print(f"   {elapsed * 1000 / args.repeat:.1f} ms per request (profiler overhead included), "
+          f"statuses {dict(statuses)}")
+    if args.profiler == 'cprofile':
+        print_cprofile_top(profile, args.top, args.sort)
+        profile.dump_stats(out + '.prof')
+        print(f"\n✓ Wrote {out}.prof (snakeviz {out}.prof, or python -m pstats {out}.prof)")
+    else:
+        sampler.print_top(args.top)
+        sampler.write_collapsed(out + '.collapsed')
+        print(f"\n✓ Wrote {out}.collapsed (flamegraph.pl {out}.collapsed > {out}.svg, "
+              f"or open it in speedscope)")
+    if timer:
+        timer.print_table(args.top, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
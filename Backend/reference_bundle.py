@@ -0,0 +1,98 @@
+"""
+GET /api/reference/ - all reference lists in one response, with ETag/304
+
+Server code: it is not imported by any script here and the backend does not
+serve /api/reference/ until it is installed. To install, with the Django
+project checked out at Backend/capstone_backend (see django_env.py):
+
+    1. copy this file to Backend/capstone_backend/api/reference_bundle.py
+    2. in Backend/capstone_backend/api/urls.py (included under 'api/'):
+
+           from .reference_bundle import ReferenceBundleView
+
+           urlpatterns += [path('reference/', ReferenceBundleView.as_view())]
+
+    3. optionally set REFERENCE_BUNDLE_SERIALIZERS / REFERENCE_BUNDLE_TIMEOUT
+       in capstone_backend/settings.py
+
+Importing the module (step 2 does) connects the cache invalidation signals.
+Until then reference_data.load_reference() falls back to the list endpoints.
+
+The body holds the records of /roles/, /unit/faculties/, /unit/departments/
+and /unit/program-studies/ (serialized with REFERENCE_SERIALIZERS, or
+settings.REFERENCE_BUNDLE_SERIALIZERS) plus a 'version', which is also the
+ETag: a request whose If-None-Match matches gets an empty 304. The bundle is
+built once and kept in Django's cache until one of the models is saved or
+deleted, or REFERENCE_BUNDLE_TIMEOUT seconds pass; with a per-process cache
+(LocMemCache) the timeout bounds how long other workers serve an old version.
+
+Clients: reference_data.load_reference() (on-disk copy keyed by the ETag).
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import parse_etags, quote_etag
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+REFERENCE_SERIALIZERS = {
+    'roles': 'api.serializers.RoleSerializer',
+    'faculties': 'api.serializers.FacultySerializer',
+    'departments': 'api.serializers.DepartmentSerializer',
+    'program_studies': 'api.serializers.ProgramStudySerializer',
+}
+CACHE_KEY = 'reference-bundle'
+
+
+def serializer_classes():
+    paths = getattr(settings, 'REFERENCE_BUNDLE_SERIALIZERS', REFERENCE_SERIALIZERS)
+    return {key: import_string(path) for key, path in paths.items()}
+
+
+def build_bundle():
+    content = {}
+    for key, serializer_class in serializer_classes().items():
+        queryset = serializer_class.Meta.model._default_manager.all()
+        content[key] = serializer_class(queryset, many=True).data
+    body = json.dumps(content, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    return dict(content, version=quote_etag(hashlib.sha1(body).hexdigest()[:20]))
+
+
+def get_bundle():
+    bundle = cache.get(CACHE_KEY)
+    if bundle is None:
+        bundle = build_bundle()
+        cache.set(CACHE_KEY, bundle, getattr(settings, 'REFERENCE_BUNDLE_TIMEOUT', 300))
+    return bundle
+
+
+def invalidate(**kwargs):
+    cache.delete(CACHE_KEY)
+
+
+def connect_signals():
+    for serializer_class in serializer_classes().values():
+        model = serializer_class.Meta.model
+        uid = f"reference-bundle-{model._meta.label}"
+        post_save.connect(invalidate, sender=model, dispatch_uid=uid)
+        post_delete.connect(invalidate, sender=model, dispatch_uid=uid)
+
+
+class ReferenceBundleView(APIView):
+    """Roles, faculties, departments and program studies with a version ETag"""
+
+    def get(self, request):
+        bundle = get_bundle()
+        etag = bundle['version']
+        tags = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+        if etag in tags or '*' in tags:
+            return Response(status=304, headers={'ETag': etag})
+        return Response(bundle, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+
+connect_signals()
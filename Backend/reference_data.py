@@ -0,0 +1,142 @@
+"""
+Reference data (roles, faculties, departments, program studies) in one request
+
+Usage:
+    from reference_data import load_reference
+
+    bundle, how = load_reference(client)
+    bundle['roles'], bundle['program_studies']    # same records as /roles/, /unit/program-studies/
+
+    python reference_data.py --target mock        # show what is cached and how it was obtained
+
+GET /api/reference/ (reference_bundle.ReferenceBundleView on the backend,
+built into mock_backend.py) returns every reference list in one body with a
+version ETag. The bundle is kept on disk per API base URL
+($TRACER_CACHE_DIR, default Backend/.cache/) and revalidated with
+If-None-Match, so a warm load is a single 304 with no body; within one
+process later calls reuse the revalidated copy without a request at all.
+Servers without the bundle endpoint (404; reference_bundle.py is not
+installed) are served from the individual list endpoints, all pages, uncached
+on disk but kept in memory for the rest of the process.
+
+`how` is 'fetched', 'not modified', 'memory' or 'fallback'.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from api_client import ApiClient, add_client_arguments
+from list_users import iter_records
+
+REFERENCE_PATH = '/reference/'
+# bundle key -> list endpoint it mirrors
+REFERENCE_ENDPOINTS = {
+    'roles': '/roles/',
+    'faculties': '/unit/faculties/',
+    'departments': '/unit/departments/',
+    'program_studies': '/unit/program-studies/',
+}
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('TRACER_CACHE_DIR') or os.path.join(BACKEND_DIR, '.cache')
+
+_memory = {}
+_fetch_lock = threading.Lock()
+
+
+def etag_for(content):
+    """Strong ETag of JSON-serializable content"""
+    body = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match header value (list, weak tags or *) against an ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f"W/{etag}" in tags
+
+
+def cache_path(base_url, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"reference-{hashlib.sha1(base_url.encode()).hexdigest()[:12]}.json")
+
+
+def _read_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, bundle):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(bundle, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def fetch_individually(client):
+    """The bundle assembled from the separate list endpoints (servers without /reference/)"""
+    bundle = {key: list(iter_records(client, path)) for key, path in REFERENCE_ENDPOINTS.items()}
+    bundle['version'] = None
+    return bundle
+
+
+def load_reference(client, cache_dir=CACHE_DIR, revalidate=False):
+    """
+    (bundle, how) for the client's backend; see the module docstring
+
+    revalidate=True skips the in-process copy and asks the server again
+    (a 304 when nothing changed), e.g. to double as a connectivity check.
+    """
+    key = client.base_url
+    # One caller fetches at a time; the others then find its copy in memory
+    with _fetch_lock:
+        if not revalidate and key in _memory:
+            return _memory[key], 'memory'
+
+        path = cache_path(key, cache_dir)
+        cached = _read_cache(path)
+        headers = {'If-None-Match': cached['version']} if cached and cached.get('version') else {}
+        response = client.get(REFERENCE_PATH, headers=headers)
+        if response.status_code == 304 and cached:
+            bundle, how = cached, 'not modified'
+        elif response.status_code == 404:
+            bundle, how = fetch_individually(client), 'fallback'
+        else:
+            response.raise_for_status()
+            bundle, how = response.json(), 'fetched'
+            bundle['version'] = response.headers.get('ETag') or bundle.get('version')
+            _write_cache(path, bundle)
+
+        _memory[key] = bundle
+        return bundle, how
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load (and cache) the reference data bundle')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    client = ApiClient(args.target, timeout=args.timeout)
+    bundle, how = load_reference(client, args.cache_dir)
+    print("=" * 70)
+    print(f"REFERENCE DATA from {client.base_url}: {how} (version {bundle.get('version')})")
+    print("=" * 70)
+    for key in REFERENCE_ENDPOINTS:
+        print(f"   {key:16} {len(bundle.get(key, [])):5} records")
+    print(f"   cache: {cache_path(client.base_url, args.cache_dir)}")
+
+
+if __name__ == '__main__':
+    main()
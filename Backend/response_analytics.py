@@ -0,0 +1,190 @@
+"""
+Tracer study response analytics (frequency tables, crosstabs, completion)
+
+Usage:
+    python response_analytics.py 11                        # summary on screen
+    python response_analytics.py 11 --out-dir reports/     # also write CSVs
+    python response_analytics.py 11 --by cohort
+    python response_analytics.py 11 --by program_study --by cohort   # question x program x cohort
+
+Requires pandas and numpy (pip install pandas numpy).
+
+Answers (/surveys/{id}/answers/) and users (/users/) are streamed straight
+into columns and stored in a pandas DataFrame with categorical columns, so
+question, answer, program study and cohort are integer codes. Frequency
+tables, crosstabs and completion rates are then computed with groupby/crosstab
+over those codes instead of Python loops over dicts.
+
+Cohort is the user's 'angkatan' field when the API sends it, otherwise the
+entry year encoded in an 8-digit NIM (11221037 -> 2022).
+"""
+import argparse
+import os
+import sys
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = pd = None
+
+from api_client import ApiClient, add_client_arguments
+from list_users import iter_records, iter_users, program_study_name
+
+GROUPS = ('program_study', 'cohort')
+
+
+def _ref(record, *keys):
+    """First present key; nested objects are reduced to their id"""
+    for key in keys:
+        value = record.get(key)
+        if value is not None:
+            return value.get('id') if isinstance(value, dict) else value
+    return None
+
+
+def cohort_of(user):
+    if user.get('angkatan'):
+        return str(user['angkatan'])
+    user_id = str(user.get('id', ''))
+    if len(user_id) == 8 and user_id.isdigit():
+        return f"20{user_id[2:4]}"
+    return None
+
+
+def load_users(client, page_size=1000):
+    """Users as a DataFrame indexed by user id (program_study, cohort categorical)"""
+    ids, programs, cohorts = [], [], []
+    for user in iter_users(client, page_size):
+        ids.append(str(user['id']))
+        programs.append(program_study_name(user) or None)
+        cohorts.append(cohort_of(user))
+    users = pd.DataFrame({
+        'program_study': pd.Categorical(programs),
+        'cohort': pd.Categorical(cohorts),
+    }, index=pd.Index(ids, name='user_id'))
+    return users
+
+
+def load_answers(client, survey_id, page_size=5000):
+    """
+    Answers of one survey as a columnar DataFrame
+
+    Columns: user_id, question_id, answer (all categorical). Later answers
+    from the same user to the same question replace earlier ones.
+    """
+    user_ids, question_ids, values = [], [], []
+    for answer in iter_records(client, f"/surveys/{survey_id}/answers/", page_size):
+        user_ids.append(str(_ref(answer, 'user_id', 'user', 'alumni')))
+        question_ids.append(_ref(answer, 'question_id', 'question', 'program_specific_question'))
+        value = answer.get('answer_value') or answer.get('answer_text') or ''
+        values.append(str(value).strip())
+    answers = pd.DataFrame({
+        'user_id': pd.Categorical(user_ids),
+        'question_id': pd.Categorical(question_ids),
+        'answer': pd.Categorical(values),
+    })
+    return answers.drop_duplicates(['user_id', 'question_id'], keep='last', ignore_index=True)
+
+
+def attach_groups(answers, users):
+    """Add program_study/cohort to each answer via a vectorized index lookup"""
+    positions = users.index.get_indexer(answers['user_id'].astype(str))
+    known = positions >= 0
+    for column in GROUPS:
+        codes = np.full(len(answers), -1, dtype=np.int32)
+        codes[known] = users[column].cat.codes.to_numpy()[positions[known]]
+        answers[column] = pd.Categorical.from_codes(codes, users[column].cat.categories)
+    return answers
+
+
+def frequency_table(answers):
+    """Count and share of each answer per question"""
+    counts = answers.groupby(['question_id', 'answer'], observed=True).size().rename('count')
+    totals = counts.groupby(level='question_id', observed=True).transform('sum')
+    return pd.DataFrame({'count': counts, 'share': counts / totals}).reset_index()
+
+
+def crosstab(answers, by):
+    """
+    Answers per question x answer, split into columns by the `by` groups
+
+    Only (question, answer) pairs that occur get a row; with categorical
+    columns pd.crosstab would enumerate every combination, mostly zeros.
+    """
+    counts = answers.groupby(['question_id', 'answer', *by], observed=True).size()
+    return counts.unstack(list(by), fill_value=0)
+
+
+def completion_rates(answers, users, by):
+    """
+    Share of users in each `by` group who answered every question of the survey
+
+    Users who never answered count towards the group size, not completions.
+    """
+    question_total = answers['question_id'].nunique()
+    answered = answers.groupby('user_id', observed=True)['question_id'].nunique()
+    completed_ids = answered.index[answered.to_numpy() >= question_total].astype(str)
+    started_ids = answered.index.astype(str)
+
+    flags = users[list(by)].assign(started=users.index.isin(started_ids),
+                                   completed=users.index.isin(completed_ids))
+    frame = flags.groupby(list(by), observed=True).agg(
+        users=('started', 'size'), started=('started', 'sum'), completed=('completed', 'sum'),
+    ).astype(int)
+    frame['completion_rate'] = np.where(frame['users'] > 0, frame['completed'] / frame['users'].clip(lower=1), 0.0)
+    return frame.sort_values('completion_rate', ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tracer study response analytics')
+    parser.add_argument('survey_id', type=int)
+    parser.add_argument('--by', choices=GROUPS, action='append',
+                        help='grouping for crosstabs and completion rates '
+                             '(repeatable, e.g. --by program_study --by cohort; default program_study)')
+    parser.add_argument('--out-dir', help='write frequency/crosstab/completion CSVs here')
+    add_client_arguments(parser)
+    args = parser.parse_args()
+    by = list(dict.fromkeys(args.by or ['program_study']))
+    label = '_'.join(by)
+
+    if pd is None:
+        print("❌ pandas and numpy are required: pip install pandas numpy")
+        sys.exit(1)
+
+    client = ApiClient(args.target, timeout=args.timeout)
+    print("=" * 70)
+    print(f"SURVEY {args.survey_id} RESPONSE ANALYTICS")
+    print("=" * 70)
+
+    users = load_users(client)
+    answers = attach_groups(load_answers(client, args.survey_id), users)
+    memory_kb = answers.memory_usage(deep=True).sum() / 1024
+    print(f"   {len(answers):,} answers, {answers['user_id'].nunique():,} respondents, "
+          f"{answers['question_id'].nunique()} questions ({memory_kb:,.0f} KiB in memory)")
+
+    freq = frequency_table(answers)
+    table = crosstab(answers, by)
+    completion = completion_rates(answers, users, by)
+
+    print(f"\n📋 Completion by {' x '.join(by)}:")
+    print(completion.head(20).to_string())
+    print("\n📊 Most common answer per question:")
+    top = freq.sort_values('count', ascending=False).drop_duplicates('question_id')
+    print(top.sort_values('question_id').head(30).to_string(index=False))
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+        outputs = {
+            'frequencies.csv': freq,
+            f'crosstab_{label}.csv': table,
+            f'completion_{label}.csv': completion,
+        }
+        for filename, frame in outputs.items():
+            path = os.path.join(args.out_dir, filename)
+            frame.to_csv(path, index=not filename.startswith('frequencies'))
+            print(f"✓ Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
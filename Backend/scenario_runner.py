@@ -0,0 +1,229 @@
+"""
+Dependency-aware scenario runner for the Backend verification scripts
+
+Usage:
+    runner = ScenarioRunner("FINAL COMPREHENSIVE TEST")
+
+    @runner.step("surveys")
+    def surveys(ctx):
+        return client.get_json("/surveys/")
+
+    @runner.step("submit answer", depends=["surveys"])
+    def submit(ctx):
+        survey_id = ctx.result("surveys")[0]['id']
+        ...
+        ctx.log(f"   Survey ID: {survey_id}")
+
+    report = runner.run(workers=8)
+    write_json(report, "results.json"); write_junit(report, "results.xml")
+
+A step passes when it returns, fails when it raises (StepFailed for an
+expected failure, anything else is reported as an error) and can mark itself
+as a warning with ctx.warn(). Steps start as soon as all their dependencies
+have passed, so independent steps run concurrently and the whole run takes
+about as long as the slowest dependency chain. Steps whose dependencies did
+not pass are skipped. Each step's output is buffered and printed as one block
+when it finishes, so concurrent steps don't interleave.
+"""
+import json
+import socket
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PASSED, WARNING, FAILED, ERROR, SKIPPED = 'passed', 'warning', 'failed', 'error', 'skipped'
+
+
+class StepFailed(Exception):
+    """Raised by a step to fail with a message (no traceback in the report)"""
+
+
+class StepContext:
+    def __init__(self, name, results):
+        self.name = name
+        self._results = results
+        self.lines = []
+        self.warning = None
+
+    def log(self, message=''):
+        self.lines.append(str(message))
+
+    def warn(self, message):
+        """Finish as a warning instead of passed (not counted as a failure)"""
+        self.warning = message
+        self.log(message)
+
+    def result(self, step_name):
+        """Return value of a dependency"""
+        return self._results[step_name]
+
+
+class Step:
+    def __init__(self, name, func, depends, title):
+        self.name = name
+        self.func = func
+        self.depends = list(depends)
+        self.title = title or name
+
+
+class ScenarioRunner:
+    def __init__(self, title, width=80):
+        self.title = title
+        self.width = width
+        self.steps = {}
+        self._print_lock = threading.Lock()
+
+    def step(self, name, depends=(), title=None):
+        """Decorator registering func(ctx) as a step"""
+        def register(func):
+            if name in self.steps:
+                raise ValueError(f"Duplicate step {name!r}")
+            self.steps[name] = Step(name, func, depends, title)
+            return func
+        return register
+
+    def _check_graph(self):
+        for step in self.steps.values():
+            for dependency in step.depends:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step {step.name!r} depends on unknown step {dependency!r}")
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dependency in self.steps[name].depends:
+                visit(dependency, path + [name])
+            state[name] = 'done'
+
+        for name in self.steps:
+            visit(name, [])
+
+    def _execute(self, step, results):
+        ctx = StepContext(step.name, results)
+        start = time.perf_counter()
+        status, message = PASSED, ''
+        try:
+            value = step.func(ctx)
+            if ctx.warning:
+                status, message = WARNING, ctx.warning
+        except StepFailed as e:
+            status, message, value = FAILED, str(e), None
+            ctx.log(f"❌ FAILED: {e}")
+        except Exception as e:
+            status, message, value = ERROR, f"{type(e).__name__}: {e}", None
+            ctx.log(f"❌ ERROR: {e}")
+        return {
+            'name': step.name,
+            'title': step.title,
+            'status': status,
+            'message': message,
+            'depends': step.depends,
+            'started': start,
+            'duration_s': time.perf_counter() - start,
+            'output': ctx.lines,
+        }, value
+
+    def _print_block(self, record):
+        with self._print_lock:
+            print("\n" + "=" * self.width)
+            print(f"{record['title']}  [{record['status'].upper()}, {record['duration_s'] * 1000:.0f} ms]")
+            print("=" * self.width)
+            for line in record['output']:
+                print(line)
+
+    def run(self, workers=8):
+        """Run every step; returns the report dict (see write_json)"""
+        self._check_graph()
+        print("=" * self.width)
+        print(self.title)
+        print("=" * self.width)
+
+        results, records = {}, {}
+        pending = dict(self.steps)
+        running = {}
+        run_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            while pending or running:
+                for name, step in list(pending.items()):
+                    statuses = [records[d]['status'] if d in records else None for d in step.depends]
+                    if any(s is not None and s not in (PASSED, WARNING) for s in statuses):
+                        blocked = [d for d, s in zip(step.depends, statuses) if s not in (PASSED, WARNING)]
+                        records[name] = {
+                            'name': name, 'title': step.title, 'status': SKIPPED,
+                            'message': f"dependency {', '.join(blocked)} did not pass",
+                            'depends': step.depends, 'started': time.perf_counter(), 'duration_s': 0.0,
+                            'output': [f"⏭  SKIPPED: dependency {', '.join(blocked)} did not pass"],
+                        }
+                        self._print_block(records[name])
+                        del pending[name]
+                    elif all(s in (PASSED, WARNING) for s in statuses):
+                        running[pool.submit(self._execute, step, results)] = name
+                        del pending[name]
+                if not running:
+                    continue  # only skips happened; re-scan what they unblocked
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    record, value = future.result()
+                    records[name] = record
+                    results[name] = value
+                    self._print_block(record)
+        elapsed = time.perf_counter() - run_start
+
+        ordered = [records[name] for name in self.steps]
+        for record in ordered:
+            record['started_offset_s'] = record.pop('started') - run_start
+        counts = {status: sum(1 for r in ordered if r['status'] == status)
+                  for status in (PASSED, WARNING, FAILED, ERROR, SKIPPED)}
+        return {
+            'title': self.title,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_s': elapsed,
+            'serial_duration_s': sum(r['duration_s'] for r in ordered),
+            'counts': counts,
+            'ok': counts[FAILED] == 0 and counts[ERROR] == 0 and counts[SKIPPED] == 0,
+            'steps': ordered,
+        }
+
+
+def write_json(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def write_junit(report, path):
+    """JUnit XML (one testsuite, one testcase per step) for CI dashboards"""
+    counts = report['counts']
+    root = ET.Element('testsuites')
+    suite = ET.SubElement(root, 'testsuite', {
+        'name': report['title'],
+        'tests': str(len(report['steps'])),
+        'failures': str(counts[FAILED]),
+        'errors': str(counts[ERROR]),
+        'skipped': str(counts[SKIPPED]),
+        'time': f"{report['duration_s']:.3f}",
+        'timestamp': report['timestamp'],
+        'hostname': socket.gethostname(),
+    })
+    for record in report['steps']:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': report['title'],
+            'name': record['name'],
+            'time': f"{record['duration_s']:.3f}",
+        })
+        if record['status'] == FAILED:
+            ET.SubElement(case, 'failure', {'message': record['message']})
+        elif record['status'] == ERROR:
+            ET.SubElement(case, 'error', {'message': record['message']})
+        elif record['status'] == SKIPPED:
+            ET.SubElement(case, 'skipped', {'message': record['message']})
+        if record['output']:
+            ET.SubElement(case, 'system-out').text = '\n'.join(record['output'])
+    tree = ET.ElementTree(root)
+    ET.indent(tree)
+    tree.write(path, encoding='utf-8', xml_declaration=True)
@@ -0,0 +1,287 @@
+"""
+Synthetic dataset seeder for benchmarking the survey backend
+
+Usage:
+    python seed_dataset.py small                  # 1k alumni
+    python seed_dataset.py medium --workers 8     # 50k alumni
+    python seed_dataset.py large --seed 7         # 500k alumni
+    python seed_dataset.py small --purge          # delete a previous seed run
+
+Bootstraps Django in-process (like test_survey_11.py) and generates a
+reproducible dataset: surveys with sections and questions, alumni spread
+unevenly across the existing program studies, and their answers. Users and
+answers are written with bulk_create in fixed-size blocks on a process pool.
+Each block draws from its own RNG seeded with (seed, block), so the same seed
+gives the same rows whatever the worker count.
+
+Seeded rows are recognisable by the id/title prefix (--prefix, default
+"seed-"), which is also what --purge deletes. Rerunning with the same prefix
+reuses the seeded surveys and adds only the alumni and answers still missing.
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django_env
+
+TIERS = {
+    'small': {'alumni': 1_000, 'surveys': 2, 'sections': 4, 'questions': 5, 'completion': 0.7},
+    'medium': {'alumni': 50_000, 'surveys': 3, 'sections': 5, 'questions': 6, 'completion': 0.6},
+    'large': {'alumni': 500_000, 'surveys': 4, 'sections': 6, 'questions': 8, 'completion': 0.5},
+}
+
+# Question types the app maps to (BackendSurveyService._mapQuestionType)
+QUESTION_TYPES = ['text', 'number', 'radio', 'checkbox', 'dropdown', 'scale']
+CHOICES = ['Sangat Setuju', 'Setuju', 'Netral', 'Tidak Setuju', 'Sangat Tidak Setuju']
+
+BLOCK_SIZE = 5_000
+BATCH_SIZE = 1_000
+ALUMNI_ROLE = 'Alumni'
+SEED_PASSWORD = 'seedpass123'
+
+# Set per worker by _init_worker
+_MODELS = None
+
+
+def find_model(name):
+    """Look a model up by class name across all installed apps"""
+    from django.apps import apps
+
+    for model in apps.get_models():
+        if model.__name__.lower() == name.lower():
+            return model
+    raise LookupError(f"No model named {name} is installed")
+
+
+def load_models():
+    from django.contrib.auth import get_user_model
+
+    return {
+        'User': get_user_model(),
+        'Role': find_model('Role'),
+        'ProgramStudy': find_model('ProgramStudy'),
+        'Survey': find_model('Survey'),
+        'Section': find_model('Section'),
+        'Question': find_model('Question'),
+        'Answer': find_model('Answer'),
+    }
+
+
+def alumni_id(prefix, n):
+    return f"{prefix}{n:07d}"
+
+
+def program_weights(program_ids, rng):
+    """Uneven (Zipf-like) share of alumni per program study"""
+    shuffled = list(program_ids)
+    rng.shuffle(shuffled)
+    return shuffled, [1 / (rank + 1) for rank in range(len(shuffled))]
+
+
+def answer_for(question_type, rng):
+    """(answer_text, answer_value) shaped like the app's submissions"""
+    if question_type == 'number':
+        value = str(rng.randint(0, 60))
+        return value, value
+    if question_type == 'scale':
+        value = str(rng.randint(1, 5))
+        return value, value
+    if question_type in ('radio', 'dropdown'):
+        choice = rng.choice(CHOICES)
+        return choice, choice
+    if question_type == 'checkbox':
+        picked = rng.sample(CHOICES, rng.randint(1, 3))
+        return ', '.join(picked), ', '.join(picked)
+    words = rng.choices(['bekerja', 'wirausaha', 'studi lanjut', 'mencari kerja',
+                         'relevan', 'gaji', 'perusahaan', 'bidang', 'ITK'], k=rng.randint(3, 12))
+    return ' '.join(words), ''
+
+
+def _init_worker():
+    global _MODELS
+    django_env.setup()
+    _MODELS = load_models()
+
+
+def seed_users_block(block, start, end, context):
+    """bulk_create alumni start..end-1; returns rows written"""
+    rng = random.Random(f"{context['seed']}:users:{block}")
+    User = _MODELS['User']
+    programs, weights = context['programs'], context['program_weights']
+    users = []
+    for n in range(start, end):
+        user_id = alumni_id(context['prefix'], n)
+        users.append(User(
+            id=user_id,
+            username=f"Alumni {n}",
+            email=f"{user_id}@seed.test",
+            phone_number=f"08{rng.randint(10**9, 10**10 - 1)}",
+            role_id=context['role_id'],
+            program_study_id=rng.choices(programs, weights)[0],
+            password=context['password_hash'],
+        ))
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(users)
+
+
+def seed_answers_block(block, start, end, context):
+    """bulk_create answers of alumni start..end-1; returns rows written"""
+    rng = random.Random(f"{context['seed']}:answers:{block}")
+    Answer = _MODELS['Answer']
+    survey_ids = [survey_id for survey_id, _ in context['surveys']]
+    # Alumni answered by an earlier run keep their rows (the RNG still advances, so
+    # the others get the same answers as in a fresh run)
+    done = set(Answer.objects.filter(
+        user_id__in=[alumni_id(context['prefix'], n) for n in range(start, end)],
+        survey_id__in=survey_ids,
+    ).values_list('user_id', 'survey_id').distinct())
+    written = 0
+    pending = []
+    for n in range(start, end):
+        user_id = alumni_id(context['prefix'], n)
+        for survey_id, questions in context['surveys']:
+            if rng.random() > context['completion']:
+                continue
+            for question_id, question_type in questions:
+                text, value = answer_for(question_type, rng)
+                if (user_id, survey_id) not in done:
+                    pending.append(Answer(survey_id=survey_id, question_id=question_id,
+                                          user_id=user_id, answer_text=text, answer_value=value))
+        if len(pending) >= BATCH_SIZE:
+            Answer.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+            written += len(pending)
+            pending = []
+    if pending:
+        Answer.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+        written += len(pending)
+    return written
+
+
+def seed_structure(models, tier, prefix, rng):
+    """
+    Create surveys/sections/questions; returns [(survey_id, [(question_id, type)])]
+
+    Surveys left by an earlier run with the same prefix are reused as they are.
+    """
+    Survey, Section, Question = models['Survey'], models['Section'], models['Question']
+    structure = []
+    for s in range(tier['surveys']):
+        title = f"{prefix}Tracer Study {2020 + s}"
+        survey = Survey.objects.filter(title=title).order_by('pk').first()
+        if survey is not None:
+            questions = Question.objects.filter(section__survey=survey).order_by('pk')
+            structure.append((survey.pk, [(q.pk, q.question_type) for q in questions]))
+            continue
+        survey = Survey.objects.create(title=title, is_active=True)
+        sections = Section.objects.bulk_create([
+            Section(survey=survey, title=f"Bagian {i + 1}", order=i)
+            for i in range(tier['sections'])
+        ])
+        if sections and sections[0].pk is None:
+            # Backends without RETURNING on bulk insert (MySQL): read the ids back
+            sections = Section.objects.filter(survey=survey).order_by('order')
+        questions = Question.objects.bulk_create([
+            Question(section=section, order=q, text=f"Pertanyaan {section.order + 1}.{q + 1}",
+                     question_type=rng.choice(QUESTION_TYPES))
+            for section in sections
+            for q in range(tier['questions'])
+        ])
+        if questions and questions[0].pk is None:
+            questions = Question.objects.filter(section__survey=survey).order_by('pk')
+        structure.append((survey.pk, [(q.pk, q.question_type) for q in questions]))
+    return structure
+
+
+def run_blocks(label, func, total, context, workers):
+    """Run func over [0, total) in BLOCK_SIZE blocks on a process pool"""
+    blocks = [(i, start, min(start + BLOCK_SIZE, total))
+              for i, start in enumerate(range(0, total, BLOCK_SIZE))]
+    start_time = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(func, *block, context) for block in blocks]
+        for done, future in enumerate(as_completed(futures), 1):
+            written += future.result()
+            print(f"\r   {label}: {done}/{len(blocks)} blocks, {written:,} rows", end='', flush=True)
+    elapsed = time.perf_counter() - start_time
+    print(f"\r   ✅ {label}: {written:,} rows in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+    return written
+
+
+def purge(models, prefix):
+    """Delete everything a previous run with this prefix created"""
+    Answer, User, Survey = models['Answer'], models['User'], models['Survey']
+    answers, _ = Answer.objects.filter(user_id__startswith=prefix).delete()
+    users, _ = User.objects.filter(id__startswith=prefix).delete()
+    surveys, _ = Survey.objects.filter(title__startswith=prefix).delete()
+    print(f"🧹 Deleted {answers:,} answer rows, {users:,} user rows, {surveys:,} survey rows (with cascades)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a synthetic tracer study dataset')
+    parser.add_argument('tier', choices=list(TIERS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--prefix', default='seed-', help='id/title prefix of seeded rows')
+    parser.add_argument('--alumni', type=int, default=None, help='override the tier alumni count')
+    parser.add_argument('--purge', action='store_true', help='delete rows from a previous run and exit')
+    args = parser.parse_args()
+
+    django_env.setup()
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+
+    models = load_models()
+    if args.purge:
+        purge(models, args.prefix)
+        return
+
+    tier = dict(TIERS[args.tier])
+    if args.alumni:
+        tier['alumni'] = args.alumni
+    rng = random.Random(args.seed)
+
+    print("=" * 70)
+    print(f"SEEDING '{args.tier}' TIER: {tier['alumni']:,} alumni, {tier['surveys']} surveys "
+          f"x {tier['sections']} sections x {tier['questions']} questions")
+    print("=" * 70)
+
+    program_ids = list(models['ProgramStudy'].objects.order_by('pk').values_list('pk', flat=True))
+    if not program_ids:
+        print("❌ No program studies found. Create faculties/departments/program studies first.")
+        return
+    role = models['Role'].objects.filter(name=ALUMNI_ROLE).first()
+    if role is None:
+        print(f"❌ No '{ALUMNI_ROLE}' role found. Create the roles first.")
+        return
+    programs, weights = program_weights(program_ids, rng)
+
+    start = time.perf_counter()
+    structure = seed_structure(models, tier, args.prefix, rng)
+    print(f"   ✅ Survey structure: {sum(len(q) for _, q in structure)} questions")
+
+    context = {
+        'seed': args.seed,
+        'prefix': args.prefix,
+        'role_id': role.pk,
+        'programs': programs,
+        'program_weights': weights,
+        # Hash once: per-user hashing would dominate the seeding time
+        'password_hash': make_password(SEED_PASSWORD),
+        'surveys': structure,
+        'completion': tier['completion'],
+    }
+    # Workers open their own connections; don't share this one across fork
+    connection.close()
+
+    run_blocks('Alumni', seed_users_block, tier['alumni'], context, args.workers)
+    run_blocks('Answers', seed_answers_block, tier['alumni'], context, args.workers)
+
+    print("=" * 70)
+    print(f"🎉 Seeded in {time.perf_counter() - start:.1f}s (password for all seeded alumni: {SEED_PASSWORD})")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""
+Compact columnar snapshots of users and survey answers
+
+Usage:
+    python snapshot.py users --out users.snap                  # download + save
+    python snapshot.py answers 11 --out answers_11.snap
+    python snapshot.py info users.snap                         # rows, bytes, column summary
+
+In scripts:
+    from snapshot import load_or_fetch
+    users = load_or_fetch(client, 'users', 'users.snap', max_age=3600)
+    users.counts('role')                  # Counter({'Alumni': 48210, ...})
+    row = users[0]; row.username, row['role']
+
+Instead of a list of nested dicts (hundreds of bytes per row), records are
+stored as columns:
+    str   unique text (id, username, email): one UTF-8 buffer + offsets
+    cat   repeated text (role, fakultas, program study, answers): an array of
+          codes into a vocabulary, so each distinct string is kept once
+    int   array of 64-bit integers
+Rows are views ([i] / iteration) materialised on demand.
+
+save() writes the columns to one binary file and Table.load() maps it with
+mmap, so reopening a snapshot costs no JSON download or parsing and the
+buffers are paged in only as they are read.
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+from array import array
+from collections import Counter
+
+from api_client import ApiClient, add_client_arguments
+from list_users import flat_row, iter_records, iter_users
+
+MAGIC = b'TRSNAP1\0'
+ALIGN = 8
+INT_NULL = -2 ** 63
+OFFSET_TYPE = 'Q'
+CODE_TYPE = 'I'
+INT_TYPE = 'q'
+
+USER_SCHEMA = [
+    ('id', 'str'),
+    ('username', 'str'),
+    ('email', 'str'),
+    ('phone_number', 'str'),
+    ('role', 'cat'),
+    ('fakultas', 'cat'),
+    ('program_study', 'cat'),
+]
+ANSWER_SCHEMA = [
+    ('id', 'int'),
+    ('user_id', 'cat'),
+    ('question_id', 'int'),
+    ('answer_value', 'cat'),
+    ('answer_text', 'cat'),
+]
+
+
+def flat_answer(answer):
+    """Answer dict -> flat row for ANSWER_SCHEMA (nested user/question reduced to ids)"""
+    def ref(*keys):
+        for key in keys:
+            value = answer.get(key)
+            if value is not None:
+                return value.get('id') if isinstance(value, dict) else value
+        return None
+
+    return {
+        'id': answer.get('id'),
+        'user_id': str(ref('user_id', 'user', 'alumni') or ''),
+        'question_id': ref('question_id', 'question'),
+        'answer_value': str(answer.get('answer_value') or ''),
+        'answer_text': str(answer.get('answer_text') or ''),
+    }
+
+
+class Column:
+    """One column; buffers are arrays while building and memoryviews once loaded"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        if kind == 'str':
+            self.data = bytearray()
+            self.offsets = array(OFFSET_TYPE, [0])
+        elif kind == 'cat':
+            self.codes = array(CODE_TYPE)
+            self.vocab = []
+            self._index = {}
+        elif kind == 'int':
+            self.values = array(INT_TYPE)
+        else:
+            raise ValueError(f"Unknown column kind {kind!r}")
+
+    def append(self, value):
+        if self.kind == 'str':
+            self.data += ('' if value is None else str(value)).encode('utf-8')
+            self.offsets.append(len(self.data))
+        elif self.kind == 'cat':
+            value = '' if value is None else str(value)
+            code = self._index.get(value)
+            if code is None:
+                code = self._index[value] = len(self.vocab)
+                self.vocab.append(sys.intern(value))
+            self.codes.append(code)
+        else:
+            self.values.append(INT_NULL if value in (None, '') else int(value))
+
+    def get(self, i):
+        if self.kind == 'str':
+            return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+        if self.kind == 'cat':
+            return self.vocab[self.codes[i]]
+        value = self.values[i]
+        return None if value == INT_NULL else value
+
+    def buffers(self):
+        if self.kind == 'str':
+            return [('data', self.data), ('offsets', self.offsets)]
+        if self.kind == 'cat':
+            return [('codes', self.codes)]
+        return [('values', self.values)]
+
+    def nbytes(self):
+        total = sum(memoryview(buffer).nbytes for _, buffer in self.buffers())
+        if self.kind == 'cat':
+            total += sum(len(value.encode('utf-8')) for value in self.vocab)
+        return total
+
+
+class Row:
+    """Lazy view of one record: row.name or row['name']"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getattr__(self, name):
+        try:
+            return self._table.columns[name].get(self._index)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._table.columns[name].get(self._index)
+
+    def get(self, name, default=None):
+        column = self._table.columns.get(name)
+        return default if column is None else column.get(self._index)
+
+    def to_dict(self):
+        return {name: column.get(self._index) for name, column in self._table.columns.items()}
+
+    def __repr__(self):
+        return f"Row({self.to_dict()!r})"
+
+
+class Table:
+    """Columnar records with binary save / mmap load"""
+
+    def __init__(self, kind, schema, meta=None):
+        self.kind = kind
+        self.schema = schema
+        self.columns = {name: Column(column_kind) for name, column_kind in schema}
+        self.length = 0
+        self.meta = meta or {}
+        self._mmap = None
+        self._file = None
+
+    @classmethod
+    def build(cls, kind, schema, rows, meta=None):
+        """Build from flat row dicts (any iterable; consumed once)"""
+        table = cls(kind, schema, meta)
+        columns = list(table.columns.items())
+        for row in rows:
+            for name, column in columns:
+                column.append(row.get(name))
+            table.length += 1
+        return table
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError(i)
+        return Row(self, i)
+
+    def __iter__(self):
+        return (Row(self, i) for i in range(self.length))
+
+    def counts(self, name):
+        """Counter of values of a cat column, counted over the code array"""
+        column = self.columns[name]
+        if column.kind != 'cat':
+            return Counter(column.get(i) for i in range(self.length))
+        by_code = Counter(column.codes)
+        return Counter({column.vocab[code]: n for code, n in by_code.items()})
+
+    def nbytes(self):
+        return sum(column.nbytes() for column in self.columns.values())
+
+    # ---- persistence ----------------------------------------------------
+
+    def save(self, path):
+        """Write header + 8-byte aligned little-endian buffers; atomic replace"""
+        header = {'kind': self.kind, 'schema': self.schema, 'length': self.length,
+                  'meta': self.meta, 'byteorder': sys.byteorder, 'columns': {}}
+        layout = []
+        position = 0
+        for name, column in self.columns.items():
+            entry = {'buffers': {}}
+            if column.kind == 'cat':
+                entry['vocab'] = column.vocab
+            for buffer_name, buffer in column.buffers():
+                view = memoryview(buffer)
+                entry['buffers'][buffer_name] = [position, view.nbytes, view.format]
+                layout.append((position, view))
+                position += -(-view.nbytes // ALIGN) * ALIGN
+            header['columns'][name] = entry
+
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+        # A unique temp file per save, so concurrent saves of one snapshot don't collide
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC + len(header_bytes).to_bytes(8, 'little') + header_bytes)
+                f.write(b'\0' * (data_start - f.tell()))
+                for offset, view in layout:
+                    f.write(b'\0' * (data_start + offset - f.tell()))
+                    f.write(view)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Map a saved snapshot; columns are zero-copy views into the file"""
+        f = open(path, 'rb')
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            mapped.close()
+            f.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        header_length = int.from_bytes(mapped[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_end = len(MAGIC) + 8 + header_length
+        header = json.loads(mapped[len(MAGIC) + 8:header_end].decode('utf-8'))
+        data_start = -(-header_end // ALIGN) * ALIGN
+        swap = header['byteorder'] != sys.byteorder
+
+        table = cls(header['kind'], [tuple(column) for column in header['schema']], header['meta'])
+        table.length = header['length']
+        base = memoryview(mapped)
+        for name, entry in header['columns'].items():
+            column = table.columns[name]
+            for buffer_name, (offset, size, fmt) in entry['buffers'].items():
+                view = base[data_start + offset:data_start + offset + size]
+                if fmt != 'B':
+                    view = view.cast(fmt)
+                    if swap:
+                        view = array(fmt, view)
+                        view.byteswap()
+                setattr(column, buffer_name, view)
+            if column.kind == 'cat':
+                column.vocab = [sys.intern(value) for value in entry['vocab']]
+                column._index = None  # loaded tables are read-only
+        table._mmap, table._file = mapped, f
+        return table
+
+    def close(self):
+        """Release the mapping (rows/views from this table become invalid)"""
+        if self._mmap is None:
+            return
+        for column in self.columns.values():
+            for buffer_name, buffer in column.buffers():
+                if isinstance(buffer, memoryview):
+                    buffer.release()
+        self._mmap.close()
+        self._file.close()
+        self._mmap = self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fetch(client, kind, survey_id=None, page_size=1000):
+    """Stream users or one survey's answers from the API straight into a Table"""
+    meta = {'source': client.base_url, 'fetched_at': time.time()}
+    if kind == 'users':
+        return Table.build('users', USER_SCHEMA, (flat_row(u) for u in iter_users(client, page_size)), meta)
+    meta['survey_id'] = survey_id
+    answers = iter_records(client, f"/surveys/{survey_id}/answers/", page_size)
+    return Table.build('answers', ANSWER_SCHEMA, (flat_answer(a) for a in answers), meta)
+
+
+def load_or_fetch(client, kind, path, survey_id=None, max_age=None):
+    """
+    Open the snapshot at path if it is recent enough and was taken from the
+    same kind, survey and server (client.base_url), else download and save it
+    """
+    if os.path.exists(path):
+        if max_age is None or time.time() - os.path.getmtime(path) <= max_age:
+            table = Table.load(path)
+            if (table.kind == kind and table.meta.get('survey_id') == survey_id
+                    and table.meta.get('source') == client.base_url):
+                return table
+            table.close()
+    table = fetch(client, kind, survey_id)
+    table.save(path)
+    return table
+
+
+def print_info(table, path=None):
+    print("=" * 70)
+    print(f"SNAPSHOT: {table.kind}, {len(table):,} rows" + (f" ({path})" if path else ''))
+    print("=" * 70)
+    if path:
+        print(f"   File size: {os.path.getsize(path) / 1024:,.1f} KiB")
+    fetched = table.meta.get('fetched_at')
+    if fetched:
+        print(f"   Source: {table.meta.get('source')} at {time.strftime('%Y-%m-%d %H:%M', time.localtime(fetched))}")
+    print(f"   Column data: {table.nbytes() / 1024:,.1f} KiB "
+          f"({table.nbytes() / max(len(table), 1):.0f} bytes/row)")
+    for name, column in table.columns.items():
+        detail = f"{len(column.vocab):,} distinct" if column.kind == 'cat' else ''
+        print(f"   • {name:15} {column.kind:4} {column.nbytes() / 1024:10,.1f} KiB  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar user/answer snapshots')
+    parser.add_argument('kind', choices=['users', 'answers', 'info'])
+    parser.add_argument('arg', nargs='?', help='survey id (answers) or snapshot file (info)')
+    parser.add_argument('--out', help='snapshot file to write (default: <kind>.snap)')
+    parser.add_argument('--page-size', type=int, default=1000)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    if args.kind == 'info':
+        if not args.arg:
+            parser.error("info needs a snapshot file")
+        with Table.load(args.arg) as table:
+            print_info(table, args.arg)
+        return
+
+    survey_id = None
+    if args.kind == 'answers':
+        if not args.arg:
+            parser.error("answers needs a survey id")
+        survey_id = int(args.arg)
+    out = args.out or (f"answers_{survey_id}.snap" if survey_id else 'users.snap')
+
+    client = ApiClient(args.target, timeout=args.timeout)
+    start = time.perf_counter()
+    table = fetch(client, args.kind, survey_id, args.page_size)
+    table.save(out)
+    print(f"✓ Saved {len(table):,} {args.kind} to {out} in {time.perf_counter() - start:.1f}s")
+    print_info(table, out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Sparse fieldsets (?fields=id,username,role.name) for list endpoints
+
+Backend side, drop into capstone_backend's serializers:
+
+    from sparse_fields import SparseFieldsMixin
+
+    class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+        ...
+
+    GET /api/users/?fields=id,username,role.name,fakultas
+
+Only the requested fields are serialized (nested serializers are pruned by
+their dotted names); without ?fields= the response is unchanged, and a
+server without the mixin simply ignores the parameter, so clients can always
+send it. Unknown names are ignored rather than rejected.
+
+The same rules are applied to plain dicts by prune() (mock_backend.py), so the
+mock and the real backend answer a sparse request identically.
+"""
+
+FIELDS_PARAM = 'fields'
+
+
+def parse_fields(spec):
+    """'id,role.name,role.id' -> {'id': {}, 'role': {'name': {}, 'id': {}}}; None/'' -> None"""
+    if not spec:
+        return None
+    tree = {}
+    for name in spec.split(','):
+        node = tree
+        for part in name.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree or None
+
+
+def prune(value, tree):
+    """Apply a parse_fields() tree to JSON-like data (dicts, lists of dicts)"""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [prune(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: prune(item, tree[key]) for key, item in value.items() if key in tree}
+
+
+def _prune_fields(fields, tree):
+    """Drop the entries of a serializer's fields mapping outside tree, recursing into nested serializers"""
+    for name in list(fields):
+        if name not in tree:
+            del fields[name]
+            continue
+        nested = getattr(fields[name], 'child', fields[name])  # many=True wraps the serializer
+        if tree[name] and hasattr(nested, 'fields'):
+            # Not bound yet at this point: stop a nested SparseFieldsMixin
+            # from reading ?fields= as if it were the top-level serializer
+            nested._sparse_nested = True
+            _prune_fields(nested.fields, tree[name])
+
+
+class SparseFieldsMixin:
+    """Serializer mixin honouring ?fields= on GET requests (top-level serializer only)"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if getattr(self, '_sparse_nested', False) or (
+                parent is not None and not (getattr(parent, 'child', None) is self and parent.parent is None)):
+            return fields  # nested: pruned by the top-level serializer
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return fields
+        tree = parse_fields(request.query_params.get(FIELDS_PARAM))
+        if not tree:
+            return fields
+        _prune_fields(fields, tree)
+        return fields
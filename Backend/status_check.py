@@ -1,40 +1,281 @@
+"""
+Backend status check
+
+Usage:
+    python status_check.py                                  # one-shot check
+    python status_check.py --monitor --interval 15 --port 9108
+
+--monitor keeps polling with lightweight probes, GET ?page_size=1&fields=id,
+instead of downloading full lists. HEAD is not used: Django/DRF answer it by
+running the whole GET view (queryset and serialization included) and dropping
+the body, so a HEAD of /users/ costs as much as the full list. A server
+without pagination or ?fields= ignores both parameters; such full-size
+responses are reported (and exported as tracer_probe_response_bytes).
+
+Per endpoint it keeps cumulative latency histograms labelled by outcome (ok,
+http_error, timeout, connection_error; failed probes are timed too),
+request/error counters and a rolling window of recent latencies, and serves
+them in Prometheus text format at http://localhost:<port>/metrics for
+alerting on latency creep.
+"""
+import argparse
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import requests
 
-print("\n" + "="*70)
-print("🔍 QUICK BACKEND STATUS CHECK")
-print("="*70)
-
-try:
-    # Test 1: Roles
-    response = requests.get("http://localhost:8000/api/roles/", timeout=2)
-    print("\n✅ ROLES ENDPOINT: Working")
-    roles = response.json()
-    print(f"   - {len(roles)} roles available")
-    for role in roles:
-        print(f"     • ID {role['id']}: {role['name']}")
-    
-    # Test 2: Users
-    response = requests.get("http://localhost:8000/api/users/", timeout=2)
-    print("\n✅ USERS ENDPOINT: Working")
-    users = response.json()
-    print(f"   - {len(users)} users in database")
-    
-    # Test 3: Surveys
-    response = requests.get("http://localhost:8000/api/surveys/", timeout=2)
-    print("\n✅ SURVEYS ENDPOINT: Working")
-    surveys = response.json()
-    print(f"   - {len(surveys)} surveys available")
-    
+from api_client import ApiClient, TimingRecorder, add_client_arguments
+from latency_stats import percentile
+from reference_data import load_reference
+
+MONITOR_ENDPOINTS = ['/roles/', '/users/', '/surveys/', '/unit/program-studies/']
+# Smallest body a list endpoint can send: one record (paginated), id only (?fields=)
+PROBE_PARAMS = {'page_size': 1, 'fields': 'id'}
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le' labels)
+BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def count_of(body):
+    """Record count of a list response, paginated ({'count': ..., 'results': ...}) or not"""
+    return body['count'] if isinstance(body, dict) else len(body)
+
+
+def run_once(client, timings):
     print("\n" + "="*70)
-    print("🎉 BACKEND IS FULLY OPERATIONAL!")
+    print("🔍 QUICK BACKEND STATUS CHECK")
     print("="*70)
-    print("\n✅ All three problematic features are now fixed:")
-    print("   1. ✅ User Management - Add User: WORKING")
-    print("   2. ✅ Employee Directory - Add Employee: WORKING")  
-    print("   3. ✅ Submit Questionnaire: READY (needs surveys)")
-    print("\n📱 Ready to test in Flutter app!")
-    print("="*70 + "\n")
-    
-except Exception as e:
-    print(f"\n❌ ERROR: {e}")
-    print("   Make sure Django server is running on port 8000\n")
+
+    try:
+        # Test 1: Roles (reference bundle, a 304 when the cached copy is current)
+        reference, how = load_reference(client, revalidate=True)
+        print(f"\n✅ REFERENCE DATA: Working ({how})")
+        roles = reference['roles']
+        print(f"   - {len(roles)} roles available")
+        for role in roles:
+            print(f"     • ID {role['id']}: {role['name']}")
+        print(f"   - {len(reference['program_studies'])} program studies, "
+              f"{len(reference['faculties'])} faculties, {len(reference['departments'])} departments")
+
+        # Test 2: Users (only counted, so only ids are requested)
+        response = client.get("/users/", params={"fields": "id"})
+        print("\n✅ USERS ENDPOINT: Working")
+        print(f"   - {count_of(response.json())} users in database")
+
+        # Test 3: Surveys
+        response = client.get("/surveys/", params={"fields": "id"})
+        print("\n✅ SURVEYS ENDPOINT: Working")
+        print(f"   - {count_of(response.json())} surveys available")
+
+        print(f"\n⏱  Timings against {client.base_url}:")
+        timings.print_summary()
+
+        print("\n" + "="*70)
+        print("🎉 BACKEND IS FULLY OPERATIONAL!")
+        print("="*70)
+        print("\n✅ All three problematic features are now fixed:")
+        print("   1. ✅ User Management - Add User: WORKING")
+        print("   2. ✅ Employee Directory - Add Employee: WORKING")
+        print("   3. ✅ Submit Questionnaire: READY (needs surveys)")
+        print("\n📱 Ready to test in Flutter app!")
+        print("="*70 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        print("   Make sure Django server is running on port 8000\n")
+
+
+class EndpointMetrics:
+    """Per-outcome cumulative histograms + counters + rolling window for one endpoint"""
+
+    def __init__(self, window):
+        self.histograms = {}  # outcome -> {'buckets': [...], 'count': n, 'sum': seconds}
+        self.errors = 0
+        self.up = 0
+        self.recent = deque(maxlen=window)
+        self.response_bytes = 0
+        self.oversized = None
+
+    def observe(self, seconds, outcome):
+        """Every probe is timed, failed ones included (a slow 5xx or a timeout is latency too)"""
+        histogram = self.histograms.setdefault(outcome, {'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0})
+        histogram['count'] += 1
+        histogram['sum'] += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram['buckets'][i] += 1
+        self.recent.append(seconds)
+        if outcome != 'ok':
+            self.errors += 1
+        self.up = 1 if outcome == 'ok' else 0
+
+
+def oversized(response):
+    """Why a probe response is more than one id-only record, or None"""
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    records = body.get('results') if isinstance(body, dict) else body
+    if not isinstance(records, list):
+        return None
+    reasons = []
+    if len(records) > 1:
+        reasons.append(f"{len(records)} records, page_size ignored")
+    if records and isinstance(records[0], dict) and set(records[0]) - {'id'}:
+        reasons.append("fields ignored")
+    return ', '.join(reasons) or None
+
+
+class Monitor:
+    """Polls the endpoints and renders the Prometheus exposition"""
+
+    def __init__(self, client, endpoints, window):
+        self.client = client
+        self.endpoints = endpoints
+        self.metrics = {endpoint: EndpointMetrics(window) for endpoint in endpoints}
+        self.lock = threading.Lock()
+
+    def probe(self, endpoint):
+        """
+        One page of one id (see the module docstring)
+
+        Returns (seconds, outcome, response bytes, oversized reason); outcome
+        is 'ok', 'http_error', 'timeout' or 'connection_error'.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.client.get(endpoint, params=PROBE_PARAMS)
+            size = len(response.content)
+        except requests.Timeout:
+            return time.perf_counter() - start, 'timeout', 0, None
+        except requests.RequestException:
+            return time.perf_counter() - start, 'connection_error', 0, None
+        seconds = time.perf_counter() - start
+        if response.status_code >= 400:
+            return seconds, 'http_error', size, None
+        return seconds, 'ok', size, oversized(response)
+
+    def poll(self):
+        """Probe every endpoint; returns {endpoint: (seconds, outcome, newly oversized reason)}"""
+        results = {endpoint: self.probe(endpoint) for endpoint in self.endpoints}
+        report = {}
+        with self.lock:
+            for endpoint, (seconds, outcome, size, reason) in results.items():
+                m = self.metrics[endpoint]
+                m.observe(seconds, outcome)
+                if outcome == 'ok':
+                    m.response_bytes = size
+                    newly = reason if reason and not m.oversized else None
+                    m.oversized = reason
+                else:
+                    newly = None
+                report[endpoint] = (seconds, outcome, newly)
+        return report
+
+    def render(self):
+        lines = [
+            '# HELP tracer_probe_duration_seconds Latency of lightweight API probes, by outcome',
+            '# TYPE tracer_probe_duration_seconds histogram',
+        ]
+        with self.lock:
+            for endpoint, m in self.metrics.items():
+                for outcome, histogram in sorted(m.histograms.items()):
+                    label = f'endpoint="{endpoint}",outcome="{outcome}"'
+                    for bound, count in zip(BUCKETS, histogram['buckets']):
+                        lines.append(f'tracer_probe_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'tracer_probe_duration_seconds_bucket{{{label},le="+Inf"}} {histogram["count"]}')
+                    lines.append(f'tracer_probe_duration_seconds_sum{{{label}}} {histogram["sum"]:.6f}')
+                    lines.append(f'tracer_probe_duration_seconds_count{{{label}}} {histogram["count"]}')
+
+            lines += ['# HELP tracer_probe_errors_total Failed probes (HTTP >= 400 or no response)',
+                      '# TYPE tracer_probe_errors_total counter']
+            lines += [f'tracer_probe_errors_total{{endpoint="{e}"}} {m.errors}'
+                      for e, m in self.metrics.items()]
+
+            lines += ['# HELP tracer_probe_up Whether the last probe succeeded',
+                      '# TYPE tracer_probe_up gauge']
+            lines += [f'tracer_probe_up{{endpoint="{e}"}} {m.up}' for e, m in self.metrics.items()]
+
+            lines += ['# HELP tracer_probe_response_bytes Body size of the last successful probe',
+                      '# TYPE tracer_probe_response_bytes gauge']
+            lines += [f'tracer_probe_response_bytes{{endpoint="{e}"}} {m.response_bytes}'
+                      for e, m in self.metrics.items()]
+
+            lines += ['# HELP tracer_probe_window_latency_seconds Latency quantiles over the rolling window',
+                      '# TYPE tracer_probe_window_latency_seconds gauge']
+            for endpoint, m in self.metrics.items():
+                recent = sorted(m.recent)
+                if not recent:
+                    continue
+                for q in (50, 95, 99):
+                    lines.append(f'tracer_probe_window_latency_seconds{{endpoint="{endpoint}",'
+                                 f'quantile="0.{q}"}} {percentile(recent, q):.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(monitor, port):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = monitor.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_monitor(client, args):
+    monitor = Monitor(client, MONITOR_ENDPOINTS, args.window)
+    serve_metrics(monitor, args.port)
+    print(f"📡 Monitoring {client.base_url} every {args.interval}s")
+    print(f"   Metrics: http://127.0.0.1:{args.port}/metrics (Ctrl+C to stop)")
+    try:
+        while True:
+            cycle_start = time.monotonic()
+            results = monitor.poll()
+            status = ' | '.join(f"{'✅' if outcome == 'ok' else '❌'} {endpoint} {seconds * 1000:.0f}ms"
+                                for endpoint, (seconds, outcome, _) in results.items())
+            print(f"{time.strftime('%H:%M:%S')} {status}")
+            for endpoint, (_, _, reason) in results.items():
+                if reason:
+                    print(f"⚠️  {endpoint} probe is not lightweight ({reason}): the server lacks "
+                          f"pagination or ?fields=, so every probe downloads the full list")
+            time.sleep(max(0.0, args.interval - (time.monotonic() - cycle_start)))
+    except KeyboardInterrupt:
+        print("\n👋 Monitor stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backend status check / monitor')
+    parser.add_argument('--monitor', action='store_true', help='keep polling and serve metrics')
+    parser.add_argument('--interval', type=float, default=15, help='seconds between probe rounds')
+    parser.add_argument('--port', type=int, default=9108, help='Prometheus metrics port')
+    parser.add_argument('--window', type=int, default=240,
+                        help='probes per endpoint kept for the rolling quantiles')
+    add_client_arguments(parser)
+    parser.set_defaults(timeout=2)
+    args = parser.parse_args()
+
+    if args.monitor:
+        # No retries: a slow or failing probe is exactly what should be seen
+        run_monitor(ApiClient(args.target, timeout=args.timeout, retries=0), args)
+    else:
+        timings = TimingRecorder()
+        run_once(ApiClient(args.target, timeout=args.timeout, hooks=[timings]), timings)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+SUBMISSION BENCHMARK - per-answer vs bulk questionnaire submission
+Usage:
+    python submit_bench.py --alumni 50 --concurrency 10
+    python submit_bench.py --survey 11 --batch-sizes 1,5,20,all --alumni 200 --concurrency 25
+
+Each simulated alumnus submits a complete questionnaire for one survey,
+either one POST /surveys/{id}/answers/ per answer (what final_test.py and
+test_flutter_scenarios.py do) or through POST /surveys/{id}/answers/bulk/
+(ApiConfig.surveyAnswersBulk) in batches of N answers. Alumni submit
+concurrently. For every mode the report shows answers/sec, requests/sec,
+request latency percentiles and server time per answer, which is the data
+for choosing the batch size the mobile app should use.
+
+This writes answers: point it at a local or staging backend.
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api_client import ApiClient, PRODUCTION_URL, add_client_arguments
+from latency_stats import summarize
+from list_users import iter_users
+from seed_dataset import answer_for
+
+
+def load_questions(client, survey_id):
+    """[(question_id, question_type)] for every section of the survey"""
+    questions = []
+    sections = client.get_json(f"/surveys/{survey_id}/sections/")
+    if isinstance(sections, dict):
+        sections = sections.get('results', [])
+    for section in sections:
+        section_questions = client.get_json(f"/surveys/{survey_id}/sections/{section['id']}/questions/")
+        if isinstance(section_questions, dict):
+            section_questions = section_questions.get('results', [])
+        questions += [(q['id'], q.get('question_type', 'text')) for q in section_questions]
+    return questions
+
+
+def load_alumni(client, count):
+    """First `count` user ids with the Alumni role"""
+    alumni = []
+    for user in iter_users(client):
+        if user.get('role') and user['role'].get('name') == 'Alumni':
+            alumni.append(user['id'])
+            if len(alumni) == count:
+                break
+    return alumni
+
+
+def build_answers(user_id, questions, rng):
+    answers = []
+    for question_id, question_type in questions:
+        text, value = answer_for(question_type, rng)
+        answers.append({
+            "user_id": user_id,
+            "question_id": question_id,
+            "answer_text": text,
+            "answer_value": value,
+        })
+    return answers
+
+
+class ModeResult:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.per_answer = []
+        self.answers = 0
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, elapsed, answer_count, ok):
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self.answers += answer_count
+                self.latencies.append(elapsed)
+                self.per_answer.append(elapsed / answer_count)
+            else:
+                self.errors += 1
+
+
+def submit_questionnaire(client, survey_id, answers, batch_size, result):
+    """Submit one alumnus' answers; batch_size None = one request per answer"""
+    if batch_size is None:
+        chunks = [[answer] for answer in answers]
+    else:
+        chunks = [answers[i:i + batch_size] for i in range(0, len(answers), batch_size)]
+    for chunk in chunks:
+        start = time.perf_counter()
+        try:
+            if batch_size is None:
+                response = client.post(f"/surveys/{survey_id}/answers/", json=chunk[0])
+            else:
+                response = client.post(f"/surveys/{survey_id}/answers/bulk/", json={'answers': chunk})
+            ok = response.status_code in (200, 201)
+        except requests.RequestException:
+            ok = False
+        result.record(time.perf_counter() - start, len(chunk), ok)
+
+
+def run_mode(client, survey_id, alumni, questions, batch_size, concurrency, seed):
+    result = ModeResult()
+    rng = random.Random(seed)
+    payloads = [build_answers(user_id, questions, rng) for user_id in alumni]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(submit_questionnaire, client, survey_id, answers, batch_size, result)
+                       for answers in payloads]:
+            future.result()
+    return result, time.perf_counter() - start
+
+
+def parse_batch_sizes(text, question_count):
+    """'1,5,all' -> [None, 5, question_count]; 1 means per-answer endpoint"""
+    sizes = []
+    for part in text.split(','):
+        part = part.strip().lower()
+        if part in ('1', 'single'):
+            sizes.append(None)
+        elif part == 'all':
+            sizes.append(question_count)
+        else:
+            sizes.append(int(part))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-answer vs bulk submission benchmark')
+    parser.add_argument('--survey', type=int, default=None, help='survey id (default: first survey)')
+    parser.add_argument('--alumni', type=int, default=20, help='simulated alumni per mode')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--batch-sizes', default='1,5,20,all',
+                        help="comma-separated; 1 = per-answer endpoint, 'all' = whole questionnaire")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--allow-production', action='store_true')
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    # Submission storms should show up as failures, not be smoothed by retries
+    client = ApiClient(args.target, timeout=args.timeout, retries=0, pool_size=args.concurrency)
+    if client.base_url == PRODUCTION_URL and not args.allow_production:
+        print("❌ Refusing to write benchmark answers to production (use --allow-production)")
+        return
+
+    survey_id = args.survey
+    if survey_id is None:
+        surveys = client.get_json("/surveys/")
+        surveys = surveys.get('results', []) if isinstance(surveys, dict) else surveys
+        if not surveys:
+            print("⚠️  NO SURVEYS IN DATABASE")
+            return
+        survey_id = surveys[0]['id']
+
+    questions = load_questions(client, survey_id)
+    alumni = load_alumni(client, args.alumni)
+    if not questions or not alumni:
+        print(f"⚠️  Need questions and alumni (found {len(questions)} questions, {len(alumni)} alumni)")
+        return
+
+    print("=" * 100)
+    print(f"SUBMISSION BENCHMARK - survey {survey_id}: {len(questions)} questions, "
+          f"{len(alumni)} alumni, concurrency {args.concurrency}")
+    print("=" * 100)
+    print(f"{'MODE':14} {'ANSWERS/s':>10} {'REQS/s':>9} {'ERRORS':>7} {'P50 ms':>9} {'P95 ms':>9} "
+          f"{'P99 ms':>9} {'ms/ANSWER':>10}")
+    print("-" * 100)
+
+    for batch_size in parse_batch_sizes(args.batch_sizes, len(questions)):
+        result, wall = run_mode(client, survey_id, alumni, questions, batch_size,
+                                args.concurrency, args.seed)
+        label = 'per-answer' if batch_size is None else f"bulk x{batch_size}"
+        stats = summarize(result.latencies)
+        per_answer = summarize(result.per_answer)
+        if stats['count']:
+            latency = f"{stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f} {per_answer['p50_ms']:10.2f}"
+        else:
+            latency = f"{'-':>9} {'-':>9} {'-':>9} {'-':>10}"
+        print(f"{label:14} {result.answers / wall:10.1f} {result.requests / wall:9.1f} "
+              f"{result.errors:7d} {latency}")
+    print("=" * 100)
+    print("ms/ANSWER is the median request latency divided by the answers it carried")
+
+
+if __name__ == '__main__':
+    main()
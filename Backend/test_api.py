@@ -1,7 +1,8 @@
-import requests
 import json
 
-BASE_URL = "http://localhost:8000/api"
+from api_client import ApiClient
+
+client = ApiClient()
 
 print("=" * 60)
 print("TESTING BACKEND API")
@@ -10,7 +11,7 @@ print("=" * 60)
 # Test 1: GET /api/users/
 print("\n1. Testing GET /api/users/")
 try:
-    response = requests.get(f"{BASE_URL}/users/", timeout=5)
+    response = client.get("/users/", timeout=5)
     print(f"   Status: {response.status_code}")
     print(f"   Response: {json.dumps(response.json(), indent=2)[:200]}")
 except Exception as e:
@@ -19,7 +20,7 @@ except Exception as e:
 # Test 2: GET /api/roles/
 print("\n2. Testing GET /api/roles/")
 try:
-    response = requests.get(f"{BASE_URL}/roles/", timeout=5)
+    response = client.get("/roles/", timeout=5)
     print(f"   Status: {response.status_code}")
     print(f"   Response: {json.dumps(response.json(), indent=2)[:200]}")
 except Exception as e:
@@ -37,10 +38,9 @@ user_data = {
     "password": "testpass123"
 }
 try:
-    response = requests.post(
-        f"{BASE_URL}/users/",
+    response = client.post(
+        "/users/",
         json=user_data,
-        headers={"Content-Type": "application/json"},
         timeout=5
     )
     print(f"   Status: {response.status_code}")
@@ -51,7 +51,7 @@ except Exception as e:
 # Test 4: GET /api/surveys/
 print("\n4. Testing GET /api/surveys/")
 try:
-    response = requests.get(f"{BASE_URL}/surveys/", timeout=5)
+    response = client.get("/surveys/", timeout=5)
     print(f"   Status: {response.status_code}")
     print(f"   Response: {json.dumps(response.json(), indent=2)[:200]}")
 except Exception as e:
@@ -1,7 +1,8 @@
-import requests
 import json
 
-BASE_URL = "http://localhost:8000/api"
+from api_client import ApiClient
+
+client = ApiClient()
 
 print("=" * 70)
 print("TESTING USER CREATION (Simulating Flutter App)")
@@ -19,10 +20,9 @@ employee_data = {
     "password": "password123"
 }
 try:
-    response = requests.post(
-        f"{BASE_URL}/users/",
+    response = client.post(
+        "/users/",
         json=employee_data,
-        headers={"Content-Type": "application/json"},
         timeout=5
     )
     print(f"   Status: {response.status_code}")
@@ -50,10 +50,9 @@ admin_data = {
     "password": "admin123"
 }
 try:
-    response = requests.post(
-        f"{BASE_URL}/users/",
+    response = client.post(
+        "/users/",
         json=admin_data,
-        headers={"Content-Type": "application/json"},
         timeout=5
     )
     print(f"   Status: {response.status_code}")
@@ -81,10 +80,9 @@ prodi_data = {
     "password": "prodi123"
 }
 try:
-    response = requests.post(
-        f"{BASE_URL}/users/",
+    response = client.post(
+        "/users/",
         json=prodi_data,
-        headers={"Content-Type": "application/json"},
         timeout=5
     )
     print(f"   Status: {response.status_code}")
@@ -104,7 +102,7 @@ except Exception as e:
 print("\n4. Testing Survey Answer Submission")
 # First, let's check if there are any surveys
 try:
-    response = requests.get(f"{BASE_URL}/surveys/", timeout=5)
+    response = client.get("/surveys/", timeout=5)
     surveys = response.json() if response.status_code == 200 else []
     if surveys:
         survey_id = surveys[0]['id']
@@ -116,10 +114,9 @@ try:
             "question_id": 1,
             "answer_text": "Test answer"
         }
-        response = requests.post(
-            f"{BASE_URL}/surveys/{survey_id}/answers/",
+        response = client.post(
+            f"/surveys/{survey_id}/answers/",
             json=answer_data,
-            headers={"Content-Type": "application/json"},
             timeout=5
         )
         print(f"   Answer submission status: {response.status_code}")
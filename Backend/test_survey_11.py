@@ -1,11 +1,6 @@
-import os
-import sys
-import django
-
-# Add the project to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'capstone_backend'))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'capstone_backend.settings')
-django.setup()
+import django_env
+
+django_env.setup()
 
 from api.models import Survey, Section, Question
 from api.serializers import SurveySerializer, SectionSerializer, QuestionSerializer
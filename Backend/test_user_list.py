@@ -1,16 +1,23 @@
-import requests
 from collections import Counter
 
-users = requests.get('http://localhost:8000/api/users/').json()
-print(f'\nTotal users returned: {len(users)}')
+from api_client import ApiClient
+from list_users import USER_SUMMARY_FIELDS, iter_users, role_name
+
+# Stream users instead of loading the whole list: only the counts and the
+# first 10 rows are kept, and only the fields printed below are requested
+roles = Counter()
+first_users = []
+for u in iter_users(ApiClient(), fields=USER_SUMMARY_FIELDS):
+    roles[u['role']['name'] if u.get('role') else 'None'] += 1
+    if len(first_users) < 10:
+        first_users.append(u)
+print(f'\nTotal users returned: {sum(roles.values())}')
 
-roles = [u['role']['name'] if u.get('role') else 'None' for u in users]
 print('\nUsers by role:')
-for role, count in Counter(roles).items():
+for role, count in roles.items():
     print(f'  {role}: {count}')
 
 print('\nUser list:')
-for u in users[:10]:
-    role_name = u['role']['name'] if u.get('role') else 'No role'
+for u in first_users:
     fakultas = u.get('fakultas', '-')
-    print(f'  - {u["id"]}: {u["username"]} (Role: {role_name}, Fakultas: {fakultas})')
+    print(f'  - {u["id"]}: {u["username"]} (Role: {role_name(u)}, Fakultas: {fakultas})')
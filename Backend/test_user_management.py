@@ -1,122 +1,259 @@
 """
 Comprehensive test of User Management fixes
+
+Usage:
+    python test_user_management.py                      # functional checks
+    python test_user_management.py --benchmark          # compare against baseline
+    python test_user_management.py --benchmark --update-baseline
+
+Benchmark mode warms each read endpoint up, takes repeated perf_counter
+samples, and compares p95 latency against the JSON baseline in
+benchmarks/user_management_baseline.json. The run fails (exit code 1) when an
+endpoint's p95 regresses by more than --threshold, or when there is no baseline
+to compare against (record one with --update-baseline).
 """
+import argparse
+import json
+import os
+import sys
 import requests
 import time
 from datetime import datetime
 
-BASE_URL = "http://localhost:8000/api"
-
-print("=" * 80)
-print("COMPREHENSIVE USER MANAGEMENT TEST")
-print("=" * 80)
-
-# Test 1: API Response Time
-print("\n1. Testing API Response Time (should be < 5 seconds)...")
-start = time.time()
-response = requests.get(f"{BASE_URL}/users/")
-elapsed = time.time() - start
-print(f"   ✅ Users API responded in {elapsed:.2f} seconds")
-if elapsed > 5:
-    print(f"   ⚠️  Warning: Response took longer than 5 seconds")
-
-# Test 2: Roles Endpoint
-print("\n2. Testing Roles Endpoint...")
-start = time.time()
-roles_response = requests.get(f"{BASE_URL}/roles/")
-elapsed = time.time() - start
-roles = roles_response.json()
-print(f"   ✅ Roles API responded in {elapsed:.2f} seconds")
-print(f"   ✅ Found {len(roles)} roles:")
-for role in roles:
-    print(f"      - ID {role['id']}: {role['name']}")
-
-# Test 3: Only Alumni Users Returned
-print("\n3. Testing User Filtering (should only return Alumni)...")
-users = response.json()
-print(f"   ✅ Total users returned: {len(users)}")
-
-role_names = [u['role']['name'] if u.get('role') else 'None' for u in users]
-unique_roles = set(role_names)
-print(f"   ✅ Unique roles in response: {unique_roles}")
-
-if unique_roles == {'Alumni'}:
-    print(f"   ✅ PASS: Only Alumni users returned")
-else:
-    print(f"   ❌ FAIL: Found non-Alumni users: {unique_roles - {'Alumni'}}")
-
-# Test 4: Role Display
-print("\n4. Testing Role Display...")
-alumni_count = sum(1 for u in users if u.get('role') and u['role']['name'] == 'Alumni')
-null_role_count = sum(1 for u in users if not u.get('role'))
-print(f"   ✅ Users with Alumni role: {alumni_count}")
-print(f"   {'✅' if null_role_count == 0 else '❌'} Users with null role: {null_role_count}")
-
-# Test 5: Fakultas Display
-print("\n5. Testing Fakultas Display...")
-users_with_fakultas = sum(1 for u in users if u.get('fakultas'))
-users_without_fakultas = len(users) - users_with_fakultas
-print(f"   ✅ Users with fakultas: {users_with_fakultas}")
-print(f"   ✅ Users without fakultas: {users_without_fakultas}")
-
-if users_with_fakultas > 0:
-    print(f"   ✅ Sample users with fakultas:")
-    for u in users[:3]:
-        if u.get('fakultas'):
-            print(f"      - {u['id']}: {u['username']} -> {u['fakultas']}")
-
-# Test 6: Create New User
-print("\n6. Testing User Creation...")
-test_user_id = f"test{int(time.time())}"
-new_user = {
-    "id": test_user_id,
-    "username": "Test User Creation",
-    "email": f"{test_user_id}@test.com",
-    "phone_number": "0812345678",
-    "role_id": 4,  # Alumni
-    "program_study_id": 1,
-    "password": "testpass123"
+from api_client import ApiClient, add_client_arguments
+from latency_stats import summarize
+from list_users import iter_records, iter_users
+from reference_data import load_reference
+
+# Replaced in main() with the --target/--timeout options
+client = ApiClient(timeout=None)
+
+# Endpoints the user management page loads
+BENCHMARK_ENDPOINTS = {
+    'users': '/users/',
+    'roles': '/roles/',
+    'program_studies': '/unit/program-studies/',
 }
 
-try:
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'benchmarks', 'user_management_baseline.json')
+
+
+def run_functional_checks():
+    """Functional checks of the user management page endpoints"""
+    print("=" * 80)
+    print("COMPREHENSIVE USER MANAGEMENT TEST")
+    print("=" * 80)
+
+    # Test 1: API Response Time
+    print("\n1. Testing API Response Time (should be < 5 seconds)...")
+    start = time.time()
+    users = list(iter_users(client))  # plain array or paginated, all pages
+    elapsed = time.time() - start
+    print(f"   ✅ Users API responded in {elapsed:.2f} seconds")
+    if elapsed > 5:
+        print(f"   ⚠️  Warning: Response took longer than 5 seconds")
+
+    # Test 2: Roles Endpoint (checked on its own, not through the reference bundle)
+    print("\n2. Testing Roles Endpoint...")
     start = time.time()
-    create_response = requests.post(f"{BASE_URL}/users/", json=new_user, timeout=60)
+    roles = list(iter_records(client, "/roles/"))
     elapsed = time.time() - start
-    
-    if create_response.status_code == 201:
-        created_user = create_response.json()
-        print(f"   ✅ User created in {elapsed:.2f} seconds")
-        print(f"      - ID: {created_user['id']}")
-        print(f"      - Username: {created_user['username']}")
-        print(f"      - Role: {created_user['role']['name']}")
-        print(f"      - Fakultas: {created_user.get('fakultas', 'N/A')}")
-        print(f"      - Password: {created_user.get('plain_password', 'N/A')}")
+    print(f"   ✅ Roles API responded in {elapsed:.2f} seconds")
+    print(f"   ✅ Found {len(roles)} roles:")
+    for role in roles:
+        print(f"      - ID {role['id']}: {role['name']}")
+
+    # Test 3: Only Alumni Users Returned
+    print("\n3. Testing User Filtering (should only return Alumni)...")
+    print(f"   ✅ Total users returned: {len(users)}")
+
+    role_names = [u['role']['name'] if u.get('role') else 'None' for u in users]
+    unique_roles = set(role_names)
+    print(f"   ✅ Unique roles in response: {unique_roles}")
+
+    if unique_roles == {'Alumni'}:
+        print(f"   ✅ PASS: Only Alumni users returned")
     else:
-        print(f"   ❌ Failed to create user: Status {create_response.status_code}")
-        print(f"      Response: {create_response.text[:200]}")
-except requests.Timeout:
-    print(f"   ❌ TIMEOUT: User creation took longer than 60 seconds")
-except Exception as e:
-    print(f"   ❌ ERROR: {e}")
-
-# Test 7: Program Studies Endpoint
-print("\n7. Testing Program Studies Endpoint...")
-start = time.time()
-ps_response = requests.get(f"{BASE_URL}/unit/program-studies/")
-elapsed = time.time() - start
-program_studies = ps_response.json()
-print(f"   ✅ Program Studies API responded in {elapsed:.2f} seconds")
-print(f"   ✅ Found {len(program_studies)} program studies")
-
-# Final Summary
-print("\n" + "=" * 80)
-print("TEST SUMMARY")
-print("=" * 80)
-print(f"✅ All APIs responding")
-print(f"✅ Response times acceptable")
-print(f"✅ Only Alumni users displayed")
-print(f"✅ Roles displaying correctly")
-print(f"✅ Fakultas displaying correctly")
-print(f"✅ User creation working")
-print("\n🎉 USER MANAGEMENT PAGE IS FULLY FUNCTIONAL!")
-print("=" * 80)
+        print(f"   ❌ FAIL: Found non-Alumni users: {unique_roles - {'Alumni'}}")
+
+    # Test 4: Role Display
+    print("\n4. Testing Role Display...")
+    alumni_count = sum(1 for u in users if u.get('role') and u['role']['name'] == 'Alumni')
+    null_role_count = sum(1 for u in users if not u.get('role'))
+    print(f"   ✅ Users with Alumni role: {alumni_count}")
+    print(f"   {'✅' if null_role_count == 0 else '❌'} Users with null role: {null_role_count}")
+
+    # Test 5: Fakultas Display
+    print("\n5. Testing Fakultas Display...")
+    users_with_fakultas = sum(1 for u in users if u.get('fakultas'))
+    users_without_fakultas = len(users) - users_with_fakultas
+    print(f"   ✅ Users with fakultas: {users_with_fakultas}")
+    print(f"   ✅ Users without fakultas: {users_without_fakultas}")
+
+    if users_with_fakultas > 0:
+        print(f"   ✅ Sample users with fakultas:")
+        for u in users[:3]:
+            if u.get('fakultas'):
+                print(f"      - {u['id']}: {u['username']} -> {u['fakultas']}")
+
+    # Test 6: Create New User
+    print("\n6. Testing User Creation...")
+    test_user_id = f"test{int(time.time())}"
+    new_user = {
+        "id": test_user_id,
+        "username": "Test User Creation",
+        "email": f"{test_user_id}@test.com",
+        "phone_number": "0812345678",
+        "role_id": 4,  # Alumni
+        "program_study_id": 1,
+        "password": "testpass123"
+    }
+
+    try:
+        start = time.time()
+        create_response = client.post("/users/", json=new_user, timeout=60)
+        elapsed = time.time() - start
+
+        if create_response.status_code == 201:
+            created_user = create_response.json()
+            print(f"   ✅ User created in {elapsed:.2f} seconds")
+            print(f"      - ID: {created_user['id']}")
+            print(f"      - Username: {created_user['username']}")
+            print(f"      - Role: {created_user['role']['name']}")
+            print(f"      - Fakultas: {created_user.get('fakultas', 'N/A')}")
+            print(f"      - Password: {created_user.get('plain_password', 'N/A')}")
+        else:
+            print(f"   ❌ Failed to create user: Status {create_response.status_code}")
+            print(f"      Response: {create_response.text[:200]}")
+    except requests.Timeout:
+        print(f"   ❌ TIMEOUT: User creation took longer than 60 seconds")
+    except Exception as e:
+        print(f"   ❌ ERROR: {e}")
+
+    # Test 7: Program Studies (reference bundle, as the user form loads them)
+    print("\n7. Testing Program Studies (reference data bundle)...")
+    start = time.time()
+    reference, how = load_reference(client)
+    elapsed = time.time() - start
+    program_studies = reference['program_studies']
+    print(f"   ✅ Reference data loaded in {elapsed:.2f} seconds ({how})")
+    print(f"   ✅ Found {len(program_studies)} program studies")
+
+    # Final Summary
+    print("\n" + "=" * 80)
+    print("TEST SUMMARY")
+    print("=" * 80)
+    print(f"✅ All APIs responding")
+    print(f"✅ Response times acceptable")
+    print(f"✅ Only Alumni users displayed")
+    print(f"✅ Roles displaying correctly")
+    print(f"✅ Fakultas displaying correctly")
+    print(f"✅ User creation working")
+    print("\n🎉 USER MANAGEMENT PAGE IS FULLY FUNCTIONAL!")
+    print("=" * 80)
+
+
+def benchmark_endpoint(bench_client, path, warmup, samples):
+    """Return latency samples (seconds) for path after warmup requests"""
+    for _ in range(warmup):
+        bench_client.get(path)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        response = bench_client.get(path)
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return timings
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Compare p95 latencies with the baseline
+
+    Returns a list of (endpoint, baseline_p95, current_p95) regressions that
+    exceed baseline_p95 * (1 + threshold).
+    """
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get('endpoints', {}).get(name)
+        if not reference:
+            continue
+        limit = reference['p95_ms'] * (1 + threshold)
+        if stats['p95_ms'] > limit:
+            regressions.append((name, reference['p95_ms'], stats['p95_ms']))
+    return regressions
+
+
+def run_benchmark(args):
+    print("=" * 80)
+    print("USER MANAGEMENT LATENCY BENCHMARK")
+    print("=" * 80)
+    print(f"   Warmup: {args.warmup}, samples: {args.samples}, threshold: +{args.threshold:.0%}")
+
+    # No retries, so a retried request cannot hide inside one sample
+    bench_client = ApiClient(args.target, timeout=args.timeout, retries=0)
+    results = {}
+    for name, path in BENCHMARK_ENDPOINTS.items():
+        timings = benchmark_endpoint(bench_client, path, args.warmup, args.samples)
+        results[name] = summarize(timings)
+        stats = results[name]
+        print(f"   {name:16} p50 {stats['p50_ms']:8.1f} ms | p95 {stats['p95_ms']:8.1f} ms | "
+              f"p99 {stats['p99_ms']:8.1f} ms | max {stats['max_ms']:8.1f} ms")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'base_url': bench_client.base_url,
+                'warmup': args.warmup,
+                'samples': args.samples,
+                'endpoints': results,
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\n✓ Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # A missing baseline must not pass the regression gate
+        print(f"\n❌ No baseline at {args.baseline}")
+        print("   Run with --update-baseline against a known-good build and commit the file")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    print("\n" + "=" * 80)
+    if regressions:
+        for name, before, after in regressions:
+            print(f"❌ REGRESSION {name}: p95 {before:.1f} ms -> {after:.1f} ms "
+                  f"({after / before - 1:+.0%})")
+        return 1
+    print(f"✅ No p95 regressions against baseline from {baseline.get('recorded_at', '?')}")
+    return 0
+
+
+def main():
+    global client
+    parser = argparse.ArgumentParser(description='User management checks and latency benchmark')
+    parser.add_argument('--benchmark', action='store_true', help='run the latency benchmark')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--samples', type=int, default=30)
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed p95 regression as a fraction (default 0.2 = 20%%)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='record the current results as the new baseline')
+    add_client_arguments(parser)
+    parser.set_defaults(timeout=60)
+    args = parser.parse_args()
+    client = ApiClient(args.target, timeout=args.timeout)
+
+    if args.benchmark:
+        sys.exit(run_benchmark(args))
+    run_functional_checks()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+Record real app traffic and replay it against a target, time-scaled
+
+Usage:
+    # 1. Record: run the app (ApiConfig.setManualUrl('http://<host>:8791')) or
+    #    any script through the recording proxy, Ctrl+C to stop
+    python traffic_replay.py record app_session.trace.gz --upstream http://127.0.0.1:8000
+    python traffic_replay.py record app_session.trace.gz --upstream mock --duration 600
+
+    # 2. Inspect
+    python traffic_replay.py summary app_session.trace.gz
+
+    # 3. Replay (reads only unless --include-writes)
+    python traffic_replay.py replay app_session.trace.gz --target staging-url --speed 1
+    python traffic_replay.py replay app_session.trace.gz --target mock --speed 10
+    python traffic_replay.py replay app_session.trace.gz --speed max
+
+Recording reuses fault_proxy.py's forwarding proxy (without faults). Every
+exchange becomes one line of a gzip'd NDJSON trace: offset from the start,
+client session, method, path with query, status, response size and server
+time, plus the JSON body of writes. Sessions are keyed by a hash of the
+Authorization header (or client address + User-Agent); tokens themselves
+are not stored.
+
+Replay keeps the recorded inter-arrival times divided by --speed ('max'
+sends each request as soon as the previous one of the same session has
+finished) and keeps the request order within every session. The report
+compares per-route latency and status against the recording and shows how
+far the replayer fell behind schedule.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from api_client import ApiClient, PRODUCTION_URL, add_client_arguments
+from fault_proxy import FaultInjector, resolve_upstream, start_proxy
+from latency_stats import percentile, summarize
+
+TRACE_FORMAT = 'tracer-trace/1'
+RECORD_PORT = 8791
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def route_of(path):
+    """'/api/surveys/11/sections/3/questions/?x=1' -> '/api/surveys/{id}/sections/{id}/questions/'"""
+    return re.sub(r'/\d+(?=/|$)', '/{id}', path.split('?', 1)[0])
+
+
+def session_key(headers, client):
+    lowered = {k.lower(): v for k, v in headers.items()}
+    identity = lowered.get('authorization') or f"{client} {lowered.get('user-agent', '')}"
+    return hashlib.sha1(identity.encode()).hexdigest()[:10]
+
+
+class TraceRecorder:
+    """Fault-proxy observer appending exchanges to a gzip'd NDJSON trace"""
+
+    def __init__(self, path, upstream, bodies=True):
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self.bodies = bodies
+        self.start = time.perf_counter()
+        self.count = 0
+        self.lock = threading.Lock()
+        self._write({'format': TRACE_FORMAT, 'upstream': upstream,
+                     'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+
+    def __call__(self, exchange):
+        record = {
+            't': round(time.perf_counter() - self.start - exchange['elapsed'], 4),
+            's': session_key(exchange['request_headers'], exchange['client']),
+            'm': exchange['method'],
+            'p': exchange['path'],
+            'st': exchange['status'],
+            'b': exchange['response_bytes'],
+            'ms': round(exchange['elapsed'] * 1000, 2),
+        }
+        if self.bodies and exchange['method'] in WRITE_METHODS and exchange['request_body']:
+            try:
+                record['body'] = json.loads(exchange['request_body'])
+            except ValueError:
+                pass
+        with self.lock:
+            self._write(record)
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def load_trace(path):
+    """(header, records sorted by offset)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != TRACE_FORMAT:
+            raise ValueError(f"{path} is not a {TRACE_FORMAT} trace")
+        records = [json.loads(line) for line in f if line.strip()]
+    records.sort(key=lambda r: r['t'])
+    return header, records
+
+
+def record(args):
+    upstream = resolve_upstream(args.upstream, mock_latency=5)
+    recorder = TraceRecorder(args.trace, upstream, bodies=not args.no_bodies)
+    server, base_url = start_proxy(upstream, FaultInjector(), host=args.host, port=args.port,
+                                   observers=[recorder])
+    print(f"⏺  Recording {base_url} -> {upstream} into {args.trace}")
+    print(f"   Point the app at http://<this machine>:{server.server_address[1]} (Ctrl+C to stop)")
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(min(10, max(0.1, deadline - time.monotonic())) if deadline else 10)
+            print(f"{time.strftime('%H:%M:%S')} {recorder.count:,} requests recorded")
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    recorder.close()
+    print(f"✓ Saved {recorder.count:,} requests to {args.trace}")
+
+
+def summary(args):
+    header, records = load_trace(args.trace)
+    duration = records[-1]['t'] - records[0]['t'] if records else 0
+    sessions = {r['s'] for r in records}
+    print("=" * 90)
+    print(f"TRACE {args.trace}: {len(records):,} requests, {len(sessions)} sessions, "
+          f"{duration:.0f}s ({len(records) / max(duration, 1e-9):.1f} req/s)")
+    print(f"   recorded {header.get('recorded_at')} from {header.get('upstream')}")
+    print("=" * 90)
+    routes = defaultdict(list)
+    for r in records:
+        routes[(r['m'], route_of(r['p']))].append(r)
+    print(f"{'ROUTE':62} {'COUNT':>7} {'SHARE':>6} {'P50 ms':>8} {'KB avg':>7}")
+    for (method, route), items in sorted(routes.items(), key=lambda kv: -len(kv[1])):
+        stats = summarize([r['ms'] / 1000 for r in items])
+        print(f"{method + ' ' + route:62} {len(items):7,} {len(items) / len(records):6.1%} "
+              f"{stats['p50_ms']:8.1f} {sum(r['b'] for r in items) / len(items) / 1024:7.1f}")
+
+
+def plan_lanes(records, max_lanes):
+    """Group records into ordered lanes; a session always stays in one lane"""
+    lanes = defaultdict(list)
+    session_lane = {}
+    for r in records:
+        lane = session_lane.setdefault(r['s'], len(session_lane) % max_lanes)
+        lanes[lane].append(r)
+    return list(lanes.values())
+
+
+def replay(args):
+    header, records = load_trace(args.trace)
+    if not args.include_writes:
+        records = [r for r in records if r['m'] not in WRITE_METHODS]
+    if not records:
+        print("⚠️  Nothing to replay")
+        return
+
+    client = ApiClient(args.target, timeout=args.timeout, retries=0, pool_size=args.max_sessions)
+    if args.include_writes and client.base_url == PRODUCTION_URL and not args.allow_production:
+        print("❌ Refusing to replay writes against production (use --allow-production)")
+        return
+    origin = client.base_url[:-len('/api')] if client.base_url.endswith('/api') else client.base_url
+    speed = None if args.speed == 'max' else float(args.speed)
+    extra_headers = dict(h.split(':', 1) for h in args.header)
+    extra_headers = {k.strip(): v.strip() for k, v in extra_headers.items()}
+
+    lanes = plan_lanes(records, args.max_sessions)
+    first = records[0]['t']
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0, 'mismatches': 0, 'count': 0})
+    lags = []
+    lock = threading.Lock()
+
+    def run_lane(lane):
+        for r in lane:
+            lag = 0.0
+            if speed:
+                due = start + (r['t'] - first) / speed
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                lag = max(0.0, time.perf_counter() - due)
+            sent = time.perf_counter()
+            try:
+                response = client.request(r['m'], origin + r['p'], json=r.get('body'), headers=extra_headers)
+                status = response.status_code
+            except requests.RequestException:
+                status = None
+            elapsed = time.perf_counter() - sent
+            with lock:
+                entry = results[(r['m'], route_of(r['p']))]
+                entry['count'] += 1
+                lags.append(lag)
+                if status is None or status >= 500:
+                    entry['errors'] += 1
+                else:
+                    entry['latencies'].append(elapsed)
+                if status != r['st']:
+                    entry['mismatches'] += 1
+
+    print(f"▶️  Replaying {len(records):,} requests from {len(lanes)} lanes against {client.base_url} "
+          f"at {'max speed' if speed is None else f'{speed:g}x'}")
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run_lane, args=(lane,), daemon=True) for lane in lanes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    recorded = records[-1]['t'] - first
+    print("=" * 110)
+    print(f"REPLAY: {len(records):,} requests in {wall:.1f}s ({len(records) / max(wall, 1e-9):.1f} req/s; "
+          f"recorded {recorded:.1f}s, {len(records) / max(recorded, 1e-9):.1f} req/s)")
+    print("=" * 110)
+    print(f"{'ROUTE':58} {'COUNT':>6} {'ERR':>5} {'≠STATUS':>7} {'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>8}")
+    print("-" * 110)
+    for (method, route), entry in sorted(results.items(), key=lambda kv: -kv[1]['count']):
+        stats = summarize(entry['latencies'])
+        latency = (f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}"
+                   if stats['count'] else f"{'-':>8} {'-':>8} {'-':>8}")
+        print(f"{method + ' ' + route:58} {entry['count']:6,} {entry['errors']:5} {entry['mismatches']:7} {latency}")
+    print("=" * 110)
+    if speed:
+        sorted_lags = sorted(lags)
+        p95_lag = percentile(sorted_lags, 95) * 1000
+        print(f"⏱  Schedule lag p95 {p95_lag:.0f} ms, max {sorted_lags[-1] * 1000:.0f} ms"
+              + ("  ⚠️  the target (or replayer) could not keep up" if p95_lag > 100 else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and replay app traffic')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help='run a recording proxy')
+    rec.add_argument('trace', help='output trace file (.trace.gz)')
+    rec.add_argument('--upstream', default='http://127.0.0.1:8000', help="backend origin, or 'mock'")
+    rec.add_argument('--host', default='0.0.0.0', help='listen address (0.0.0.0 for devices on the LAN)')
+    rec.add_argument('--port', type=int, default=RECORD_PORT)
+    rec.add_argument('--duration', type=float, help='stop after this many seconds')
+    rec.add_argument('--no-bodies', action='store_true', help="don't store write request bodies")
+
+    summ = sub.add_parser('summary', help='describe a trace')
+    summ.add_argument('trace')
+
+    rep = sub.add_parser('replay', help='replay a trace against a target')
+    rep.add_argument('trace')
+    rep.add_argument('--speed', default='1', help="time scale (1, 10, ...) or 'max'")
+    rep.add_argument('--max-sessions', type=int, default=100, help='concurrent replay lanes')
+    rep.add_argument('--include-writes', action='store_true', help='also replay POST/PUT/PATCH/DELETE')
+    rep.add_argument('--allow-production', action='store_true')
+    rep.add_argument('--header', action='append', default=[], help="extra header, e.g. 'Authorization: Bearer ...'")
+    add_client_arguments(rep)
+
+    args = parser.parse_args()
+    {'record': record, 'summary': summary, 'replay': replay}[args.command](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+"""
+WRITE STRESS - concurrent questionnaire submission ramp
+Usage:
+    python write_stress.py                                   # ramp 1,2,4,...,64 against local
+    python write_stress.py --levels 8,16,32,64,128 --per-worker 5 --bulk 20
+    python write_stress.py --db --json stress.json            # + database lock statistics
+
+Models the end of a survey period: at each concurrency level N, N simulated
+alumni at a time submit complete questionnaires through
+POST /surveys/{id}/answers/ (or /answers/bulk/ with --bulk), each worker
+submitting --per-worker questionnaires with distinct alumni. Failed requests
+are retried like a client would (--retries, exponential backoff) and
+classified from the response: deadlock, lock timeout, serialization failure,
+other HTTP status or connection error (a DEBUG backend's error page names the
+database error).
+
+--db also bootstraps Django in-process (like test_survey_11.py) against the
+database the backend uses, and per level records deadlocks, commits and
+rollbacks, and samples lock waiters, active connections and open transaction
+ages every 100 ms (PostgreSQL: pg_stat_database/pg_stat_activity, MySQL:
+InnoDB status/INNODB_TRX; SQLite has no such counters and allows one writer
+at a time anyway).
+
+The report shows throughput, latency, errors and retries per level, the level
+where latency or error rate degrades (--latency-factor, --max-error-rate
+against the first level), the level where throughput collapses, and whether
+the database locks or something before the database is the bottleneck.
+
+This writes answers: point it at a local backend with seeded alumni
+(seed_dataset.py), then seed_dataset.py --purge removes them again.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api_client import ApiClient, PRODUCTION_URL, add_client_arguments
+from latency_stats import percentile, summarize
+from submit_bench import build_answers, load_alumni, load_questions
+
+DEFAULT_LEVELS = '1,2,4,8,16,32,64'
+# Matched against the body of failed responses (DEBUG error pages carry the DB error)
+FAILURE_PATTERNS = [
+    ('deadlock', re.compile(r'deadlock', re.I)),
+    ('lock timeout', re.compile(r'lock wait timeout|database is locked|lock timeout|could not obtain lock', re.I)),
+    ('serialization', re.compile(r'could not serialize|serialization failure', re.I)),
+]
+LOCK_FAILURES = ('deadlock', 'lock timeout', 'serialization')
+
+
+def classify(response):
+    """None for success, otherwise the failure kind"""
+    if response.status_code in (200, 201):
+        return None
+    if response.status_code >= 500:
+        body = response.text[:20000]
+        for kind, pattern in FAILURE_PATTERNS:
+            if pattern.search(body):
+                return kind
+    return f"http {response.status_code}"
+
+
+class LevelResult:
+    def __init__(self, level):
+        self._lock = threading.Lock()
+        self.level = level
+        self.latencies = []
+        self.answers = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = Counter()
+        self.questionnaires = Counter()
+
+    def record(self, elapsed, answer_count, kind):
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(elapsed)
+            if kind is None:
+                self.answers += answer_count
+            else:
+                self.failures[kind] += 1
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def finished(self, ok):
+        with self._lock:
+            self.questionnaires['ok' if ok else 'failed'] += 1
+
+
+def submit_questionnaire(client, survey_id, answers, batch_size, retries, backoff, result, rng):
+    """Submit one alumnus' questionnaire with client-side retries; True when every answer was stored"""
+    if batch_size is None:
+        chunks = [[answer] for answer in answers]
+    else:
+        chunks = [answers[i:i + batch_size] for i in range(0, len(answers), batch_size)]
+    for chunk in chunks:
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                if batch_size is None:
+                    response = client.post(f"/surveys/{survey_id}/answers/", json=chunk[0])
+                else:
+                    response = client.post(f"/surveys/{survey_id}/answers/bulk/", json={'answers': chunk})
+                kind = classify(response)
+            except requests.RequestException:
+                kind = 'connection'
+            result.record(time.perf_counter() - start, len(chunk), kind)
+            if kind is None:
+                break
+            retryable = kind in LOCK_FAILURES or kind == 'connection' or kind.startswith('http 5')
+            if attempt == retries or not retryable:
+                result.finished(False)
+                return False
+            result.retried()
+            time.sleep(backoff * 2 ** attempt * rng.uniform(0.5, 1.5))
+    result.finished(True)
+    return True
+
+
+class DbSampler:
+    """Lock and transaction statistics of the backend's database, through Django in-process"""
+
+    def __init__(self, interval=0.1):
+        import django_env
+
+        django_env.setup()
+        from django.db import connection
+
+        self.vendor = connection.vendor
+        self.supported = self.vendor in ('postgresql', 'mysql')
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _query(self, sql):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+    def counters(self):
+        """Cumulative counters (deadlocks, commits, rollbacks, lock waits)"""
+        if self.vendor == 'postgresql':
+            deadlocks, commits, rollbacks = self._query(
+                "SELECT deadlocks, xact_commit, xact_rollback FROM pg_stat_database "
+                "WHERE datname = current_database()")[0]
+            return {'deadlocks': deadlocks, 'commits': commits, 'rollbacks': rollbacks}
+        if self.vendor == 'mysql':
+            status = dict(self._query(
+                "SHOW GLOBAL STATUS WHERE Variable_name IN "
+                "('Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Com_commit', 'Com_rollback')"))
+            try:
+                deadlocks = self._query(
+                    "SELECT `COUNT` FROM information_schema.INNODB_METRICS WHERE NAME = 'lock_deadlocks'")[0][0]
+            except Exception:
+                deadlocks = 0
+            return {'deadlocks': int(deadlocks), 'commits': int(status.get('Com_commit', 0)),
+                    'rollbacks': int(status.get('Com_rollback', 0)),
+                    'row_lock_waits': int(status.get('Innodb_row_lock_waits', 0)),
+                    'row_lock_ms': int(status.get('Innodb_row_lock_time', 0))}
+        return {}
+
+    def _sample(self):
+        """(lock waiters, active connections, [open transaction ages in s])"""
+        if self.vendor == 'postgresql':
+            waiting, active, ages = self._query(
+                "SELECT count(*) FILTER (WHERE wait_event_type = 'Lock'), "
+                "count(*) FILTER (WHERE state <> 'idle'), "
+                "array_agg(EXTRACT(EPOCH FROM now() - xact_start)) "
+                "FILTER (WHERE xact_start IS NOT NULL AND state <> 'idle') "
+                "FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()")[0]
+            return waiting, active, [float(age) for age in ages or []]
+        rows = self._query(
+            "SELECT trx_state, TIMESTAMPDIFF(MICROSECOND, trx_started, NOW()) / 1e6 "
+            "FROM information_schema.INNODB_TRX")
+        active = self._query("SELECT COUNT(*) FROM information_schema.PROCESSLIST WHERE COMMAND <> 'Sleep'")[0][0]
+        return (sum(1 for state, _ in rows if state == 'LOCK WAIT'), active - 1,
+                [float(age) for _, age in rows])
+
+    def _run(self):
+        from django.db import connection
+
+        try:
+            while not self._stop.wait(self.interval):
+                self.samples.append(self._sample())
+        finally:
+            connection.close()
+
+    def start(self):
+        self.samples = []
+        self._stop.clear()
+        if self.supported:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Summary of the samples taken since start()"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if not self.samples:
+            return {}
+        ages = sorted(age for _, _, sample_ages in self.samples for age in sample_ages)
+        return {
+            'lock_waiters_max': max(waiting for waiting, _, _ in self.samples),
+            'lock_waiters_mean': sum(waiting for waiting, _, _ in self.samples) / len(self.samples),
+            'active_max': max(active for _, active, _ in self.samples),
+            'xact_age_p95_ms': percentile(ages, 95) * 1000 if ages else 0.0,
+            'xact_age_max_ms': ages[-1] * 1000 if ages else 0.0,
+        }
+
+
+def run_level(client, survey_id, level, alumni, questions, args, sampler):
+    result = LevelResult(level)
+    rng = random.Random(f"{args.seed}:{level}")
+    payloads = [build_answers(user_id, questions, rng) for user_id in alumni]
+    before = sampler.counters() if sampler else {}
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        futures = [pool.submit(submit_questionnaire, client, survey_id, answers, args.bulk,
+                               args.retries, args.backoff, result, random.Random(f"{args.seed}:{level}:{i}"))
+                   for i, answers in enumerate(payloads)]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - start
+    db = sampler.stop() if sampler else {}
+    after = sampler.counters() if sampler else {}
+    db.update({key: after[key] - before[key] for key in after})
+
+    stats = summarize(result.latencies)
+    failed = sum(result.failures.values())
+    return {
+        'level': level,
+        'questionnaires': dict(result.questionnaires),
+        'wall_s': wall,
+        'answers_per_s': result.answers / wall,
+        'requests_per_s': result.requests / wall,
+        'requests': result.requests,
+        'error_rate': failed / result.requests if result.requests else 0.0,
+        'retries': result.retries,
+        'failures': dict(result.failures),
+        'latency': stats,
+        'db': db,
+    }
+
+
+def find_limits(levels, latency_factor, max_error_rate):
+    """(first degraded level or None, first collapsed level or None, peak level)"""
+    baseline = levels[0]['latency'].get('p95_ms') or 0
+    degraded = collapsed = None
+    peak = levels[0]
+    for row in levels:
+        p95 = row['latency'].get('p95_ms', float('inf'))
+        if degraded is None and (p95 > latency_factor * baseline or row['error_rate'] > max_error_rate):
+            degraded = row
+        if collapsed is None and row['answers_per_s'] < 0.9 * peak['answers_per_s']:
+            collapsed = row
+        if row['answers_per_s'] > peak['answers_per_s']:
+            peak = row
+    return degraded, collapsed, peak
+
+
+def diagnose(row, vendor):
+    """One-line verdict on what limits the write path at this level"""
+    lock_failures = sum(row['failures'].get(kind, 0) for kind in LOCK_FAILURES)
+    db = row['db']
+    if lock_failures or db.get('deadlocks'):
+        return ("write path: transactions conflict (deadlocks/lock timeouts) - shorten the answer "
+                "transaction, insert in a consistent order, avoid read-modify-write on shared rows")
+    if vendor == 'sqlite':
+        return "database: SQLite allows one writer at a time; use PostgreSQL/MySQL for this load"
+    if not db:
+        return "unknown: rerun with --db on the backend host to separate database locks from the rest"
+    if db.get('lock_waiters_max', 0) >= max(2, row['level'] // 4) or db.get('row_lock_waits', 0) > row['requests'] // 10:
+        return "write path: requests queue on row/table locks - check which rows every answer insert updates"
+    if db.get('active_max', 0) < row['level'] // 2:
+        return ("before the database: few queries are running while requests wait - app server "
+                "workers or the DB connection pool are too small")
+    return ("database configuration/resources: queries run concurrently without lock waits but slower - "
+            "check commit/fsync settings (synchronous_commit, innodb_flush_log_at_trx_commit), I/O and CPU")
+
+
+def print_report(rows, degraded, collapsed, peak, vendor):
+    print("\n" + "=" * 118)
+    print(f"{'LEVEL':>5} {'OK/FAIL':>9} {'ANSWERS/s':>10} {'REQS/s':>8} {'ERR%':>6} {'RETRY':>6} "
+          f"{'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>8} | {'DEADLK':>6} {'LOCKW':>6} {'ACTIVE':>6} "
+          f"{'XACT p95':>9} {'ROLLBK':>6}")
+    print("-" * 118)
+    for row in rows:
+        stats, db = row['latency'], row['db']
+        qs = row['questionnaires']
+        db_cols = (f"{db.get('deadlocks', '-'):>6} {db.get('lock_waiters_max', db.get('row_lock_waits', '-')):>6} "
+                   f"{db.get('active_max', '-'):>6} "
+                   f"{(format(db['xact_age_p95_ms'], '9.1f') if 'xact_age_p95_ms' in db else '-'):>9} "
+                   f"{db.get('rollbacks', '-'):>6}")
+        print(f"{row['level']:5} {qs.get('ok', 0):>4}/{qs.get('failed', 0):<4} {row['answers_per_s']:10.1f} "
+              f"{row['requests_per_s']:8.1f} {row['error_rate']:6.1%} {row['retries']:6} "
+              f"{stats.get('p50_ms', 0):8.1f} {stats.get('p95_ms', 0):8.1f} {stats.get('p99_ms', 0):8.1f} | {db_cols}")
+        if row['failures']:
+            print(f"{'':16}failures: {', '.join(f'{k} x{v}' for k, v in sorted(row['failures'].items()))}")
+    print("=" * 118)
+    print(f"📈 Peak throughput {peak['answers_per_s']:.1f} answers/s at concurrency {peak['level']}")
+    if degraded:
+        print(f"⚠️  Latency/errors degrade from concurrency {degraded['level']} "
+              f"(p95 {degraded['latency'].get('p95_ms', 0):.0f} ms, {degraded['error_rate']:.1%} errors)")
+    if collapsed:
+        print(f"📉 Throughput collapses at concurrency {collapsed['level']} "
+              f"({collapsed['answers_per_s']:.1f} answers/s)")
+    if not degraded and not collapsed:
+        print(f"✅ No degradation up to concurrency {rows[-1]['level']}")
+    else:
+        print(f"🔎 Bottleneck: {diagnose(degraded or collapsed, vendor)}")
+    print("=" * 118)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent answer submission stress ramp')
+    parser.add_argument('--survey', type=int, default=None, help='survey id (default: first survey)')
+    parser.add_argument('--levels', default=DEFAULT_LEVELS, help='comma-separated concurrency levels')
+    parser.add_argument('--per-worker', type=int, default=3, help='questionnaires per worker per level')
+    parser.add_argument('--bulk', type=int, default=None, metavar='N',
+                        help='submit through /answers/bulk/ in batches of N (default: one POST per answer)')
+    parser.add_argument('--retries', type=int, default=2, help='client retries of a failed request')
+    parser.add_argument('--backoff', type=float, default=0.2, help='first retry delay in seconds')
+    parser.add_argument('--latency-factor', type=float, default=3.0,
+                        help='degraded when p95 exceeds this multiple of the first level')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--full-ramp', action='store_true', help="don't stop after the throughput collapses")
+    parser.add_argument('--db', action='store_true', help='also sample the database through Django')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write the per-level results here')
+    parser.add_argument('--allow-production', action='store_true')
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(',')]
+    # Retries are counted by hand; the adapter must not hide failures
+    client = ApiClient(args.target, timeout=args.timeout, retries=0, pool_size=max(levels))
+    if client.base_url == PRODUCTION_URL and not args.allow_production:
+        print("❌ Refusing to stress-write answers to production (use --allow-production)")
+        return
+
+    reader = ApiClient(args.target, timeout=args.timeout)  # setup reads may retry
+    survey_id = args.survey
+    if survey_id is None:
+        surveys = reader.get_json("/surveys/")
+        surveys = surveys.get('results', []) if isinstance(surveys, dict) else surveys
+        if not surveys:
+            print("⚠️  NO SURVEYS IN DATABASE")
+            return
+        survey_id = surveys[0]['id']
+
+    questions = load_questions(reader, survey_id)
+    needed = sum(level * args.per_worker for level in levels)
+    alumni = load_alumni(reader, needed)
+    if not questions or not alumni:
+        print(f"⚠️  Need questions and alumni (found {len(questions)} questions, {len(alumni)} alumni)")
+        return
+    if len(alumni) < needed:
+        print(f"⚠️  Only {len(alumni)} alumni for {needed} questionnaires: some alumni submit more than once")
+
+    sampler = DbSampler() if args.db else None
+    vendor = sampler.vendor if sampler else None
+    print("=" * 118)
+    print(f"WRITE STRESS - survey {survey_id}: {len(questions)} questions per questionnaire, "
+          f"{'per-answer POST' if args.bulk is None else f'bulk x{args.bulk}'}, levels {args.levels}")
+    if sampler:
+        print(f"   database: {vendor}" + ('' if sampler.supported else ' (no lock statistics available)'))
+    print("=" * 118)
+
+    rows = []
+    offset = 0
+    for level in levels:
+        count = level * args.per_worker
+        batch = [alumni[(offset + i) % len(alumni)] for i in range(count)]
+        offset += count
+        row = run_level(client, survey_id, level, batch, questions, args, sampler)
+        rows.append(row)
+        print(f"   concurrency {level:4}: {row['answers_per_s']:8.1f} answers/s, "
+              f"p95 {row['latency'].get('p95_ms', 0):8.1f} ms, {row['error_rate']:.1%} errors")
+        _, collapsed, _ = find_limits(rows, args.latency_factor, args.max_error_rate)
+        if collapsed and not args.full_ramp:
+            print("   throughput collapsed; stopping the ramp (--full-ramp to continue)")
+            break
+
+    degraded, collapsed, peak = find_limits(rows, args.latency_factor, args.max_error_rate)
+    print_report(rows, degraded, collapsed, peak, vendor)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'survey': survey_id, 'target': client.base_url, 'database': vendor, 'levels': rows,
+                       'degraded_at': degraded and degraded['level'],
+                       'collapsed_at': collapsed and collapsed['level'],
+                       'peak': {'level': peak['level'], 'answers_per_s': peak['answers_per_s']}},
+                      f, indent=2)
+        print(f"✓ Wrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,130 +1,604 @@
 #!/usr/bin/env python3
 """
 Generate app icons with proper padding for Flutter app
-Usage: python generate_icons.py
+Usage: python generate_icons.py [--workers N] [--force] [--low-memory]
+                                [--optimize PRESET] [--platform NAME ...]
+
+Every icon the app ships (Android, iOS, web, macOS, Windows, Linux) is listed
+in the TARGETS table below. All targets are rendered in one batched pass from
+a single decoded source: each distinct (size, padding) pair is rendered once
+and written to every path that needs it.
+
+The source logo is decoded once and reduced into a mip chain (each level half
+the size of the previous one). Every render is resized from the nearest level
+that is still at least as large as the logo area it needs, and renders run on
+a process pool.
+
+A manifest (.icon_manifest.json) records, per output, a hash of its inputs
+(source logo, target definition) and of the written file. Outputs whose inputs
+and contents are unchanged are skipped, so a no-op run never decodes the logo
+and leaves file mtimes (and the Gradle/Xcode asset caches) untouched.
+
+--low-memory is meant for oversized masters (e.g. 8K PNGs from design): the
+source is decoded through Pillow's draft()/reduce() fast paths into a single
+working copy capped near the largest target (LOW_MEMORY_CAP), and the
+full-resolution RGBA conversion is never made. JPEG masters are scaled while
+decoding; PNG has no scaled decode in Pillow, so the bound there is one
+native-mode decode of the source. Peak RSS is reported at the end of every run.
+
+PNG outputs go through an optimization stage in the render workers. The
+--optimize preset (see OPTIMIZE_PRESETS) picks the zlib level, Pillow's
+optimize pass and a lossless palette reduction for icons with at most 256
+colours. Bytes saved against Pillow's default encoding are reported per file.
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image, ImageChops
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import io
+import json
+import math
 import os
+import sys
+import time
 
-def create_icon_with_padding(input_path, output_path, size, padding_percent=15):
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Mip chain and optimize preset shared with pool workers (set by _init_worker)
+_MIP_CHAIN = None
+_PRESET = None
+
+MANIFEST_NAME = '.icon_manifest.json'
+
+# Bump when the rendering itself changes so every output is regenerated
+RENDER_VERSION = 2
+
+DEFAULT_PADDING = 15
+
+# Largest side kept in memory by --low-memory (the 1024px iOS/macOS icons)
+LOW_MEMORY_CAP = 1024
+
+# PNG optimization presets (--optimize), from fastest to smallest output
+#   compress_level: zlib level passed to Pillow
+#   optimize:       also try Pillow's optimize pass and keep the smaller result
+#   palette:        store icons with <= 256 colours as exact palette PNGs
+OPTIMIZE_PRESETS = {
+    'fast': {'compress_level': 1, 'optimize': False, 'palette': False},
+    'balanced': {'compress_level': 9, 'optimize': False, 'palette': True},
+    'max': {'compress_level': 9, 'optimize': True, 'palette': True},
+}
+DEFAULT_PRESET = 'balanced'
+
+# Modes Image.reduce() can work on without converting the full source first
+REDUCE_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+# Fraction of a maskable icon guaranteed visible (W3C: circle of 80% diameter)
+MASKABLE_SAFE_ZONE = 0.8
+
+# One icon file to produce.
+#   platform:  group name used for --platform filtering and output
+#   path:      output path relative to the project root
+#   size:      side in pixels (largest frame for ICO)
+#   padding:   padding percentage around the logo
+#   safe_zone: if set, the logo is shrunk to fit inside a centred circle of
+#              this fraction of the icon (maskable icons)
+#   format:    'png' or 'ico'
+#   sizes:     frame sizes for multi-resolution ICO files
+IconTarget = namedtuple(
+    'IconTarget',
+    ['platform', 'path', 'size', 'padding', 'safe_zone', 'format', 'sizes'],
+    defaults=(DEFAULT_PADDING, None, 'png', ()),
+)
+
+ANDROID_RES = 'android/app/src/main/res'
+IOS_ICONSET = 'ios/Runner/Assets.xcassets/AppIcon.appiconset'
+MACOS_ICONSET = 'macos/Runner/Assets.xcassets/AppIcon.appiconset'
+
+TARGETS = [
+    # Android launcher icons
+    IconTarget('android', f'{ANDROID_RES}/mipmap-mdpi/ic_launcher.png', 48),
+    IconTarget('android', f'{ANDROID_RES}/mipmap-hdpi/ic_launcher.png', 72),
+    IconTarget('android', f'{ANDROID_RES}/mipmap-xhdpi/ic_launcher.png', 96),
+    IconTarget('android', f'{ANDROID_RES}/mipmap-xxhdpi/ic_launcher.png', 144),
+    IconTarget('android', f'{ANDROID_RES}/mipmap-xxxhdpi/ic_launcher.png', 192),
+
+    # iOS app icon set (see IOS_CONTENTS_JSON)
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-20@2x.png', 40),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-20@3x.png', 60),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-29@2x.png', 58),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-29@3x.png', 87),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-40@2x.png', 80),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-40@3x.png', 120),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-60@2x.png', 120),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-60@3x.png', 180),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-76.png', 76),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-76@2x.png', 152),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-83.5@2x.png', 167),
+    IconTarget('ios', f'{IOS_ICONSET}/Icon-1024.png', 1024),
+
+    # Web (referenced from web/manifest.json and web/index.html)
+    IconTarget('web', 'web/favicon.png', 16),
+    IconTarget('web', 'web/icons/Icon-192.png', 192),
+    IconTarget('web', 'web/icons/Icon-512.png', 512),
+    IconTarget('web', 'web/icons/Icon-maskable-192.png', 192, safe_zone=MASKABLE_SAFE_ZONE),
+    IconTarget('web', 'web/icons/Icon-maskable-512.png', 512, safe_zone=MASKABLE_SAFE_ZONE),
+
+    # macOS app icon set (existing Contents.json already lists these files)
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_16.png', 16),
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_32.png', 32),
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_64.png', 64),
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_128.png', 128),
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_256.png', 256),
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_512.png', 512),
+    IconTarget('macos', f'{MACOS_ICONSET}/app_icon_1024.png', 1024),
+
+    # Windows executable icon (windows/runner/Runner.rc)
+    IconTarget('windows', 'windows/runner/resources/app_icon.ico', 256, format='ico',
+               sizes=(16, 24, 32, 48, 64, 128, 256)),
+
+    # Linux: Flutter's GTK runner has no icon slot, this is for the .desktop entry
+    IconTarget('linux', 'linux/runner/resources/app_icon.png', 256),
+]
+
+PLATFORM_LABELS = {
+    'android': '🤖 Android',
+    'ios': '🍎 iOS',
+    'web': '🌐 Web',
+    'macos': '💻 macOS',
+    'windows': '🪟 Windows',
+    'linux': '🐧 Linux',
+}
+
+# iOS Contents.json
+IOS_CONTENTS_JSON = {
+    "images": [
+        {"size": "20x20", "idiom": "iphone", "filename": "Icon-20@2x.png", "scale": "2x"},
+        {"size": "20x20", "idiom": "iphone", "filename": "Icon-20@3x.png", "scale": "3x"},
+        {"size": "29x29", "idiom": "iphone", "filename": "Icon-29@2x.png", "scale": "2x"},
+        {"size": "29x29", "idiom": "iphone", "filename": "Icon-29@3x.png", "scale": "3x"},
+        {"size": "40x40", "idiom": "iphone", "filename": "Icon-40@2x.png", "scale": "2x"},
+        {"size": "40x40", "idiom": "iphone", "filename": "Icon-40@3x.png", "scale": "3x"},
+        {"size": "60x60", "idiom": "iphone", "filename": "Icon-60@2x.png", "scale": "2x"},
+        {"size": "60x60", "idiom": "iphone", "filename": "Icon-60@3x.png", "scale": "3x"},
+        {"size": "20x20", "idiom": "ipad", "filename": "Icon-20@2x.png", "scale": "2x"},
+        {"size": "29x29", "idiom": "ipad", "filename": "Icon-29@2x.png", "scale": "2x"},
+        {"size": "40x40", "idiom": "ipad", "filename": "Icon-40@2x.png", "scale": "2x"},
+        {"size": "76x76", "idiom": "ipad", "filename": "Icon-76.png", "scale": "1x"},
+        {"size": "76x76", "idiom": "ipad", "filename": "Icon-76@2x.png", "scale": "2x"},
+        {"size": "83.5x83.5", "idiom": "ipad", "filename": "Icon-83.5@2x.png", "scale": "2x"},
+        {"size": "1024x1024", "idiom": "ios-marketing", "filename": "Icon-1024.png", "scale": "1x"}
+    ],
+    "info": {"version": 1, "author": "xcode"}
+}
+
+
+def load_logo(input_path, max_size=None):
     """
-    Create an icon with padding around the logo
-    
+    Decode the source logo once and return it as RGBA
+
     Args:
         input_path: Path to the source logo image
-        output_path: Path to save the generated icon
+        max_size: If set, keep only a working copy whose longest side is
+            reduced towards max_size (never below it). draft() lets decoders
+            that support it (JPEG) scale while decoding, and reduce() shrinks
+            by an integer factor before the RGBA conversion, so the
+            full-resolution RGBA copy is never allocated.
+    """
+    with Image.open(input_path) as source:
+        if max_size is None:
+            return source.convert('RGBA') if source.mode != 'RGBA' else source.copy()
+
+        source.draft('RGBA', (max_size, max_size))
+        factor = max(1, min(source.size) // max_size)
+        logo = source if source.mode in REDUCE_MODES else source.convert('RGBA')
+        if factor > 1:
+            logo = reduce_in_bands(logo, factor)
+        return logo.convert('RGBA') if logo.mode != 'RGBA' else logo.copy()
+
+
+def reduce_in_bands(image, factor, band_rows=64):
+    """
+    Image.reduce() applied one horizontal band at a time
+
+    reduce() on RGBA/LA images makes a premultiplied copy of the whole input
+    first; working in bands keeps that copy the size of one band.
+    """
+    width, height = image.size
+    reduced = Image.new(image.mode, (-(-width // factor), -(-height // factor)))
+    step = band_rows * factor
+    for top in range(0, height, step):
+        band = image.crop((0, top, width, min(top + step, height))).reduce(factor)
+        reduced.paste(band, (0, top // factor))
+    return reduced
+
+
+def peak_memory_mb():
+    """
+    Return (self, children) peak RSS in MiB, or None where unsupported
+
+    Children covers the render pool workers once they have exited.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    scale = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own / 2**20, children / 2**20
+
+
+def logo_size_for(size, padding_percent):
+    """Return (padding, logo_size) for an icon of the given size"""
+    padding = int(size * padding_percent / 100)
+    return padding, size - (2 * padding)
+
+
+def build_mip_chain(logo, largest, smallest):
+    """
+    Build a chain of square copies of the logo, halving at each level
+
+    Args:
+        logo: Decoded RGBA logo
+        largest: Side of the first (largest) level in pixels
+        smallest: Smallest logo size any target needs; the chain stops once
+            halving again would drop below it
+    """
+    top = logo.resize((largest, largest), Image.Resampling.LANCZOS)
+    chain = [top]
+    while chain[-1].width // 2 >= smallest:
+        half = chain[-1].width // 2
+        chain.append(chain[-1].resize((half, half), Image.Resampling.LANCZOS))
+    return chain
+
+
+def nearest_level(chain, logo_size):
+    """Return the smallest mip level that is not smaller than logo_size"""
+    for level in reversed(chain):
+        if level.width >= logo_size:
+            return level
+    return chain[0]
+
+
+def render_icon(chain, size, padding_percent=15):
+    """
+    Render a single icon from the mip chain
+
+    Args:
+        chain: Mip chain built by build_mip_chain()
         size: Size of the output icon (width and height)
         padding_percent: Percentage of padding (default 15%)
     """
-    # Open the source image
-    logo = Image.open(input_path)
-    
-    # Convert to RGBA if not already
-    if logo.mode != 'RGBA':
-        logo = logo.convert('RGBA')
-    
-    # Calculate the logo size with padding
-    padding = int(size * padding_percent / 100)
-    logo_size = size - (2 * padding)
-    
-    # Resize logo to fit
-    logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-    
+    padding, logo_size = logo_size_for(size, padding_percent)
+
+    # Resize from the nearest larger level instead of the full source
+    level = nearest_level(chain, logo_size)
+    if level.width != logo_size:
+        logo = level.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+    else:
+        logo = level
+
     # Create a new image with white background
     icon = Image.new('RGBA', (size, size), (255, 255, 255, 255))
-    
+
     # Paste the logo centered with padding
     icon.paste(logo, (padding, padding), logo)
-    
+
     # Convert to RGB for PNG
-    icon = icon.convert('RGB')
-    
-    # Save the icon
-    icon.save(output_path, 'PNG', quality=100)
+    return icon.convert('RGB')
+
+
+def create_icon_with_padding(input_path, output_path, size, padding_percent=15):
+    """
+    Create an icon with padding around the logo
+
+    Convenience wrapper for one-off icons; main() renders all targets from a
+    single decoded source instead of calling this per target.
+
+    Args:
+        input_path: Path to the source logo image
+        output_path: Path to save the generated icon
+        size: Size of the output icon (width and height)
+        padding_percent: Percentage of padding (default 15%)
+    """
+    _, logo_size = logo_size_for(size, padding_percent)
+    chain = [load_logo(input_path).resize((logo_size, logo_size), Image.Resampling.LANCZOS)]
+    render_icon(chain, size, padding_percent).save(output_path, 'PNG')
     print(f"✓ Created {output_path} ({size}x{size}px)")
 
-def main():
-    # Define icon sizes for Android
-    android_sizes = {
-        'mipmap-mdpi': 48,
-        'mipmap-hdpi': 72,
-        'mipmap-xhdpi': 96,
-        'mipmap-xxhdpi': 144,
-        'mipmap-xxxhdpi': 192,
-    }
-    
-    # iOS icon sizes
-    ios_sizes = {
-        'Icon-20@2x.png': 40,
-        'Icon-20@3x.png': 60,
-        'Icon-29@2x.png': 58,
-        'Icon-29@3x.png': 87,
-        'Icon-40@2x.png': 80,
-        'Icon-40@3x.png': 120,
-        'Icon-60@2x.png': 120,
-        'Icon-60@3x.png': 180,
-        'Icon-76.png': 76,
-        'Icon-76@2x.png': 152,
-        'Icon-83.5@2x.png': 167,
-        'Icon-1024.png': 1024,
+
+def effective_padding(target):
+    """
+    Padding percentage actually used for a target
+
+    For maskable icons the logo square must fit inside the safe-zone circle,
+    i.e. its diagonal may not exceed safe_zone * size.
+    """
+    if target.safe_zone is None:
+        return target.padding
+    safe_padding = (1 - target.safe_zone / math.sqrt(2)) / 2 * 100
+    return max(target.padding, math.ceil(safe_padding))
+
+
+def render_specs(target):
+    """Return the (size, padding_percent) renders a target is assembled from"""
+    padding = effective_padding(target)
+    if target.format == 'ico':
+        return [(size, padding) for size in target.sizes]
+    return [(target.size, padding)]
+
+
+def palette_copy(icon):
+    """
+    Return an exact palette ('P') copy of icon, or None if it needs more than
+    256 colours or cannot be mapped losslessly
+    """
+    colors = icon.getcolors(256)
+    if colors is None:
+        return None
+    palette = [channel for _, color in colors for channel in color[:3]]
+    palette_image = Image.new('P', (1, 1))
+    palette_image.putpalette(palette)
+    indexed = icon.quantize(palette=palette_image, dither=Image.Dither.NONE)
+    if ImageChops.difference(indexed.convert(icon.mode), icon).getbbox():
+        return None
+    return indexed
+
+
+def optimize_png(icon, preset=DEFAULT_PRESET):
+    """
+    Encode an icon as PNG using an optimization preset
+
+    Only IHDR/PLTE/IDAT/IEND are written; no text or other metadata chunks.
+
+    Args:
+        icon: Rendered RGB icon
+        preset: Key of OPTIMIZE_PRESETS
+    """
+    options = OPTIMIZE_PRESETS[preset]
+    candidates = [icon]
+    if options['palette']:
+        indexed = palette_copy(icon)
+        if indexed is not None:
+            candidates.append(indexed)
+
+    # optimize=True is not always smaller than plain level 9, so keep both
+    passes = (False, True) if options['optimize'] else (False,)
+
+    best = None
+    for candidate in candidates:
+        for optimize in passes:
+            buffer = io.BytesIO()
+            candidate.save(buffer, 'PNG', compress_level=options['compress_level'],
+                           optimize=optimize)
+            if best is None or buffer.tell() < len(best):
+                best = buffer.getvalue()
+    return best
+
+
+def _init_worker(chain, preset=DEFAULT_PRESET):
+    global _MIP_CHAIN, _PRESET
+    _MIP_CHAIN = chain
+    _PRESET = preset
+
+
+def _render_spec(spec):
+    size, padding_percent = spec
+    icon = render_icon(_MIP_CHAIN, size, padding_percent)
+
+    # Pillow's default encoding, kept only as the baseline for reporting
+    baseline = io.BytesIO()
+    icon.save(baseline, 'PNG')
+    return spec, (baseline.tell(), optimize_png(icon, _PRESET))
+
+
+def render_all(logo, specs, workers=None, preset=DEFAULT_PRESET):
+    """
+    Render every distinct (size, padding_percent) spec from one decoded logo
+
+    Args:
+        logo: Decoded RGBA logo from load_logo()
+        specs: Iterable of (size, padding_percent) tuples; duplicates are
+            rendered once
+        workers: Number of worker processes (None = CPU count, 1 = in-process)
+        preset: PNG optimization preset (key of OPTIMIZE_PRESETS)
+
+    Returns a dict mapping each spec to (baseline_size, optimized PNG bytes).
+    """
+    # Largest icons first so the slowest renders start early
+    specs = sorted(set(specs), reverse=True)
+    logo_sizes = [logo_size_for(size, padding)[1] for size, padding in specs]
+    chain = build_mip_chain(logo, max(logo_sizes), min(logo_sizes))
+
+    if workers == 1 or len(specs) == 1:
+        _init_worker(chain, preset)
+        return dict(map(_render_spec, specs))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(chain, preset)) as pool:
+        return dict(pool.map(_render_spec, specs))
+
+
+def encode_target(target, rendered):
+    """
+    Assemble the file bytes for a target from the rendered PNGs
+
+    Returns (baseline_size, data); baseline_size is None for formats the
+    optimization stage does not apply to.
+    """
+    specs = render_specs(target)
+    if target.format == 'png':
+        return rendered[specs[0]]
+
+    if target.format == 'ico':
+        # Pillow re-encodes ICO frames itself, so hand it plain RGBA frames
+        frames = [Image.open(io.BytesIO(rendered[spec][1])).convert('RGBA') for spec in specs]
+        frames.sort(key=lambda frame: frame.width, reverse=True)
+        buffer = io.BytesIO()
+        frames[0].save(buffer, 'ICO', sizes=[frame.size for frame in frames],
+                       append_images=frames[1:])
+        return None, buffer.getvalue()
+
+    raise ValueError(f"Unsupported icon format: {target.format}")
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file, or None if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def job_key(source_digest, target, low_memory=False, preset=DEFAULT_PRESET):
+    """Hash everything that determines the bytes of one output file"""
+    inputs = {
+        'render_version': RENDER_VERSION,
+        'low_memory': low_memory,
+        'preset': preset,
+        'source': source_digest,
+        'format': target.format,
+        'renders': render_specs(target),
     }
-    
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Load the output manifest, returning an empty one if missing or corrupt"""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'outputs': {}}
+    manifest.setdefault('outputs', {})
+    return manifest
+
+
+def save_manifest(manifest_path, manifest):
+    write_if_changed(manifest_path, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+
+
+def is_fresh(manifest, rel_path, output_path, key):
+    """True if the output was produced from the same inputs and is untouched"""
+    entry = manifest['outputs'].get(rel_path)
+    if not entry or entry.get('key') != key:
+        return False
+    return file_digest(output_path) == entry.get('output')
+
+
+def write_if_changed(path, data):
+    """Write text or bytes to path only if the content differs. Returns True if written"""
+    mode = 'b' if isinstance(data, bytes) else ''
+    try:
+        with open(path, 'r' + mode) as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'w' + mode) as f:
+        f.write(data)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate app icons with padding')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: CPU count, 1 = no pool)')
+    parser.add_argument('--force', action='store_true',
+                        help='ignore the manifest and regenerate every selected icon')
+    parser.add_argument('--platform', action='append', choices=sorted(PLATFORM_LABELS),
+                        help='only generate icons for this platform (repeatable)')
+    parser.add_argument('--low-memory', action='store_true',
+                        help=f'decode oversized sources into a working copy capped near {LOW_MEMORY_CAP}px')
+    parser.add_argument('--optimize', choices=list(OPTIMIZE_PRESETS), default=DEFAULT_PRESET,
+                        help=f'PNG optimization preset (default: {DEFAULT_PRESET})')
+    args = parser.parse_args()
+
     # Base paths
     base_dir = os.path.dirname(os.path.abspath(__file__))
     logo_path = os.path.join(base_dir, 'assets', 'images', 'Logo ITK.png')
-    android_res_dir = os.path.join(base_dir, 'android', 'app', 'src', 'main', 'res')
-    ios_assets_dir = os.path.join(base_dir, 'ios', 'Runner', 'Assets.xcassets', 'AppIcon.appiconset')
-    
+    ios_assets_dir = os.path.join(base_dir, IOS_ICONSET)
+
     if not os.path.exists(logo_path):
         print(f"❌ Logo not found: {logo_path}")
         return
-    
+
     print(f"📱 Generating app icons from: {logo_path}\n")
-    
-    # Generate Android icons
-    print("🤖 Android Icons:")
-    for folder, size in android_sizes.items():
-        output_dir = os.path.join(android_res_dir, folder)
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, 'ic_launcher.png')
-        create_icon_with_padding(logo_path, output_path, size, padding_percent=15)
-    
-    print("\n🍎 iOS Icons:")
-    os.makedirs(ios_assets_dir, exist_ok=True)
-    for filename, size in ios_sizes.items():
-        output_path = os.path.join(ios_assets_dir, filename)
-        create_icon_with_padding(logo_path, output_path, size, padding_percent=15)
-    
-    # Create iOS Contents.json
-    contents_json = {
-        "images": [
-            {"size": "20x20", "idiom": "iphone", "filename": "Icon-20@2x.png", "scale": "2x"},
-            {"size": "20x20", "idiom": "iphone", "filename": "Icon-20@3x.png", "scale": "3x"},
-            {"size": "29x29", "idiom": "iphone", "filename": "Icon-29@2x.png", "scale": "2x"},
-            {"size": "29x29", "idiom": "iphone", "filename": "Icon-29@3x.png", "scale": "3x"},
-            {"size": "40x40", "idiom": "iphone", "filename": "Icon-40@2x.png", "scale": "2x"},
-            {"size": "40x40", "idiom": "iphone", "filename": "Icon-40@3x.png", "scale": "3x"},
-            {"size": "60x60", "idiom": "iphone", "filename": "Icon-60@2x.png", "scale": "2x"},
-            {"size": "60x60", "idiom": "iphone", "filename": "Icon-60@3x.png", "scale": "3x"},
-            {"size": "20x20", "idiom": "ipad", "filename": "Icon-20@2x.png", "scale": "2x"},
-            {"size": "29x29", "idiom": "ipad", "filename": "Icon-29@2x.png", "scale": "2x"},
-            {"size": "40x40", "idiom": "ipad", "filename": "Icon-40@2x.png", "scale": "2x"},
-            {"size": "76x76", "idiom": "ipad", "filename": "Icon-76.png", "scale": "1x"},
-            {"size": "76x76", "idiom": "ipad", "filename": "Icon-76@2x.png", "scale": "2x"},
-            {"size": "83.5x83.5", "idiom": "ipad", "filename": "Icon-83.5@2x.png", "scale": "2x"},
-            {"size": "1024x1024", "idiom": "ios-marketing", "filename": "Icon-1024.png", "scale": "1x"}
-        ],
-        "info": {"version": 1, "author": "xcode"}
-    }
-    
-    import json
-    contents_path = os.path.join(ios_assets_dir, 'Contents.json')
-    with open(contents_path, 'w') as f:
-        json.dump(contents_json, f, indent=2)
-    print(f"✓ Created {contents_path}")
-    
-    print("\n✅ All icons generated successfully!")
+    start = time.perf_counter()
+    manifest_path = os.path.join(base_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    source_digest = file_digest(logo_path)
+
+    targets = [t for t in TARGETS if not args.platform or t.platform in args.platform]
+    if args.force:
+        # Only the selected targets: other platforms keep their cache entries
+        for target in targets:
+            manifest['outputs'].pop(target.path, None)
+
+    # Skip targets whose inputs and output file are unchanged
+    keys = {}
+    stale = []
+    for target in targets:
+        output_path = os.path.join(base_dir, target.path)
+        keys[target] = job_key(source_digest, target, args.low_memory, args.optimize)
+        if not is_fresh(manifest, target.path, output_path, keys[target]):
+            stale.append(target)
+
+    if stale:
+        # Only decode the logo when something actually needs rendering, and
+        # render each distinct size once for all targets that share it
+        logo = load_logo(logo_path, LOW_MEMORY_CAP if args.low_memory else None)
+        specs = [spec for target in stale for spec in render_specs(target)]
+        rendered = render_all(logo, specs, workers=args.workers, preset=args.optimize)
+        print(f"🎨 Rendered {len(rendered)} distinct size(s) for {len(stale)} icon(s)")
+
+    baseline_total = written_total = 0
+    for platform, label in PLATFORM_LABELS.items():
+        platform_stale = [t for t in stale if t.platform == platform]
+        if not platform_stale:
+            continue
+        print(f"\n{label} Icons:")
+        for target in platform_stale:
+            output_path = os.path.join(base_dir, target.path)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            baseline, data = encode_target(target, rendered)
+            write_if_changed(output_path, data)
+            manifest['outputs'][target.path] = {
+                'key': keys[target],
+                'output': hashlib.sha256(data).hexdigest(),
+            }
+            saved = ''
+            if baseline:
+                baseline_total += baseline
+                written_total += len(data)
+                saved = f", {baseline:,} → {len(data):,} bytes, {len(data) - baseline:+,}"
+            print(f"✓ Created {output_path} ({target.size}x{target.size}px{saved})")
+    if baseline_total:
+        print(f"\n🗜  PNG optimization ({args.optimize}): {baseline_total:,} → "
+              f"{written_total:,} bytes ({(written_total - baseline_total) / baseline_total:+.1%})")
+    print(f"\n⏭  {len(targets) - len(stale)} up-to-date icon(s) skipped")
+
+    if not args.platform or 'ios' in args.platform:
+        os.makedirs(ios_assets_dir, exist_ok=True)
+        contents_path = os.path.join(ios_assets_dir, 'Contents.json')
+        if write_if_changed(contents_path, json.dumps(IOS_CONTENTS_JSON, indent=2)):
+            print(f"✓ Created {contents_path}")
+
+    save_manifest(manifest_path, manifest)
+
+    peak = peak_memory_mb()
+    if peak:
+        print(f"📈 Peak RSS: {peak[0]:.1f} MiB (main), {peak[1]:.1f} MiB (largest worker)")
+
+    print(f"\n✅ All icons generated successfully in {time.perf_counter() - start:.2f}s!")
     print("\n📝 Next steps:")
     print("1. Run: flutter clean")
     print("2. Run: flutter pub get")